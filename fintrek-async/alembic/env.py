@@ -132,6 +132,8 @@ from app.models.account import Account
 from app.models.transaction import Transaction
 from app.models.category import Category
 from app.models.bank_connection import BankConnection
+from app.models.job import Job
+from app.models.sync_run import SyncRun
 
 # Alembic Config object
 config = context.config
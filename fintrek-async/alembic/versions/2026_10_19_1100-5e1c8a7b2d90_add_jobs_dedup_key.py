@@ -0,0 +1,32 @@
+"""Add jobs dedup key
+
+Revision ID: 5e1c8a7b2d90
+Revises: 3b7d2f1a9c41
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e1c8a7b2d90'
+down_revision = '3b7d2f1a9c41'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('jobs', sa.Column('dedup_key', sa.String(length=255), nullable=True))
+    op.create_index(
+        'uq_jobs_active_dedup_key',
+        'jobs',
+        ['dedup_key'],
+        unique=True,
+        postgresql_where=sa.text("status IN ('QUEUED', 'RUNNING')")
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('uq_jobs_active_dedup_key', table_name='jobs')
+    op.drop_column('jobs', 'dedup_key')
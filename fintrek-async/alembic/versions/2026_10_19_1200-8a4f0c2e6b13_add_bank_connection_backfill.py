@@ -0,0 +1,28 @@
+"""Add bank connection backfill checkpoint
+
+Revision ID: 8a4f0c2e6b13
+Revises: 5e1c8a7b2d90
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8a4f0c2e6b13'
+down_revision = '5e1c8a7b2d90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('bank_connections', sa.Column('backfill_cursor', sa.DateTime(), nullable=True))
+    op.add_column('bank_connections', sa.Column('backfill_until', sa.DateTime(), nullable=True))
+    op.add_column('bank_connections', sa.Column('backfill_completed_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('bank_connections', 'backfill_completed_at')
+    op.drop_column('bank_connections', 'backfill_until')
+    op.drop_column('bank_connections', 'backfill_cursor')
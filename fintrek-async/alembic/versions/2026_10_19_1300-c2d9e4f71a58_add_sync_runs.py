@@ -0,0 +1,55 @@
+"""Add sync runs table
+
+Revision ID: c2d9e4f71a58
+Revises: 8a4f0c2e6b13
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c2d9e4f71a58'
+down_revision = '8a4f0c2e6b13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('sync_runs',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('connection_id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('mode', sa.String(length=16), nullable=False),
+    sa.Column('status', sa.Enum('RUNNING', 'SUCCEEDED', 'FAILED', 'SKIPPED', name='syncrunstatus'), nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('started_at', sa.DateTime(), nullable=False),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.Column('duration_ms', sa.Integer(), nullable=True),
+    sa.Column('token_refresh_ms', sa.Integer(), nullable=False),
+    sa.Column('accounts_fetch_ms', sa.Integer(), nullable=False),
+    sa.Column('transactions_fetch_ms', sa.Integer(), nullable=False),
+    sa.Column('parse_ms', sa.Integer(), nullable=False),
+    sa.Column('db_write_ms', sa.Integer(), nullable=False),
+    sa.Column('pages_fetched', sa.Integer(), nullable=False),
+    sa.Column('bytes_received', sa.BigInteger(), nullable=False),
+    sa.Column('rows_inserted', sa.Integer(), nullable=False),
+    sa.Column('rows_updated', sa.Integer(), nullable=False),
+    sa.Column('rows_skipped', sa.Integer(), nullable=False),
+    sa.Column('retries', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['connection_id'], ['bank_connections.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_sync_runs_id'), 'sync_runs', ['id'], unique=False)
+    op.create_index(op.f('ix_sync_runs_user_id'), 'sync_runs', ['user_id'], unique=False)
+    op.create_index('ix_sync_runs_connection_id_started_at', 'sync_runs', ['connection_id', 'started_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_sync_runs_connection_id_started_at', table_name='sync_runs')
+    op.drop_index(op.f('ix_sync_runs_user_id'), table_name='sync_runs')
+    op.drop_index(op.f('ix_sync_runs_id'), table_name='sync_runs')
+    op.drop_table('sync_runs')
+    sa.Enum(name='syncrunstatus').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,26 @@
+"""Add bank connection provider and account sync cursor
+
+Revision ID: 6d2b9e0f4a17
+Revises: c2d9e4f71a58
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6d2b9e0f4a17'
+down_revision = 'c2d9e4f71a58'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('bank_connections', sa.Column('provider', sa.String(length=32), server_default='open_banking', nullable=False))
+    op.add_column('accounts', sa.Column('sync_cursor', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('accounts', 'sync_cursor')
+    op.drop_column('bank_connections', 'provider')
@@ -0,0 +1,24 @@
+"""Add jobs trace parent
+
+Revision ID: 7f3a1c5d9e28
+Revises: 6d2b9e0f4a17
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7f3a1c5d9e28'
+down_revision = '6d2b9e0f4a17'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('jobs', sa.Column('trace_parent', sa.String(length=55), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('jobs', 'trace_parent')
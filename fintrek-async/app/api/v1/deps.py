@@ -2,15 +2,19 @@
 Зависимости FastAPI (ASYNC версия)
 """
 from typing import AsyncGenerator
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from uuid import UUID
 
-from app.db.session import get_db
+from app.db.replica import replica_router
+from app.db.session import get_db, ReadSessionLocal
 from app.models.user import User
-from app.core.security import decode_token
+from app.core.data_version import get_data_version
+from app.core.etag import data_version_etag, etag_matches
+from app.core.security import decode_token_cached
+from app.services.user_cache import user_cache
 
 # Схема безопасности для Bearer токена
 security = HTTPBearer()
@@ -23,6 +27,10 @@ async def get_current_user(
     """
     Получение текущего пользователя из JWT токена (ASYNC)
     
+    Payload токена и поля пользователя кэшируются (см. user_cache), поэтому
+    обычно запрос обходится без обращения к БД. Пользователь из кэша не
+    привязан к сессии: для изменения его нужно загрузить заново.
+    
     Args:
         db: Асинхронная сессия БД
         credentials: Credentials из заголовка Authorization
@@ -43,7 +51,7 @@ async def get_current_user(
     token = credentials.credentials
     
     # Декодируем токен
-    payload = decode_token(token)
+    payload = decode_token_cached(token)
     if payload is None:
         raise credentials_exception
     
@@ -65,7 +73,14 @@ async def get_current_user(
     except ValueError:
         raise credentials_exception
     
-    # Получаем пользователя из БД (ASYNC)
+    # Изменения в сессии запроса увеличат версию данных этого пользователя (см. get_db)
+    db.info["user_id"] = user_id
+    
+    # Сначала кэш, затем БД (ASYNC)
+    user = await user_cache.get(user_id)
+    if user is not None:
+        return user
+    
     result = await db.execute(
         select(User).where(User.id == user_id)
     )
@@ -74,4 +89,58 @@ async def get_current_user(
     if user is None:
         raise credentials_exception
     
+    await user_cache.set(user)
     return user
+
+
+async def get_read_db(
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Сессия только для чтения: реплика, если это безопасно, иначе primary
+    
+    Реплика используется, если она настроена (DB_REPLICA_URL), отстает
+    не больше DB_REPLICA_MAX_LAG_SECONDS и пользователь за это время
+    ничего не записывал (read-your-writes). Изменения через эту сессию
+    не фиксируются.
+    
+    Args:
+        current_user: Текущий пользователь
+        db: Сессия primary (соединение не берется, пока не нужно)
+    
+    Yields:
+        AsyncSession: Сессия реплики или primary
+    """
+    if not await replica_router.use_replica(current_user.id):
+        yield db
+        return
+    
+    async with ReadSessionLocal() as session:
+        yield session
+
+
+async def check_data_version_etag(
+    request: Request,
+    current_user: User = Depends(get_current_user)
+) -> None:
+    """
+    Условный запрос по версии данных пользователя
+    
+    Подключается через dependencies=[...] маршрута, поэтому выполняется до
+    остальных зависимостей и обработчика: при совпадении If-None-Match
+    запрос завершается 304 без SQL и обращения к кэшу ответов. Иначе ETag
+    сохраняется в request.state и добавляется к ответу (см. ETagRoute).
+    Без Redis версия неизвестна, и запрос обрабатывается как обычно.
+    
+    Raises:
+        HTTPException: 304, если ETag совпал
+    """
+    data_version = await get_data_version(current_user.id)
+    if data_version is None:
+        return
+    
+    etag = data_version_etag(current_user.id, data_version.version, request)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    request.state.etag = etag
@@ -7,7 +7,8 @@ from sqlalchemy import select, delete
 from typing import List
 from uuid import UUID
 
-from app.api.v1.deps import get_db, get_current_user
+from app.api.v1.deps import check_data_version_etag, get_db, get_current_user
+from app.core.etag import ETagRoute
 from app.models.user import User
 from app.models.account import Account
 from app.schemas.account import (
@@ -17,10 +18,10 @@ from app.schemas.account import (
     AccountListResponse
 )
 
-router = APIRouter()
+router = APIRouter(route_class=ETagRoute)
 
 
-@router.get("/", response_model=AccountListResponse)
+@router.get("/", response_model=AccountListResponse, dependencies=[Depends(check_data_version_etag)])
 async def get_accounts(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -2,22 +2,24 @@
 API эндпоинты для AI-инсайтов и рекомендаций
 """
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
-from app.api.v1.deps import get_db, get_current_user
+from app.api.v1.deps import get_db, get_read_db, get_current_user
 from app.models.user import User
-from app.ml.transaction_categorizer import transaction_categorizer
 from app.ml.spending_analyzer import spending_analyzer
 from app.ml.recommendation_engine import recommendation_engine
 from app.ml.forecasting_model import forecasting_model
+from app.schemas.job import JobEnqueueResponse
+from app.services.job_queue import job_queue
+from app.services.job_handlers import CATEGORIZE_TRANSACTIONS
 from datetime import datetime, timedelta
 
 router = APIRouter()
 
 
-@router.post("/categorize-transactions")
+@router.post("/categorize-transactions", response_model=JobEnqueueResponse, status_code=status.HTTP_202_ACCEPTED)
 async def categorize_transactions(
     limit: int = Query(100, ge=1, le=1000),
     current_user: User = Depends(get_current_user),
@@ -25,20 +27,32 @@ async def categorize_transactions(
 ):
     """
     Автоматически категоризировать некатегоризированные транзакции
+    
+    Категоризация выполняется в фоне, количество категоризированных
+    транзакций доступно в `result` задачи (`GET /jobs/{job_id}`).
+    Если категоризация пользователя уже ждет или идет, возвращается её задача.
     """
-    count = transaction_categorizer.batch_categorize(db, limit=limit)
+    job, created = await job_queue.enqueue_or_attach(
+        db,
+        CATEGORIZE_TRANSACTIONS,
+        user_id=current_user.id,
+        dedup_key=f"{CATEGORIZE_TRANSACTIONS}:{current_user.id}",
+        payload={"limit": limit}
+    )
     
-    return {
-        "message": f"Категоризировано {count} транзакций",
-        "categorized_count": count
-    }
+    return JobEnqueueResponse(
+        job_id=job.id,
+        job_type=job.job_type,
+        status=job.status,
+        deduplicated=not created
+    )
 
 
 @router.get("/spending-by-category")
 async def get_spending_by_category(
     days: int = Query(30, ge=1, le=365),
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Получить расходы по категориям за период
@@ -72,7 +86,7 @@ async def get_spending_by_category(
 async def get_monthly_spending(
     months: int = Query(6, ge=1, le=24),
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Получить расходы по месяцам
@@ -91,7 +105,7 @@ async def get_monthly_spending(
 async def get_recurring_payments(
     min_occurrences: int = Query(3, ge=2, le=10),
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Получить список повторяющихся платежей (подписки)
@@ -113,7 +127,7 @@ async def get_recurring_payments(
 async def get_anomalies(
     threshold: float = Query(2.0, ge=1.0, le=5.0),
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Получить список аномальных транзакций
@@ -131,7 +145,7 @@ async def get_anomalies(
 @router.get("/spending-trends")
 async def get_spending_trends(
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Получить тренды расходов (сравнение текущего и предыдущего месяца)
@@ -146,7 +160,7 @@ async def get_spending_trends(
 @router.get("/recommendations")
 async def get_recommendations(
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Получить персонализированные рекомендации
@@ -165,7 +179,7 @@ async def get_recommendations(
 async def get_proactive_advice(
     scenario: str,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Получить проактивный совет для конкретного сценария
@@ -182,7 +196,7 @@ async def get_proactive_advice(
 @router.get("/forecast/spending")
 async def forecast_spending(
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Прогноз расходов на следующий месяц
@@ -197,7 +211,7 @@ async def forecast_spending(
 @router.get("/forecast/income")
 async def forecast_income(
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Прогноз дохода на следующий месяц
@@ -213,7 +227,7 @@ async def forecast_income(
 async def forecast_balance(
     months: int = Query(3, ge=1, le=12),
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Прогноз баланса на несколько месяцев вперед
@@ -231,7 +245,7 @@ async def forecast_balance(
 @router.get("/financial-health")
 async def get_financial_health(
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Получить показатель финансового здоровья (0-100)
@@ -246,7 +260,7 @@ async def get_financial_health(
 @router.get("/dashboard")
 async def get_ai_dashboard(
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Получить сводную информацию для AI-дашборда
@@ -8,22 +8,23 @@ from sqlalchemy import select, func, and_, extract
 from datetime import datetime, timedelta
 from fastapi_cache.decorator import cache
 
-from app.api.v1.deps import get_db, get_current_user
+from app.api.v1.deps import check_data_version_etag, get_read_db, get_current_user
+from app.core.etag import ETagRoute
 from app.models.user import User
 from app.models.transaction import Transaction, TransactionType
 from app.models.category import Category
 from app.models.account import Account
 
-router = APIRouter()
+router = APIRouter(route_class=ETagRoute)
 
 
-@router.get("/spending-by-category")
+@router.get("/spending-by-category", dependencies=[Depends(check_data_version_etag)])
 @cache(expire=300)  # Кэш на 5 минут
 async def get_spending_by_category(
     start_date: Optional[datetime] = Query(None, description="Начальная дата"),
     end_date: Optional[datetime] = Query(None, description="Конечная дата"),
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Получить расходы по категориям за период
@@ -99,7 +100,7 @@ async def get_spending_by_category(
 async def get_income_vs_expenses(
     months: int = Query(6, ge=1, le=24, description="Количество месяцев"),
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Получить сравнение доходов и расходов по месяцам
@@ -166,11 +167,11 @@ async def get_income_vs_expenses(
     }
 
 
-@router.get("/account-summary")
+@router.get("/account-summary", dependencies=[Depends(check_data_version_etag)])
 @cache(expire=60)  # Кэш на 1 минуту
 async def get_account_summary(
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Получить сводку по всем счетам пользователя
@@ -213,7 +214,7 @@ async def get_account_summary(
 async def get_transaction_statistics(
     days: int = Query(30, ge=1, le=365, description="Количество дней"),
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Получить статистику по транзакциям за период
@@ -282,7 +283,7 @@ async def get_transaction_statistics(
 async def get_daily_spending_trend(
     days: int = Query(30, ge=7, le=90, description="Количество дней"),
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Получить тренд ежедневных расходов
@@ -3,21 +3,25 @@
 """
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, func
 from typing import List
 from uuid import UUID
 
 from app.api.v1.deps import get_db, get_current_user
 from app.models.user import User
 from app.models.bank_connection import BankConnection, BankConnectionStatus
+from app.models.sync_run import SyncRun
 from app.schemas.bank_connection import (
     BankConnectionCreate,
     BankConnectionResponse,
     BankConnectionListResponse,
-    BankConnectionSync,
-    BankConnectionSyncResponse
+    BankConnectionSync
 )
-from app.services.sync_service import sync_service
+from app.schemas.job import JobEnqueueResponse
+from app.schemas.sync_run import SyncRunListResponse
+from app.services.job_queue import job_queue
+from app.services.job_handlers import BANK_CONNECTION_SYNC, BANK_CONNECTION_SYNC_ALL, enqueue_backfill
+from app.connectors import CONNECTORS
 
 router = APIRouter()
 
@@ -63,6 +67,44 @@ async def get_bank_connection(
     return connection
 
 
+@router.get("/{connection_id}/sync-runs", response_model=SyncRunListResponse)
+async def get_sync_runs(
+    connection_id: UUID,
+    limit: int = Query(50, ge=1, le=500, description="Количество последних запусков"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Получить историю запусков синхронизации подключения
+    
+    Для каждого запуска возвращаются длительность фаз (обновление токена,
+    загрузка счетов и транзакций, разбор JSON, запись в БД), количество
+    страниц и байт, вставленные/обновленные/пропущенные строки и повторы.
+    """
+    connection = (await db.execute(select(BankConnection.id).where(
+        BankConnection.id == connection_id,
+        BankConnection.user_id == current_user.id
+    ))).scalar_one_or_none()
+    
+    if not connection:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Bank connection not found"
+        )
+    
+    runs = (await db.execute(
+        select(SyncRun).where(
+            SyncRun.connection_id == connection_id
+        ).order_by(SyncRun.started_at.desc()).limit(limit)
+    )).scalars().all()
+    
+    total = (await db.execute(
+        select(func.count()).select_from(SyncRun).where(SyncRun.connection_id == connection_id)
+    )).scalar()
+    
+    return SyncRunListResponse(runs=runs, total=total)
+
+
 @router.post("/", response_model=BankConnectionResponse, status_code=status.HTTP_201_CREATED)
 async def create_bank_connection(
     connection_data: BankConnectionCreate,
@@ -74,8 +116,15 @@ async def create_bank_connection(
     
     Примечание: В реальной реализации здесь должен быть OAuth flow
     """
+    if connection_data.provider not in CONNECTORS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown bank provider: {connection_data.provider}"
+        )
+    
     connection = BankConnection(
         user_id=current_user.id,
+        provider=connection_data.provider,
         bank_name=connection_data.bank_name,
         bank_bic=connection_data.bank_bic,
         status=BankConnectionStatus.ACTIVE
@@ -88,7 +137,7 @@ async def create_bank_connection(
     return connection
 
 
-@router.post("/sync", response_model=BankConnectionSyncResponse)
+@router.post("/sync", response_model=JobEnqueueResponse, status_code=status.HTTP_202_ACCEPTED)
 async def sync_bank_connection(
     sync_data: BankConnectionSync,
     db: AsyncSession = Depends(get_db),
@@ -96,6 +145,10 @@ async def sync_bank_connection(
 ):
     """
     Синхронизировать данные с банком
+    
+    Синхронизация выполняется в фоне. Статус и счетчики
+    доступны по `GET /jobs/{job_id}`. Повторный запрос во время
+    синхронизации вернет ту же задачу (`deduplicated=true`).
     """
     # Проверить что подключение принадлежит пользователю
     connection = (await db.execute(select(BankConnection).where(
@@ -109,14 +162,83 @@ async def sync_bank_connection(
             detail="Bank connection not found"
         )
     
-    # Выполнить синхронизацию
-    result = await sync_service.sync_bank_connection(
-        db=db,
-        connection_id=str(sync_data.connection_id),
-        user_id=str(current_user.id)
+    # Поставить синхронизацию в очередь; если синхронизация этого
+    # подключения уже ждет или идет, вернуть её задачу
+    job, created = await job_queue.enqueue_or_attach(
+        db,
+        BANK_CONNECTION_SYNC,
+        user_id=current_user.id,
+        dedup_key=f"{BANK_CONNECTION_SYNC}:{sync_data.connection_id}",
+        payload={"connection_id": str(sync_data.connection_id)}
     )
     
-    return BankConnectionSyncResponse(**result)
+    return JobEnqueueResponse(
+        job_id=job.id,
+        job_type=job.job_type,
+        status=job.status,
+        deduplicated=not created
+    )
+
+
+@router.post("/sync-all", response_model=JobEnqueueResponse, status_code=status.HTTP_202_ACCEPTED)
+async def sync_all_bank_connections(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Синхронизировать все подключения пользователя
+    
+    Подключения загружаются параллельно, транзакции всех банков
+    записываются общими пачками. Итоги по каждому подключению
+    доступны в `result` задачи (`GET /jobs/{job_id}`).
+    """
+    job, created = await job_queue.enqueue_or_attach(
+        db,
+        BANK_CONNECTION_SYNC_ALL,
+        user_id=current_user.id,
+        dedup_key=f"{BANK_CONNECTION_SYNC_ALL}:{current_user.id}"
+    )
+    
+    return JobEnqueueResponse(
+        job_id=job.id,
+        job_type=job.job_type,
+        status=job.status,
+        deduplicated=not created
+    )
+
+
+@router.post("/{connection_id}/backfill", response_model=JobEnqueueResponse, status_code=status.HTTP_202_ACCEPTED)
+async def backfill_bank_connection(
+    connection_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Загрузить историю транзакций подключения
+    
+    История загружается в фоне помесячными окнами от новых к старым
+    с сохранением контрольной точки. Для нового подключения загрузка
+    запускается автоматически после первой синхронизации.
+    """
+    connection = (await db.execute(select(BankConnection).where(
+        BankConnection.id == connection_id,
+        BankConnection.user_id == current_user.id
+    ))).scalar_one_or_none()
+    
+    if not connection:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Bank connection not found"
+        )
+    
+    job, created = await enqueue_backfill(db, connection)
+    
+    return JobEnqueueResponse(
+        job_id=job.id,
+        job_type=job.job_type,
+        status=job.status,
+        deduplicated=not created
+    )
 
 
 @router.delete("/{connection_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,35 @@
+"""
+Эндпоинты для отслеживания фоновых задач
+"""
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from uuid import UUID
+
+from app.api.v1.deps import get_db, get_current_user
+from app.models.user import User
+from app.schemas.job import JobResponse
+from app.services.job_queue import job_queue
+
+router = APIRouter()
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(
+    job_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Получить статус фоновой задачи
+
+    Возвращает статус, прогресс, счетчики и ошибку выполнения.
+    """
+    job = await job_queue.get_job(db, job_id, current_user.id)
+
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+
+    return job
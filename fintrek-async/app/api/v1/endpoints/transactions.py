@@ -3,15 +3,17 @@
 """
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_, func
-from typing import List, Optional
+from sqlalchemy import Row, select, and_, or_, func
+from typing import Any, Dict, List, Optional, Sequence
 from uuid import UUID
 from datetime import datetime
 
 from app.api.v1.deps import get_db, get_current_user
+from app.core.responses import ORJSONResponse
 from app.models.user import User
 from app.models.transaction import Transaction
 from app.models.account import Account
+from app.models.category import Category
 from app.schemas.transaction import (
     TransactionCreate,
     TransactionUpdate,
@@ -22,6 +24,77 @@ from app.schemas.transaction import (
 
 router = APIRouter()
 
+# Поля списка транзакций в порядке TransactionResponse
+LIST_FIELDS = tuple(TransactionResponse.model_fields)
+
+# Связанные объекты для include=: имя -> (модель, условие соединения, поля)
+LIST_INCLUDES = {
+    "category": (Category, Category.id == Transaction.category_id, ("id", "name", "icon", "color")),
+    "account": (Account, Account.id == Transaction.account_id, ("id", "account_name", "account_type")),
+}
+
+
+def parse_list_param(value: Optional[str], allowed: Sequence[str], param: str) -> Optional[List[str]]:
+    """
+    Разобрать параметр-список через запятую
+    
+    Args:
+        value: Значение параметра (None - не задан)
+        allowed: Допустимые значения, в порядке вывода
+        param: Имя параметра для сообщения об ошибке
+        
+    Returns:
+        Запрошенные значения в порядке allowed или None
+    """
+    if value is None:
+        return None
+    requested = {item.strip() for item in value.split(",") if item.strip()}
+    unknown = requested.difference(allowed)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Неизвестные значения {param}: {', '.join(sorted(unknown))}. Допустимые: {', '.join(allowed)}"
+        )
+    return [item for item in allowed if item in requested]
+
+
+def transaction_rows(
+    rows: Sequence[Row],
+    fields: Sequence[str] = LIST_FIELDS,
+    includes: Sequence[str] = ()
+) -> List[Dict[str, Any]]:
+    """
+    Строки Core-запроса списка в словари, готовые к сериализации
+    
+    Совпадает с TransactionResponse.model_dump(mode="json") после
+    сериализации: UUID, datetime и enum orjson кодирует сам, сумма
+    отдается строкой, как Decimal в pydantic.
+    
+    Args:
+        rows: Строки с колонками fields, затем с полями каждого include
+        fields: Поля транзакции
+        includes: Встраиваемые объекты (ключи LIST_INCLUDES); без связи - None
+    """
+    size = len(fields)
+    has_amount = "amount" in fields
+    related = []
+    offset = size
+    for name in includes:
+        related_fields = LIST_INCLUDES[name][2]
+        related.append((name, related_fields, offset, offset + len(related_fields)))
+        offset += len(related_fields)
+    
+    items = []
+    for row in rows:
+        item = dict(zip(fields, row))
+        if has_amount:
+            item["amount"] = str(item["amount"])
+        for name, related_fields, start, end in related:
+            values = row[start:end]
+            item[name] = dict(zip(related_fields, values)) if values[0] is not None else None
+        items.append(item)
+    return items
+
 
 @router.get("/", response_model=TransactionListResponse)
 async def get_transactions(
@@ -31,50 +104,77 @@ async def get_transactions(
     date_to: Optional[datetime] = Query(None, description="Конечная дата"),
     page: int = Query(1, ge=1, description="Номер страницы"),
     page_size: int = Query(50, ge=1, le=100, description="Размер страницы"),
+    fields: Optional[str] = Query(
+        None,
+        description="Поля транзакций через запятую, например id,amount,transaction_date (id отдается всегда)"
+    ),
+    include: Optional[str] = Query(
+        None,
+        description="Встроить связанные объекты: category (id, name, icon, color), account (id, account_name, account_type)"
+    ),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Получить список транзакций с фильтрацией и пагинацией
+    
+    Колонки выбираются Core-запросом без ORM-объектов, строки сразу
+    превращаются в словари ответа (см. transaction_rows) и отдаются без
+    повторной валидации через TransactionListResponse.
+    
+    `fields` ограничивает поля транзакций (и колонки в SQL), `include`
+    добавляет категорию и счет тем же запросом через LEFT JOIN. С этими
+    параметрами элементы списка - подмножество TransactionResponse плюс
+    встроенные объекты.
     """
-    # Базовый запрос
-    stmt = select(Transaction).filter(
-        Transaction.user_id == current_user.id
-    )
+    selected = parse_list_param(fields, LIST_FIELDS, "fields")
+    selected = tuple(["id"] + [name for name in selected if name != "id"]) if selected is not None else LIST_FIELDS
+    includes = parse_list_param(include, tuple(LIST_INCLUDES), "include") or []
+    
+    # Фильтры
+    conditions = [Transaction.user_id == current_user.id]
     
-    # Применить фильтры
     if account_id:
-        stmt = stmt.filter(Transaction.account_id == account_id)
+        conditions.append(Transaction.account_id == account_id)
     
     if category_id:
-        stmt = stmt.filter(Transaction.category_id == category_id)
+        conditions.append(Transaction.category_id == category_id)
     
     if date_from:
-        stmt = stmt.filter(Transaction.transaction_date >= date_from)
+        conditions.append(Transaction.transaction_date >= date_from)
     
     if date_to:
-        stmt = stmt.filter(Transaction.transaction_date <= date_to)
+        conditions.append(Transaction.transaction_date <= date_to)
     
     # Подсчитать общее количество
-    count_stmt = select(func.count()).select_from(stmt.subquery())
-    count_result = await db.execute(count_stmt)
-    total = count_result.scalar()
+    count_stmt = select(func.count()).select_from(Transaction).where(*conditions)
+    total = (await db.execute(count_stmt)).scalar()
+    
+    # Колонки транзакции и связанных объектов
+    columns = [getattr(Transaction, name) for name in selected]
+    for name in includes:
+        model, _, related_fields = LIST_INCLUDES[name]
+        columns.extend(getattr(model, field) for field in related_fields)
+    
+    stmt = select(*columns).select_from(Transaction)
+    for name in includes:
+        model, onclause, _ = LIST_INCLUDES[name]
+        stmt = stmt.outerjoin(model, onclause)
     
     # Применить пагинацию и сортировку
     offset = (page - 1) * page_size
-    stmt = stmt.order_by(
+    stmt = stmt.where(*conditions).order_by(
         Transaction.transaction_date.desc()
     ).offset(offset).limit(page_size)
     
     result = await db.execute(stmt)
-    transactions = result.scalars().all()
     
-    return TransactionListResponse(
-        transactions=transactions,
-        total=total,
-        page=page,
-        page_size=page_size
-    )
+    return ORJSONResponse({
+        "transactions": transaction_rows(result.all(), selected, includes),
+        "total": total,
+        "page": page,
+        "page_size": page_size
+    })
 
 
 @router.get("/{transaction_id}", response_model=TransactionResponse)
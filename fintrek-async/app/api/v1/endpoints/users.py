@@ -8,7 +8,8 @@ from sqlalchemy import select
 from app.api.v1.deps import get_db, get_current_user
 from app.models.user import User
 from app.schemas.user import UserUpdate, UserResponse
-from app.core.security import get_password_hash
+from app.core.security import get_password_hash_async
+from app.services.user_cache import user_cache
 
 router = APIRouter()
 
@@ -36,15 +37,20 @@ async def update_current_user(
     
     Позволяет изменить имя, email или пароль.
     """
+    # current_user может быть из кэша, изменяем объект из текущей сессии
+    user = await db.get(User, current_user.id)
+    if user is None:
+        raise HTTPException(status_code=404, detail="Пользователь не найден")
+    
     # Обновить поля, если они предоставлены
     if user_update.full_name is not None:
-        current_user.name = user_update.full_name
+        user.name = user_update.full_name
     
     if user_update.email is not None:
         # Проверить, не занят ли email
         existing_user = (await db.execute(select(User).where(
             User.email == user_update.email,
-            User.id != current_user.id
+            User.id != user.id
         ))).scalar_one_or_none()
         
         if existing_user:
@@ -53,12 +59,13 @@ async def update_current_user(
                 detail="Email уже используется"
             )
         
-        current_user.email = user_update.email
+        user.email = user_update.email
     
     if user_update.password is not None:
-        current_user.password_hash = get_password_hash(user_update.password)
+        user.password_hash = await get_password_hash_async(user_update.password)
     
     await db.commit()
-    await db.refresh(current_user)
+    await db.refresh(user)
+    await user_cache.invalidate(user.id)
     
-    return current_user
+    return user
@@ -1,23 +1,29 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.v1.deps import get_current_user
 from app.db.session import get_db
-from app.services.vbank_import import VBankImportService
+from app.schemas.job import JobEnqueueResponse
+from app.services.job_queue import job_queue
+from app.services.job_handlers import VBANK_SYNC_ACCOUNTS, VBANK_SYNC_TRANSACTIONS
 
 router = APIRouter(prefix="/vbank", tags=["vbank"])
 
-@router.post("/sync-accounts")
+@router.post("/sync-accounts", response_model=JobEnqueueResponse, status_code=status.HTTP_202_ACCEPTED)
 async def sync_accounts(
     current_user = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    svc = VBankImportService()
-    await svc.fetch_accounts(db, user_id=current_user.id)
-    await db.commit()
-    return {"status": "ok"}
+    # подключение VBank у пользователя одно, поэтому ключ дедупликации - по пользователю
+    job, created = await job_queue.enqueue_or_attach(
+        db,
+        VBANK_SYNC_ACCOUNTS,
+        user_id=current_user.id,
+        dedup_key=f"{VBANK_SYNC_ACCOUNTS}:{current_user.id}",
+    )
+    return JobEnqueueResponse(job_id=job.id, job_type=job.job_type, status=job.status, deduplicated=not created)
 
-@router.post("/sync-transactions")
+@router.post("/sync-transactions", response_model=JobEnqueueResponse, status_code=status.HTTP_202_ACCEPTED)
 async def sync_transactions(
     account_id: str = Query(..., description="external account id из VBank"),
     date_from: str | None = Query(None),
@@ -25,7 +31,11 @@ async def sync_transactions(
     current_user = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    svc = VBankImportService()
-    await svc.fetch_transactions(db, user_id=current_user.id, account_id=account_id, date_from=date_from, date_to=date_to)
-    await db.commit()
-    return {"status": "ok"}
+    job, created = await job_queue.enqueue_or_attach(
+        db,
+        VBANK_SYNC_TRANSACTIONS,
+        user_id=current_user.id,
+        dedup_key=f"{VBANK_SYNC_TRANSACTIONS}:{current_user.id}:{account_id}",
+        payload={"account_id": account_id, "date_from": date_from, "date_to": date_to},
+    )
+    return JobEnqueueResponse(job_id=job.id, job_type=job.job_type, status=job.status, deduplicated=not created)
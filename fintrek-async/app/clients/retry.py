@@ -0,0 +1,63 @@
+"""
+Повторы запросов к банковским API
+
+Общие для всех клиентов банков (Open Banking, VBank): банк ограничивает
+частоту запросов (429 с Retry-After) и иногда отвечает 5xx, а загрузка
+истории не должна падать из-за одного такого ответа.
+"""
+from typing import Any, Optional
+import asyncio
+import logging
+
+import httpx
+
+from app.core.config import settings
+from app.services.sync_stats import SyncStats
+
+logger = logging.getLogger(__name__)
+
+
+async def send_with_retries(
+    client: httpx.AsyncClient,
+    method: str,
+    url: str,
+    stats: Optional[SyncStats] = None,
+    **kwargs: Any
+) -> httpx.Response:
+    """
+    Выполнить запрос к банку с повторами при 429 и ошибках 5xx
+
+    Пауза берется из заголовка Retry-After, иначе экспоненциальная.
+    Не больше BANK_API_MAX_RETRIES повторов.
+
+    Args:
+        client: HTTP клиент
+        method: HTTP метод
+        url: URL запроса
+        stats: Статистика синхронизации (объем ответа, повторы)
+
+    Returns:
+        Успешный ответ
+    """
+    attempt = 0
+    while True:
+        response = await client.request(method, url, **kwargs)
+        retryable = response.status_code == 429 or response.status_code >= 500
+        if not retryable or attempt >= settings.BANK_API_MAX_RETRIES:
+            response.raise_for_status()
+            if stats:
+                stats.bytes_received += len(response.content)
+            return response
+
+        retry_after = response.headers.get("Retry-After")
+        try:
+            delay = float(retry_after) if retry_after else 2 ** attempt
+        except ValueError:
+            delay = 2 ** attempt
+        delay = min(delay, 60.0)
+
+        attempt += 1
+        if stats:
+            stats.retries += 1
+        logger.warning(f"Bank API {method} {url} returned {response.status_code}, retry {attempt} in {delay:.1f}s")
+        await asyncio.sleep(delay)
@@ -4,7 +4,10 @@ import time
 from typing import Any, Dict, Optional
 
 import httpx
+from app.clients.retry import send_with_retries
 from app.core.config import settings
+from app.core.tracing import TracingTransport
+from app.services.sync_stats import SyncStats
 
 class VBankAuth:
     def __init__(self, base_url: str, client_id: str, client_secret: str, bank_code: str):
@@ -30,8 +33,7 @@ class VBankAuth:
                 "client_secret": self.client_secret,
                 "bank": self.bank_code,
             }
-            resp = await http.post(f"{self.base_url}/auth/bank-token", json=payload, timeout=20.0)
-            resp.raise_for_status()
+            resp = await send_with_retries(http, "POST", f"{self.base_url}/auth/bank-token", json=payload, timeout=20.0)
             data = resp.json()
             # типичные поля: access_token / expires_in
             self._access_token = data.get("access_token") or data.get("token")
@@ -44,26 +46,33 @@ class VBankClient:
     def __init__(self, base_url: str, client_id: str, client_secret: str, bank_code: str):
         self.base_url = base_url.rstrip("/")
         self._auth = VBankAuth(base_url, client_id, client_secret, bank_code)
-        self._http = httpx.AsyncClient(base_url=self.base_url, timeout=30.0)
+        self._http = httpx.AsyncClient(base_url=self.base_url, timeout=30.0, transport=TracingTransport())
+
+    async def token(self) -> str:
+        return await self._auth.token(self._http)
 
     async def _headers(self) -> Dict[str, str]:
-        token = await self._auth.token(self._http)
+        token = await self.token()
         return {"Authorization": f"Bearer {token}"}
 
-    async def get_accounts(self) -> Dict[str, Any]:
+    async def get_accounts(self, stats: Optional[SyncStats] = None) -> Dict[str, Any]:
         # примерный путь — в sandbox обычно /accounts или /client/accounts
         # если у них другой — поправим одну строку тут, без касания остального кода
-        r = await self._http.get("/accounts", headers=await self._headers())
-        r.raise_for_status()
+        # 429 и 5xx повторяются с паузой, как у Open Banking (send_with_retries)
+        r = await send_with_retries(self._http, "GET", "/accounts", stats, headers=await self._headers())
         return r.json()
 
-    async def get_transactions(self, account_id: str, date_from: Optional[str] = None, date_to: Optional[str] = None) -> Dict[str, Any]:
+    async def get_transactions(self, account_id: str, date_from: Optional[str] = None, date_to: Optional[str] = None, page: Optional[int] = None, stats: Optional[SyncStats] = None) -> Dict[str, Any]:
         params = {}
         if date_from: params["dateFrom"] = date_from
         if date_to: params["dateTo"] = date_to
+        # постраничная выдача: номер страницы из поля next_page предыдущего ответа
+        if page: params["page"] = page
         # частый профиль: /accounts/{id}/transactions
-        r = await self._http.get(f"/accounts/{account_id}/transactions", params=params, headers=await self._headers())
-        r.raise_for_status()
+        r = await send_with_retries(
+            self._http, "GET", f"/accounts/{account_id}/transactions", stats,
+            params=params, headers=await self._headers()
+        )
         return r.json()
 
     async def aclose(self):
@@ -0,0 +1,53 @@
+"""
+Коннекторы к банкам
+
+Подключение выбирает коннектор по полю provider.
+"""
+from typing import Dict
+
+from app.connectors.base import (
+    BankConnector,
+    BankAccountData,
+    BankTransactionData,
+    ConnectorToken,
+    TransactionPage,
+    CAPABILITY_OAUTH,
+    CAPABILITY_PAGED_TRANSACTIONS,
+    CAPABILITY_INCREMENTAL_CURSOR,
+)
+from app.connectors.open_banking import OpenBankingConnector
+from app.connectors.vbank import VBankConnector
+
+CONNECTORS: Dict[str, BankConnector] = {
+    OpenBankingConnector.provider: OpenBankingConnector(),
+    VBankConnector.provider: VBankConnector(),
+}
+
+
+def get_connector(provider: str) -> BankConnector:
+    """
+    Получить коннектор по провайдеру подключения
+
+    Raises:
+        ValueError: Провайдер не поддерживается
+    """
+    try:
+        return CONNECTORS[provider]
+    except KeyError:
+        raise ValueError(f"Unknown bank provider: {provider}")
+
+
+__all__ = [
+    "BankConnector",
+    "BankAccountData",
+    "BankTransactionData",
+    "ConnectorToken",
+    "TransactionPage",
+    "CAPABILITY_OAUTH",
+    "CAPABILITY_PAGED_TRANSACTIONS",
+    "CAPABILITY_INCREMENTAL_CURSOR",
+    "OpenBankingConnector",
+    "VBankConnector",
+    "CONNECTORS",
+    "get_connector",
+]
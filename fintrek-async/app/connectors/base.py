@@ -0,0 +1,149 @@
+"""
+Общий интерфейс коннектора к банку
+
+Коннектор отвечает только за работу с API банка: авторизацию, загрузку
+счетов и постраничную загрузку транзакций, и возвращает данные в общем
+формате. Запись в БД, блокировки и статистика остаются в SyncService,
+поэтому все банки синхронизируются одним кодом.
+"""
+from typing import AsyncIterator, FrozenSet, List, Optional
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from app.core.config import settings
+from app.models.account import AccountType
+from app.models.bank_connection import BankConnection
+from app.models.transaction import TransactionType
+from app.services.sync_stats import SyncStats
+
+# Возможности коннектора
+CAPABILITY_OAUTH = "oauth"  # Токены пользователя хранятся в подключении и обновляются по refresh token
+CAPABILITY_PAGED_TRANSACTIONS = "paged_transactions"  # Транзакции отдаются постранично
+CAPABILITY_INCREMENTAL_CURSOR = "incremental_cursor"  # Можно продолжить загрузку с курсора
+
+
+@dataclass
+class ConnectorToken:
+    """Результат авторизации в банке"""
+    access_token: str
+    refresh_token: Optional[str] = None
+    expires_in: Optional[int] = None
+    refreshed: bool = False  # Токен обновлен, новые значения нужно сохранить в подключении
+
+
+@dataclass
+class BankAccountData:
+    """Счет в банке в общем формате"""
+    external_id: str
+    name: str
+    account_type: AccountType = AccountType.CHECKING
+    currency: str = "RUB"
+    balance: Decimal = Decimal("0")
+    available_balance: Optional[Decimal] = None
+
+
+@dataclass
+class BankTransactionData:
+    """Транзакция в банке в общем формате"""
+    external_id: Optional[str]
+    transaction_type: TransactionType
+    amount: Decimal  # Всегда положительная, направление задает transaction_type
+    transaction_date: datetime
+    currency: str = "RUB"
+    description: Optional[str] = None
+    merchant_name: Optional[str] = None
+    posted_date: Optional[datetime] = None
+
+
+@dataclass
+class TransactionPage:
+    """Страница транзакций счета"""
+    transactions: List[BankTransactionData] = field(default_factory=list)
+    cursor: Optional[str] = None  # Курсор от банка, если API их поддерживает
+
+
+class BankConnector(ABC):
+    """Коннектор к API банка"""
+
+    provider: str = ""
+    capabilities: FrozenSet[str] = frozenset()
+
+    def supports(self, capability: str) -> bool:
+        """Проверить поддержку возможности"""
+        return capability in self.capabilities
+
+    @abstractmethod
+    async def authenticate(self, connection: BankConnection, stats: SyncStats) -> ConnectorToken:
+        """
+        Получить действующий access token для подключения
+
+        Args:
+            connection: Подключение к банку
+            stats: Статистика синхронизации
+
+        Returns:
+            Токен; при refreshed=True вызывающий сохраняет его в подключении
+        """
+
+    @abstractmethod
+    async def fetch_accounts(self, token: ConnectorToken, stats: SyncStats) -> List[BankAccountData]:
+        """
+        Загрузить счета подключения
+
+        Args:
+            token: Токен из authenticate
+            stats: Статистика синхронизации
+
+        Returns:
+            Список счетов
+        """
+
+    @abstractmethod
+    def iter_transactions(
+        self,
+        token: ConnectorToken,
+        account_id: str,
+        date_from: Optional[datetime],
+        date_to: Optional[datetime],
+        stats: SyncStats
+    ) -> AsyncIterator[TransactionPage]:
+        """
+        Загрузить транзакции счета постранично
+
+        Args:
+            token: Токен из authenticate
+            account_id: ID счета в банке
+            date_from: Начало периода
+            date_to: Конец периода (не включительно)
+            stats: Статистика синхронизации
+
+        Returns:
+            Асинхронный итератор страниц
+        """
+
+    def cursor_after(self, cursor: Optional[str], page: TransactionPage) -> Optional[str]:
+        """
+        Курсор счета после обработки страницы
+
+        Если банк сам вернул курсор, берется он, иначе курсор - дата
+        самой свежей загруженной транзакции.
+        """
+        if page.cursor:
+            return page.cursor
+        if not page.transactions:
+            return cursor
+        latest = max(txn.transaction_date for txn in page.transactions).isoformat()
+        return max(cursor, latest) if cursor else latest
+
+    def date_from_cursor(self, cursor: Optional[str]) -> datetime:
+        """
+        Начало периода инкрементальной загрузки
+
+        С курсора с запасом SYNC_CURSOR_OVERLAP_HOURS (транзакции проводятся
+        задним числом), без курсора - последние SYNC_INCREMENTAL_DAYS дней.
+        """
+        if cursor and self.supports(CAPABILITY_INCREMENTAL_CURSOR):
+            return datetime.fromisoformat(cursor) - timedelta(hours=settings.SYNC_CURSOR_OVERLAP_HOURS)
+        return datetime.utcnow() - timedelta(days=settings.SYNC_INCREMENTAL_DAYS)
@@ -0,0 +1,94 @@
+"""
+Коннектор к банкам через Open Banking API (OAuth 2.0 токены пользователя)
+"""
+from typing import Any, AsyncIterator, Dict, List, Optional
+from datetime import datetime
+from decimal import Decimal
+
+from app.connectors.base import (
+    BankConnector,
+    BankAccountData,
+    BankTransactionData,
+    ConnectorToken,
+    TransactionPage,
+    CAPABILITY_OAUTH,
+    CAPABILITY_PAGED_TRANSACTIONS,
+    CAPABILITY_INCREMENTAL_CURSOR,
+)
+from app.core.security import decrypt_token
+from app.models.bank_connection import BankConnection
+from app.services.open_banking_service import open_banking_service
+from app.services.sync_stats import SyncStats
+
+
+class OpenBankingConnector(BankConnector):
+    """Коннектор Open Banking API поверх OpenBankingService"""
+
+    provider = "open_banking"
+    capabilities = frozenset({
+        CAPABILITY_OAUTH,
+        CAPABILITY_PAGED_TRANSACTIONS,
+        CAPABILITY_INCREMENTAL_CURSOR,
+    })
+
+    async def authenticate(self, connection: BankConnection, stats: SyncStats) -> ConnectorToken:
+        """Вернуть токен подключения, обновив его по refresh token, если истек"""
+        access_token = decrypt_token(connection.access_token_encrypted)
+
+        if connection.token_expires_at and connection.token_expires_at < datetime.utcnow():
+            refresh_token = decrypt_token(connection.refresh_token_encrypted)
+            with stats.phase("token_refresh"):
+                tokens = await open_banking_service.refresh_access_token(refresh_token, stats=stats)
+            return ConnectorToken(
+                access_token=tokens["access_token"],
+                refresh_token=tokens.get("refresh_token"),
+                expires_in=tokens.get("expires_in", 3600),
+                refreshed=True
+            )
+
+        return ConnectorToken(access_token=access_token)
+
+    async def fetch_accounts(self, token: ConnectorToken, stats: SyncStats) -> List[BankAccountData]:
+        """Загрузить счета"""
+        bank_accounts = await open_banking_service.fetch_accounts(token.access_token, stats=stats)
+        return [
+            BankAccountData(
+                external_id=bank_account.get("account_number"),
+                name=bank_account.get("name"),
+                account_type=open_banking_service.map_account_type(bank_account.get("type", "checking")),
+                currency=bank_account.get("currency", "RUB"),
+                balance=Decimal(str(bank_account.get("balance", 0))),
+                available_balance=Decimal(str(bank_account["available_balance"])) if bank_account.get("available_balance") else None
+            )
+            for bank_account in bank_accounts
+        ]
+
+    async def iter_transactions(
+        self,
+        token: ConnectorToken,
+        account_id: str,
+        date_from: Optional[datetime],
+        date_to: Optional[datetime],
+        stats: SyncStats
+    ) -> AsyncIterator[TransactionPage]:
+        """Загрузить транзакции счета постранично"""
+        async for page in open_banking_service.iter_transaction_pages(
+            token.access_token, account_id, date_from=date_from, date_to=date_to, stats=stats
+        ):
+            with stats.phase("parse"):
+                transactions = [self._map_transaction(bank_txn) for bank_txn in page]
+            yield TransactionPage(transactions=transactions)
+
+    def _map_transaction(self, bank_txn: Dict[str, Any]) -> BankTransactionData:
+        """Преобразовать транзакцию Open Banking API в общий формат"""
+        amount = float(bank_txn.get("amount", 0))
+        return BankTransactionData(
+            external_id=bank_txn.get("id"),
+            transaction_type=open_banking_service.map_transaction_type(bank_txn.get("type", ""), amount),
+            amount=Decimal(str(abs(bank_txn.get("amount", 0)))),
+            currency=bank_txn.get("currency", "RUB"),
+            description=bank_txn.get("description"),
+            merchant_name=bank_txn.get("merchant_name"),
+            transaction_date=datetime.fromisoformat(bank_txn["date"]) if bank_txn.get("date") else datetime.utcnow(),
+            posted_date=datetime.fromisoformat(bank_txn["posted_date"]) if bank_txn.get("posted_date") else None
+        )
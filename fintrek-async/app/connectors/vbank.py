@@ -0,0 +1,113 @@
+"""
+Коннектор к VBank (токен приложения через /auth/bank-token)
+"""
+from typing import Any, AsyncIterator, Dict, List, Optional
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from app.clients.vbank import VBankClient, get_vbank_client
+from app.connectors.base import (
+    BankConnector,
+    BankAccountData,
+    BankTransactionData,
+    ConnectorToken,
+    TransactionPage,
+    CAPABILITY_PAGED_TRANSACTIONS,
+    CAPABILITY_INCREMENTAL_CURSOR,
+)
+from app.models.account import AccountType
+from app.models.bank_connection import BankConnection
+from app.models.transaction import TransactionType
+from app.services.sync_stats import SyncStats
+
+
+def _parse_date(value: Optional[str]) -> Optional[datetime]:
+    """Разобрать дату VBank (ISO, возможно с Z) в naive UTC"""
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+class VBankConnector(BankConnector):
+    """Коннектор VBank поверх VBankClient"""
+
+    provider = "vbank"
+    capabilities = frozenset({
+        CAPABILITY_PAGED_TRANSACTIONS,
+        CAPABILITY_INCREMENTAL_CURSOR,
+    })
+
+    def __init__(self, client: Optional[VBankClient] = None):
+        self._client = client
+
+    @property
+    def client(self) -> VBankClient:
+        return self._client or get_vbank_client()
+
+    async def authenticate(self, connection: BankConnection, stats: SyncStats) -> ConnectorToken:
+        """Токен общий для приложения, VBankClient сам кэширует и обновляет его"""
+        with stats.phase("token_refresh"):
+            access_token = await self.client.token()
+        return ConnectorToken(access_token=access_token)
+
+    async def fetch_accounts(self, token: ConnectorToken, stats: SyncStats) -> List[BankAccountData]:
+        """Загрузить счета"""
+        with stats.phase("accounts_fetch"):
+            payload = await self.client.get_accounts(stats=stats)
+        stats.pages_fetched += 1
+        return [
+            BankAccountData(
+                external_id=str(a["id"]),
+                name=a.get("name") or a.get("product") or "VBank account",
+                account_type=AccountType.CHECKING,
+                currency=a.get("currency") or "RUB",
+                balance=Decimal(str(a.get("balance", 0))),
+                available_balance=Decimal(str(a["availableBalance"])) if a.get("availableBalance") is not None else None
+            )
+            for a in payload.get("accounts", [])
+        ]
+
+    async def iter_transactions(
+        self,
+        token: ConnectorToken,
+        account_id: str,
+        date_from: Optional[datetime],
+        date_to: Optional[datetime],
+        stats: SyncStats
+    ) -> AsyncIterator[TransactionPage]:
+        """Загрузить транзакции счета постранично (поле next_page в ответе)"""
+        page = None
+        while True:
+            with stats.phase("transactions_fetch"):
+                payload = await self.client.get_transactions(
+                    account_id,
+                    date_from=date_from.date().isoformat() if date_from else None,
+                    date_to=date_to.date().isoformat() if date_to else None,
+                    page=page,
+                    stats=stats
+                )
+            stats.pages_fetched += 1
+            with stats.phase("parse"):
+                transactions = [self._map_transaction(t) for t in payload.get("transactions", [])]
+            yield TransactionPage(transactions=transactions)
+
+            page = payload.get("next_page")
+            if not page:
+                return
+
+    def _map_transaction(self, t: Dict[str, Any]) -> BankTransactionData:
+        """Преобразовать транзакцию VBank в общий формат"""
+        amount = float(t.get("amount", 0))
+        return BankTransactionData(
+            external_id=str(t["id"]) if t.get("id") is not None else None,
+            transaction_type=TransactionType.INCOME if amount >= 0 else TransactionType.EXPENSE,
+            amount=Decimal(str(abs(amount))),
+            currency=t.get("currency") or "RUB",
+            description=t.get("description"),
+            merchant_name=t.get("merchantName"),
+            transaction_date=_parse_date(t.get("bookingDate") or t.get("valueDate")) or datetime.utcnow(),
+            posted_date=_parse_date(t.get("valueDate"))
+        )
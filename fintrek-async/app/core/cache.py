@@ -1,22 +1,58 @@
 """
 Настройка Redis для кэширования
 """
+from typing import Optional, Tuple
+import time
+
 import redis.asyncio as redis
 from fastapi_cache import FastAPICache
 from fastapi_cache.backends.redis import RedisBackend
 from app.core.config import settings
+from app.core.metrics import record_cache_call, record_cache_lookup
+from app.core.tracing import child_span
+
+# Общий клиент Redis (кэш, блокировки)
+_redis_client: redis.Redis | None = None
+
+
+def get_redis() -> redis.Redis:
+    """
+    Получить общий клиент Redis, создав его при первом обращении
+    """
+    global _redis_client
+    if _redis_client is None:
+        _redis_client = redis.from_url(
+            settings.REDIS_URL,
+            encoding="utf-8",
+            decode_responses=True
+        )
+    return _redis_client
+
+
+class InstrumentedRedisBackend(RedisBackend):
+    """RedisBackend для @cache: попадания, промахи и задержка в метриках, спаны в трассе"""
+
+    async def get_with_ttl(self, key: str) -> Tuple[int, Optional[bytes]]:
+        started = time.perf_counter()
+        with child_span("cache.get", attributes={"db.system": "redis", "cache.key": key}) as span:
+            ttl, value = await super().get_with_ttl(key)
+            if span is not None:
+                span.set_attribute("cache.hit", value is not None)
+        record_cache_lookup("response", value is not None, time.perf_counter() - started)
+        return ttl, value
+
+    async def set(self, key: str, value: bytes, expire: Optional[int] = None) -> None:
+        started = time.perf_counter()
+        with child_span("cache.set", attributes={"db.system": "redis", "cache.key": key}):
+            await super().set(key, value, expire)
+        record_cache_call("response", time.perf_counter() - started)
 
 
 async def init_cache():
     """
     Инициализация кэша при старте приложения
     """
-    redis_client = redis.from_url(
-        settings.REDIS_URL,
-        encoding="utf-8",
-        decode_responses=True
-    )
-    FastAPICache.init(RedisBackend(redis_client), prefix="fintrek-cache:")
+    FastAPICache.init(InstrumentedRedisBackend(get_redis()), prefix="fintrek-cache:")
 
 
 async def close_cache():
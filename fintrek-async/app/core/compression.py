@@ -0,0 +1,186 @@
+"""
+Сжатие ответов gzip и brotli
+
+ASGI middleware выбирает кодировку по Accept-Encoding (brotli, если
+установлен пакет brotli и клиент его принимает, иначе gzip) и сжимает
+ответы целиком, когда тело пришло одним сообщением (JSONResponse,
+PlainTextResponse). Не сжимаются:
+
+- ответы меньше COMPRESSION_MINIMUM_SIZE байт - выигрыш меньше затрат;
+- потоковые ответы (тело несколькими сообщениями, FileResponse,
+  StreamingResponse) - они отдаются как есть, без буферизации;
+- уже сжатые (есть Content-Encoding) и несжимаемые типы содержимого;
+- 204/304 и ответы на HEAD.
+
+Затраты CPU и сэкономленные байты по маршрутам видны в /metrics:
+http_response_bytes_total (до сжатия), http_response_compressed_bytes_total
+(после) и http_response_compression_seconds_total.
+"""
+from typing import Dict, List, Optional, Tuple
+import gzip
+import time
+
+from app.core.config import settings
+from app.core.metrics import registry
+from app.core.request_context import current_route
+
+try:
+    import brotli
+except ImportError:  # brotli не обязателен, без него остается gzip
+    brotli = None
+
+# Типы содержимого, которые имеет смысл сжимать
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "application/xml", "image/svg+xml")
+
+response_bytes_total = registry.counter(
+    "http_response_bytes_total", "Response body bytes before compression, by route and encoding", ("route", "encoding")
+)
+response_compressed_bytes_total = registry.counter(
+    "http_response_compressed_bytes_total", "Response body bytes after compression, by route and encoding", ("route", "encoding")
+)
+response_compression_seconds_total = registry.counter(
+    "http_response_compression_seconds_total", "CPU time spent compressing responses, by route and encoding", ("route", "encoding")
+)
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """
+    Разобрать Accept-Encoding в {кодировка: q}
+
+    Кодировки с q=0 запрещены клиентом и тоже попадают в результат.
+    """
+    accepted = {}
+    for item in header.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name] = q
+    return accepted
+
+
+def choose_encoding(header: Optional[str]) -> Optional[str]:
+    """
+    Выбрать кодировку ответа: br или gzip, с большим q (при равенстве - br)
+
+    Returns:
+        "br", "gzip" или None, если клиент не принимает ни одну из них
+    """
+    if not header:
+        return None
+    accepted = parse_accept_encoding(header)
+    wildcard = accepted.get("*", 0.0)
+    candidates = []
+    if brotli is not None:
+        candidates.append(("br", accepted.get("br", wildcard)))
+    candidates.append(("gzip", accepted.get("gzip", wildcard)))
+    # max() берет первый из равных, поэтому br выигрывает при одинаковом q
+    encoding, q = max(candidates, key=lambda candidate: candidate[1])
+    return encoding if q > 0 else None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """Сжать тело ответа с уровнем из настроек"""
+    if encoding == "br":
+        return brotli.compress(body, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    # mtime=0 - одинаковые ответы дают одинаковые байты
+    return gzip.compress(body, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+def _header(headers: List[Tuple[bytes, bytes]], name: bytes) -> Optional[bytes]:
+    for key, value in headers:
+        if key.lower() == name:
+            return value
+    return None
+
+
+class CompressionMiddleware:
+    """ASGI middleware: сжатие ответов gzip/brotli с порогом по размеру"""
+
+    def __init__(self, app, minimum_size: Optional[int] = None):
+        self.app = app
+        self.minimum_size = settings.COMPRESSION_MINIMUM_SIZE if minimum_size is None else minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = dict(scope["headers"])
+        encoding = choose_encoding(request_headers.get(b"accept-encoding", b"").decode("latin-1"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                headers = message.get("headers", [])
+                content_type = (_header(headers, b"content-type") or b"").decode("latin-1")
+                if (
+                    message["status"] in (204, 304)
+                    or _header(headers, b"content-encoding") is not None
+                    or not content_type.startswith(COMPRESSIBLE_TYPES)
+                ):
+                    passthrough = True
+                    await send(message)
+                    return
+                # Заголовки отправляются вместе с первым сообщением тела
+                start_message = message
+                return
+
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            passthrough = True
+            body = message.get("body", b"")
+            if message.get("more_body", False) or len(body) < self.minimum_size:
+                # Потоковый или маленький ответ - как есть
+                await send(start_message)
+                await send(message)
+                return
+
+            started = time.perf_counter()
+            compressed = compress(body, encoding)
+            elapsed = time.perf_counter() - started
+            route = current_route() or "unmatched"
+            response_bytes_total.inc(len(body), route=route, encoding=encoding)
+            response_compressed_bytes_total.inc(len(compressed), route=route, encoding=encoding)
+            response_compression_seconds_total.inc(elapsed, route=route, encoding=encoding)
+
+            original = start_message.get("headers", [])
+            headers = [
+                (key, value) for key, value in original
+                if key.lower() not in (b"content-length", b"vary", b"etag")
+            ]
+            headers.append((b"content-encoding", encoding.encode("latin-1")))
+            headers.append((b"content-length", str(len(compressed)).encode("latin-1")))
+            vary = _header(original, b"vary")
+            if not vary:
+                vary = b"Accept-Encoding"
+            elif b"accept-encoding" not in vary.lower():
+                vary += b", Accept-Encoding"
+            headers.append((b"vary", vary))
+            etag = _header(original, b"etag")
+            if etag is not None:
+                # Байты ответа другие, поэтому сильный ETag становится слабым (как в nginx)
+                headers.append((b"etag", etag if etag.startswith(b"W/") else b"W/" + etag))
+            await send({**start_message, "headers": headers})
+            await send({**message, "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
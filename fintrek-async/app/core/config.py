@@ -26,6 +26,10 @@ class Settings(BaseSettings):
     VBANK_CLIENT_ID: str = Field("", description="VBank client id")
     VBANK_CLIENT_SECRET: str = Field("", description="VBank client secret")
     VBANK_BANK_CODE: str = Field("VBank")
+
+    OPEN_BANKING_API_URL: str = Field("https://api.example-bank.ru", description="Базовый URL Open Banking API")
+    OPEN_BANKING_CLIENT_ID: str = Field("", description="Open Banking client id")
+    OPEN_BANKING_CLIENT_SECRET: str = Field("", description="Open Banking client secret")
     
     @property
     def DATABASE_URL(self) -> str:
@@ -37,6 +41,19 @@ class Settings(BaseSettings):
         """Формирование async URL для подключения к БД"""
         return f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_SERVER}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
     
+    # Пул соединений с БД (на процесс)
+    DB_POOL_SIZE: int = 10  # Постоянных соединений в пуле
+    DB_MAX_OVERFLOW: int = 10  # Дополнительных соединений сверх пула при пиках
+    DB_POOL_TIMEOUT: float = 10.0  # Ожидание свободного соединения, дальше ошибка
+    DB_POOL_RECYCLE: int = 1800  # Пересоздавать соединения старше N секунд (-1 - никогда)
+    DB_STATEMENT_CACHE_SIZE: int = 100  # Prepared statements в кэше asyncpg и SQLAlchemy на соединение
+    DB_PGBOUNCER: bool = False  # PgBouncer в transaction mode: без кэша prepared statements, уникальные имена
+    DB_REPLICA_URL: Optional[str] = None  # postgresql+asyncpg://... реплики для аналитики и AI, пусто - только primary
+    DB_REPLICA_MAX_LAG_SECONDS: float = 5.0  # Допустимое отставание реплики; пользователь, писавший позже, читает с primary
+    DB_REPLICA_LAG_CHECK_SECONDS: float = 5.0  # Как часто перепроверять отставание реплики
+    DB_QUERY_HEADERS: bool = True  # Заголовки X-DB-Queries / X-DB-Time в ответах
+    DB_REPEATED_QUERY_THRESHOLD: int = 10  # Предупреждение, если один SQL повторяется чаще за запрос (N+1), 0 - выключено
+    
     # Redis
     REDIS_HOST: str = "localhost"
     REDIS_PORT: int = 6379
@@ -52,6 +69,61 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30  # 30 минут
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7  # 7 дней
+    TOKEN_CACHE_SIZE: int = 10000  # Декодированных JWT в памяти процесса (до истечения токена)
+    
+    # Хеширование паролей (bcrypt) вне event loop
+    PASSWORD_HASH_POOL: str = "thread"  # thread | process
+    PASSWORD_HASH_WORKERS: int = 4  # Размер пула
+    PASSWORD_HASH_QUEUE_LIMIT: int = 32  # Ожидающих задач сверх занятых воркеров, дальше 503
+    
+    # Диагностические эндпоинты /health/* с внутренними деталями (заголовок X-Ops-Token)
+    OPS_TOKEN: str = ""  # Секрет для заголовка X-Ops-Token, пусто - эндпоинты закрыты
+    
+    # Профилирование отдельных запросов (заголовок X-Profile)
+    PROFILING_TOKEN: str = ""  # Секрет для заголовка X-Profile, пусто - профилирование выключено
+    PROFILING_INTERVAL_MS: float = 5.0  # Интервал сэмплирования стека
+    PROFILING_DIR: str = "profiles"  # Каталог для профилей (folded stacks)
+    PROFILING_MAX_FILES: int = 100  # Сколько последних профилей хранить, старые удаляются
+    
+    # Трассировка (OTLP JSON в файл)
+    TRACING_ENABLED: bool = False
+    TRACING_FILE: str = "traces/spans.jsonl"  # Куда писать спаны
+    TRACING_SAMPLE_RATIO: float = 1.0  # Доля новых трасс, которые записываются
+    TRACING_SERVICE_NAME: str = "fintrek-api"
+    
+    # Монитор задержки event loop
+    LOOP_LAG_MONITOR_ENABLED: bool = True
+    LOOP_LAG_INTERVAL_SECONDS: float = 0.1  # Период измерения задержки
+    LOOP_LAG_THRESHOLD_SECONDS: float = 0.1  # Задержка, при которой снимается стек блокирующего кода
+    
+    # Сжатие ответов (gzip, brotli при установленном пакете brotli)
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MINIMUM_SIZE: int = 1024  # Ответы меньше этого размера (байт) не сжимаются
+    COMPRESSION_GZIP_LEVEL: int = 6  # 1-9
+    COMPRESSION_BROTLI_QUALITY: int = 4  # 0-11
+    
+    # Кэш авторизованного пользователя: память процесса -> Redis -> БД
+    USER_CACHE_TTL_SECONDS: int = 300  # Время жизни в Redis
+    USER_CACHE_LOCAL_TTL_SECONDS: float = 5.0  # Время жизни в памяти процесса (других процессов инвалидация не достигает)
+    USER_CACHE_LOCAL_SIZE: int = 10000  # Пользователей в памяти процесса
+    
+    # Фоновые задачи (очередь jobs в PostgreSQL)
+    JOB_WORKER_CONCURRENCY: int = 2  # Количество параллельных воркеров в процессе
+    JOB_POLL_INTERVAL_SECONDS: float = 1.0  # Пауза между опросами пустой очереди
+    JOB_STALE_AFTER_SECONDS: int = 600  # Через сколько секунд без heartbeat задача считается потерянной
+    JOB_MAX_ATTEMPTS: int = 3  # Максимум попыток выполнения потерянной задачи
+    
+    # Синхронизация с банками
+    SYNC_LOCK_TTL_SECONDS: int = 120  # Срок аренды блокировки синхронизации подключения
+    SYNC_INCREMENTAL_DAYS: int = 30  # Глубина обычной синхронизации
+    SYNC_CURSOR_OVERLAP_HOURS: int = 24  # Запас назад от курсора счета при инкрементальной синхронизации
+    SYNC_BACKFILL_MONTHS: int = 60  # Глубина загрузки истории для новых подключений
+    SYNC_BACKFILL_WINDOWS_PER_JOB: int = 6  # Месяцев за один запуск задачи backfill
+    SYNC_BACKFILL_WINDOW_DELAY_SECONDS: float = 1.0  # Пауза между окнами (лимиты банка)
+    SYNC_BACKFILL_JOB_PRIORITY: int = 1000  # Ниже интерактивных задач
+    BANK_API_MAX_RETRIES: int = 5  # Повторы запросов к банку при 429 и 5xx
+    SYNC_USER_CONCURRENCY: int = 4  # Подключений пользователя, загружаемых параллельно
+    SYNC_WRITE_BATCH_SIZE: int = 1000  # Транзакций в одной пакетной вставке общей записи
     
     # CORS
     BACKEND_CORS_ORIGINS: list = [
@@ -0,0 +1,67 @@
+"""
+Версия данных пользователя
+
+Счетчик в Redis, который увеличивается после каждой записи данных
+пользователя (запросы API с изменениями, синхронизация с банком).
+Вместе с версией хранится время последней записи: по нему запросы
+чтения решают, можно ли идти на реплику, которая могла еще не получить
+свежие изменения.
+"""
+from typing import Any, Optional
+from dataclasses import dataclass
+import logging
+import time
+
+from app.core.cache import get_redis
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class DataVersion:
+    """Версия данных пользователя и время последней записи (unix time)"""
+    version: int
+    written_at: float
+
+
+def _key(user_id: Any) -> str:
+    return f"data-version:{user_id}"
+
+
+async def bump_data_version(user_id: Any) -> None:
+    """
+    Отметить запись данных пользователя
+
+    Ошибки Redis только логируются: запись в БД уже выполнена.
+
+    Args:
+        user_id: ID пользователя
+    """
+    try:
+        async with get_redis().pipeline(transaction=True) as pipe:
+            pipe.hincrby(_key(user_id), "version", 1)
+            pipe.hset(_key(user_id), "written_at", time.time())
+            await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Failed to bump data version for user {user_id}: {e}")
+
+
+async def get_data_version(user_id: Any) -> Optional[DataVersion]:
+    """
+    Текущая версия данных пользователя
+
+    Args:
+        user_id: ID пользователя
+
+    Returns:
+        DataVersion (version=0, если записей еще не было) или None, если Redis недоступен
+    """
+    try:
+        data = await get_redis().hgetall(_key(user_id))
+    except Exception as e:
+        logger.warning(f"Failed to read data version for user {user_id}: {e}")
+        return None
+    return DataVersion(
+        version=int(data.get("version", 0)),
+        written_at=float(data.get("written_at", 0.0))
+    )
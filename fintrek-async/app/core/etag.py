@@ -0,0 +1,77 @@
+"""
+ETag по версии данных пользователя
+
+Для ответов, которые зависят только от данных пользователя и параметров
+запроса, ETag вычисляется без выполнения обработчика: из версии данных
+(app/core/data_version.py), пути и параметров запроса. Поэтому повторный
+запрос с If-None-Match получает 304 после одной проверки версии в Redis,
+без SQL и без обращения к кэшу ответов.
+
+В ETag входит и текущая дата UTC: отчеты с окном "последние N дней"
+сдвигаются со временем без записи данных.
+
+ETag верен, только пока каждая запись данных пользователя увеличивает
+версию: запросы API через get_db, синхронизация с банком и фоновые
+задачи (bump_data_version после фиксации). Иначе клиент получит 304 со
+старыми данными.
+
+Проверку выполняет зависимость check_data_version_etag (app/api/v1/deps.py),
+заголовок ETag к ответу 200 добавляет ETagRoute - класс маршрутов роутера.
+"""
+from typing import Any, Callable, Optional
+from datetime import datetime
+import hashlib
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+from app.core.config import settings
+
+
+def data_version_etag(user_id: Any, version: int, request: Request) -> str:
+    """
+    Сильный ETag ответа для версии данных пользователя
+
+    Args:
+        user_id: ID пользователя
+        version: Версия его данных
+        request: Запрос (путь и параметры входят в ETag)
+    """
+    query = "&".join(sorted(f"{key}={value}" for key, value in request.query_params.multi_items()))
+    source = f"{settings.VERSION}:{user_id}:{version}:{datetime.utcnow().date()}:{request.url.path}?{query}"
+    return f'"{hashlib.blake2b(source.encode(), digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Совпадает ли ETag с заголовком If-None-Match
+
+    Сравнение слабое (RFC 9110): W/ не учитывается, поэтому ETag, ослабленный
+    при сжатии ответа, тоже совпадает.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+class ETagRoute(APIRoute):
+    """
+    Маршрут, который добавляет к ответу 200 ETag, вычисленный зависимостью
+
+    ETag ставится после обработчика, поэтому заменяет заголовок, который
+    выставляет @cache (fastapi-cache).
+    """
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            response = await handler(request)
+            etag = getattr(request.state, "etag", None)
+            if etag is not None and response.status_code == 200:
+                response.headers["ETag"] = etag
+            return response
+
+        return route_handler
@@ -0,0 +1,127 @@
+"""
+Распределенные блокировки с арендой (lease) на Redis
+
+Блокировка берется через SET NX PX и продлевается в фоне, пока
+держатель жив. Если процесс упал, блокировка сама истечет через TTL.
+
+Если продлить аренду не удалось (ключ уже чужой или Redis недоступен
+дольше TTL), блокировка считается потерянной: держатель должен проверять
+ее через ensure_held() перед записью и прерывать работу.
+"""
+from typing import Optional
+import asyncio
+import logging
+import time
+import uuid
+
+import redis.asyncio as redis
+
+from app.core.cache import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Продлить/снять блокировку, только если она все еще принадлежит нам
+_EXTEND_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("pexpire", KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+_RELEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+class LockNotAcquired(Exception):
+    """Блокировка уже удерживается другим процессом"""
+    pass
+
+
+class LockLost(Exception):
+    """Аренда блокировки потеряна, пока работа еще шла"""
+    pass
+
+
+class LeaseLock:
+    """Блокировка с арендой и автоматическим продлением"""
+
+    def __init__(self, key: str, ttl_seconds: float, client: Optional[redis.Redis] = None):
+        """
+        Args:
+            key: Ключ блокировки в Redis
+            ttl_seconds: Срок аренды; продлевается каждые ttl/3 секунд
+            client: Клиент Redis (по умолчанию общий клиент приложения)
+        """
+        self.key = key
+        self.ttl_ms = int(ttl_seconds * 1000)
+        self.token = uuid.uuid4().hex
+        self._client = client
+        self._renew_task: Optional[asyncio.Task] = None
+        self._extended_at = 0.0  # Время последнего успешного взятия или продления
+        self.lost = False  # Аренда потеряна (не удалось продлить)
+
+    @property
+    def client(self) -> redis.Redis:
+        return self._client or get_redis()
+
+    async def acquire(self) -> bool:
+        """Попытаться взять блокировку без ожидания"""
+        acquired = await self.client.set(self.key, self.token, nx=True, px=self.ttl_ms)
+        return bool(acquired)
+
+    async def extend(self) -> bool:
+        """Продлить аренду, если блокировка все еще наша"""
+        return bool(await self.client.eval(_EXTEND_SCRIPT, 1, self.key, self.token, self.ttl_ms))
+
+    async def release(self) -> None:
+        """Снять блокировку, если она все еще наша"""
+        await self.client.eval(_RELEASE_SCRIPT, 1, self.key, self.token)
+
+    def ensure_held(self) -> None:
+        """
+        Проверить, что аренда не потеряна
+
+        Raises:
+            LockLost: Блокировку мог взять другой процесс, продолжать нельзя
+        """
+        if self.lost:
+            raise LockLost(f"Lease lock {self.key} was lost")
+
+    async def _renew(self) -> None:
+        """Фоновое продление аренды"""
+        interval = self.ttl_ms / 3000
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if not await self.extend():
+                    self.lost = True
+                    logger.warning(f"Lease lock {self.key} was lost")
+                    return
+                self._extended_at = time.monotonic()
+            except Exception as e:
+                logger.warning(f"Failed to extend lease lock {self.key}: {e}")
+                # Без продления дольше TTL ключ истек, и блокировку мог взять другой
+                if time.monotonic() - self._extended_at >= self.ttl_ms / 1000:
+                    self.lost = True
+                    logger.warning(f"Lease lock {self.key} was lost: not extended for longer than its TTL")
+                    return
+
+    async def __aenter__(self) -> "LeaseLock":
+        if not await self.acquire():
+            raise LockNotAcquired(self.key)
+        self._extended_at = time.monotonic()
+        self._renew_task = asyncio.create_task(self._renew())
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if self._renew_task:
+            self._renew_task.cancel()
+            self._renew_task = None
+        try:
+            await self.release()
+        except Exception as e:
+            logger.warning(f"Failed to release lease lock {self.key}: {e}")
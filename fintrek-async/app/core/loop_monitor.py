@@ -0,0 +1,166 @@
+"""
+Монитор задержки event loop
+
+Фоновая задача засыпает на LOOP_LAG_INTERVAL_SECONDS и измеряет, на
+сколько позже она проснулась: это время, на которое синхронный код
+(bcrypt, синхронные запросы к БД, тяжелые циклы) задержал все остальные
+запросы процесса. Задержка экспортируется в /metrics.
+
+Пока loop заблокирован, задача ничего не может записать, поэтому
+дополнительно работает сторожевой поток: если задача проспала дольше
+LOOP_LAG_THRESHOLD_SECONDS сверх своего интервала, он снимает стек потока
+event loop - это и есть код, который блокирует loop. Стек пишется в лог и
+хранится в последних событиях (GET /health/event-loop); если измеренная
+задержка оказалась меньше порога, событие отбрасывается.
+"""
+from typing import Any, Deque, Dict, List, Optional
+from collections import deque
+from datetime import datetime
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+
+from app.core.config import settings
+from app.core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# Сколько последних блокировок хранить для /health/event-loop
+RECENT_EVENTS = 20
+
+event_loop_lag_seconds = registry.histogram(
+    "event_loop_lag_seconds", "Event loop scheduling lag",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+event_loop_blocked_total = registry.counter(
+    "event_loop_blocked_total", "Event loop stalls longer than the threshold"
+)
+
+
+class EventLoopMonitor:
+    """Измеряет задержку event loop и ловит стеки блокирующего кода"""
+
+    def __init__(self, interval_seconds: float, threshold_seconds: float):
+        """
+        Args:
+            interval_seconds: Период измерения
+            threshold_seconds: Задержка, начиная с которой loop считается заблокированным
+        """
+        self.interval_seconds = interval_seconds
+        self.threshold_seconds = threshold_seconds
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._loop_thread_id: Optional[int] = None
+        self._last_beat = 0.0
+        self._reported_beat = 0.0
+        self._pending_event: Optional[Dict[str, Any]] = None
+
+        self.events: Deque[Dict[str, Any]] = deque(maxlen=RECENT_EVENTS)
+        self.lag_seconds_max = 0.0
+        self.last_lag_seconds = 0.0
+
+    def start(self) -> None:
+        """Запустить измерения в текущем event loop"""
+        if self._task is not None:
+            return
+        self._stopping.clear()
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._task = asyncio.create_task(self._measure())
+        self._watchdog = threading.Thread(target=self._watch, name="event-loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        """Остановить задачу и сторожевой поток"""
+        self._stopping.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1.0)
+            self._watchdog = None
+
+    async def _measure(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval_seconds)
+            lag = max(loop.time() - started - self.interval_seconds, 0.0)
+            self._last_beat = time.monotonic()
+            self.last_lag_seconds = lag
+            self.lag_seconds_max = max(self.lag_seconds_max, lag)
+            event_loop_lag_seconds.observe(lag)
+
+            event = self._pending_event
+            self._pending_event = None
+            if lag < self.threshold_seconds:
+                if event is not None:
+                    # Сторожевой поток ошибся (например, сам не получил CPU вовремя):
+                    # loop не был заблокирован, стек не относится ни к какой блокировке
+                    self._discard(event)
+                continue
+
+            event_loop_blocked_total.inc()
+            if event is not None:
+                # Стек снят сторожевым потоком во время блокировки
+                event["lag_ms"] = round(lag * 1000, 1)
+                logger.warning(
+                    f"Event loop blocked for {lag * 1000:.0f}ms; stack at detection:\n{event['stack']}"
+                )
+            else:
+                logger.warning(f"Event loop blocked for {lag * 1000:.0f}ms (stack not captured)")
+
+    def _discard(self, event: Dict[str, Any]) -> None:
+        """Убрать ложное событие из последних блокировок"""
+        try:
+            self.events.remove(event)
+        except ValueError:
+            pass  # Уже вытеснено более новыми
+
+    def _watch(self) -> None:
+        """Сторожевой поток: снимает стек loop, пока тот заблокирован"""
+        while not self._stopping.wait(self.interval_seconds):
+            beat = self._last_beat
+            # Между отметками задача спит interval_seconds: блокировка - только то, что сверх сна
+            stalled = time.monotonic() - beat - self.interval_seconds
+            if stalled < self.threshold_seconds or beat == self._reported_beat:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            self._reported_beat = beat
+            event = {
+                "detected_at": datetime.utcnow().isoformat(),
+                "stalled_ms": round(stalled * 1000, 1),
+                "lag_ms": None,  # Заполняется, когда loop освободится
+                "stack": "".join(traceback.format_stack(frame)),
+            }
+            self._pending_event = event
+            self.events.append(event)
+
+    def stats(self) -> Dict[str, Any]:
+        """Текущая и максимальная задержка и последние блокировки"""
+        events: List[Dict[str, Any]] = list(self.events)
+        return {
+            "running": self._task is not None,
+            "interval_ms": self.interval_seconds * 1000,
+            "threshold_ms": self.threshold_seconds * 1000,
+            "last_lag_ms": round(self.last_lag_seconds * 1000, 2),
+            "max_lag_ms": round(self.lag_seconds_max * 1000, 2),
+            "recent_blocks": events[::-1],
+        }
+
+
+# Singleton instance
+event_loop_monitor = EventLoopMonitor(
+    interval_seconds=settings.LOOP_LAG_INTERVAL_SECONDS,
+    threshold_seconds=settings.LOOP_LAG_THRESHOLD_SECONDS
+)
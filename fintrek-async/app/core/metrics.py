@@ -0,0 +1,296 @@
+"""
+Метрики приложения в текстовом формате Prometheus
+
+Небольшой реестр counter/gauge/histogram без внешних зависимостей:
+метрики копятся в памяти процесса и отдаются на GET /metrics, внешний
+коллектор для локальной работы не нужен. Рассчитан на один event loop.
+"""
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+import math
+import time
+
+from app.core.request_context import RequestStats, current_request_stats, current_route
+
+# Границы корзин гистограмм длительности по умолчанию (как в клиенте Prometheus)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelValues = Tuple[str, ...]
+# Сэмпл для коллектора: (имя с суффиксом, метки, значение)
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """Общая часть метрик: имя, описание, имена меток"""
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _labels(self, key: LabelValues) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def samples(self) -> Iterable[Sample]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Монотонно растущий счетчик"""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> Iterable[Sample]:
+        for key, value in self._values.items():
+            yield self.name, self._labels(key), value
+
+
+class Gauge(_Metric):
+    """Значение, которое может расти и уменьшаться"""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def samples(self) -> Iterable[Sample]:
+        for key, value in self._values.items():
+            yield self.name, self._labels(key), value
+
+
+class Histogram(_Metric):
+    """Распределение значений по корзинам с суммой и количеством"""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # метки -> (счетчики по корзинам, сумма, количество)
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        counts, total = self._values.setdefault(key, ([0] * len(self.buckets), [0.0]))
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[index] += 1
+                break
+        total[0] += value
+
+    def samples(self) -> Iterable[Sample]:
+        for key, (counts, total) in self._values.items():
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                yield f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative
+            yield f"{self.name}_sum", labels, total[0]
+            yield f"{self.name}_count", labels, cumulative
+
+
+# Коллектор считывает текущее состояние при каждом запросе /metrics:
+# возвращает [(имя, тип, описание, сэмплы)]
+Collector = Callable[[], List[Tuple[str, str, str, List[Sample]]]]
+
+
+class MetricsRegistry:
+    """Реестр метрик процесса"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Collector] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector: Collector) -> None:
+        """Добавить функцию, которая отдает метрики, вычисляемые в момент запроса"""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Все метрики в текстовом формате Prometheus 0.0.4"""
+        families = [
+            (metric.name, metric.type_name, metric.documentation, list(metric.samples()))
+            for metric in self._metrics.values()
+        ]
+        for collector in self._collectors:
+            families.extend(collector())
+
+        lines = []
+        for name, type_name, documentation, samples in families:
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {type_name}")
+            for sample_name, labels, value in samples:
+                lines.append(f"{sample_name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+# HTTP
+http_requests_total = registry.counter(
+    "http_requests_total", "HTTP requests by route and status code", ("method", "route", "status")
+)
+http_request_duration_seconds = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency", ("method", "route")
+)
+http_requests_in_flight = registry.gauge(
+    "http_requests_in_flight", "HTTP requests currently being processed"
+)
+http_requests_in_flight.set(0)
+
+# БД
+db_queries_total = registry.counter(
+    "db_queries_total", "SQL statements executed, by route", ("route",)
+)
+db_query_seconds_total = registry.counter(
+    "db_query_seconds_total", "Time spent executing SQL statements, by route", ("route",)
+)
+db_queries_per_request = registry.histogram(
+    "db_queries_per_request", "SQL statements per HTTP request", ("route",),
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100)
+)
+
+# Кэш (Redis и память процесса)
+cache_requests_total = registry.counter(
+    "cache_requests_total", "Cache lookups by cache, route and result", ("cache", "route", "result")
+)
+cache_operation_seconds = registry.histogram(
+    "cache_operation_seconds", "Cache backend call latency", ("cache", "route"),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25)
+)
+
+
+def _route_label() -> str:
+    return current_route() or "background"
+
+
+def record_cache_lookup(cache: str, hit: bool, seconds: Optional[float] = None) -> None:
+    """
+    Учесть обращение к кэшу
+
+    Args:
+        cache: Имя кэша (response, user, ...)
+        hit: Найдено ли значение
+        seconds: Длительность обращения к бэкенду (None для кэша в памяти)
+    """
+    route = _route_label()
+    cache_requests_total.inc(cache=cache, route=route, result="hit" if hit else "miss")
+    if seconds is not None:
+        cache_operation_seconds.observe(seconds, cache=cache, route=route)
+
+
+def record_cache_call(cache: str, seconds: float) -> None:
+    """Учесть длительность записи в кэш (без hit/miss)"""
+    cache_operation_seconds.observe(seconds, cache=cache, route=_route_label())
+
+
+def _record_request(method: str, route: str, status: int, seconds: float, stats: Optional[RequestStats]) -> None:
+    http_requests_total.inc(method=method, route=route, status=str(status))
+    http_request_duration_seconds.observe(seconds, method=method, route=route)
+    if stats is not None:
+        db_queries_total.inc(stats.db_queries, route=route)
+        db_query_seconds_total.inc(stats.db_seconds, route=route)
+        db_queries_per_request.observe(stats.db_queries, route=route)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware: задержка, коды ответа и запросы в обработке по маршрутам
+
+    Должен стоять внутри RequestContextMiddleware, чтобы видеть счетчики запроса.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_requests_in_flight.dec()
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            _record_request(
+                scope["method"], route, status_code,
+                time.perf_counter() - started, current_request_stats()
+            )
@@ -0,0 +1,141 @@
+"""
+Пул воркеров для хеширования паролей
+
+bcrypt занимает 100-300 мс CPU на вызов. В обработчике запроса это
+блокирует event loop, и на время всплеска логинов встают все запросы
+процесса. Хеширование выполняется в отдельном пуле потоков (или
+процессов) ограниченного размера; если очередь переполнена, запрос
+сразу получает 503, а не ждет минутами.
+"""
+from typing import Any, Callable, Dict, Optional, Tuple
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+import asyncio
+import time
+
+from app.core.config import settings
+
+
+class PasswordHashingBusy(Exception):
+    """Очередь хеширования паролей переполнена"""
+    pass
+
+
+def _timed(func: Callable[..., Any], *args: Any) -> Tuple[Any, float, float]:
+    """
+    Выполнить функцию в воркере и засечь время
+
+    Returns:
+        Кортеж (результат, момент начала по time.monotonic, длительность в секундах)
+    """
+    started = time.monotonic()
+    result = func(*args)
+    return result, started, time.monotonic() - started
+
+
+class PasswordHashingPool:
+    """Ограниченный пул для bcrypt с отказом при переполнении очереди"""
+
+    def __init__(self, workers: int, queue_limit: int, mode: str = "thread"):
+        """
+        Args:
+            workers: Количество потоков/процессов
+            queue_limit: Сколько задач может ждать сверх занятых воркеров
+            mode: "thread" или "process"
+        """
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.mode = mode
+        self._executor: Optional[Executor] = None
+        self._pending = 0  # Выполняются + ждут в очереди
+
+        # Метрики
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.run_seconds_total = 0.0
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            if self.mode == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+        return self._executor
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        Выполнить функцию хеширования в пуле
+
+        Raises:
+            PasswordHashingBusy: Все воркеры заняты и очередь заполнена
+        """
+        if self._pending >= self.workers + self.queue_limit:
+            self.rejected += 1
+            raise PasswordHashingBusy()
+
+        loop = asyncio.get_running_loop()
+        self._pending += 1
+        self.submitted += 1
+        enqueued = time.monotonic()
+
+        def notify(f: Future) -> None:
+            try:
+                loop.call_soon_threadsafe(self._on_done, f, enqueued)
+            except RuntimeError:
+                # Event loop уже закрыт (остановка приложения)
+                pass
+
+        future = self.executor.submit(_timed, func, *args)
+        # Счетчики обновляются по завершении воркера, даже если запрос уже отменен
+        future.add_done_callback(notify)
+
+        result, _, _ = await asyncio.wrap_future(future)
+        return result
+
+    def _on_done(self, future: Future, enqueued: float) -> None:
+        """Обновить метрики после выполнения задачи воркером"""
+        self._pending -= 1
+        if future.cancelled() or future.exception() is not None:
+            self.failed += 1
+            return
+        _, started, duration = future.result()
+        wait = max(started - enqueued, 0.0)
+        self.completed += 1
+        self.wait_seconds_total += wait
+        self.wait_seconds_max = max(self.wait_seconds_max, wait)
+        self.run_seconds_total += duration
+
+    def stats(self) -> Dict[str, Any]:
+        """Текущее состояние и накопленные метрики пула"""
+        return {
+            "mode": self.mode,
+            "workers": self.workers,
+            "queue_limit": self.queue_limit,
+            "in_flight": min(self._pending, self.workers),
+            "queued": max(self._pending - self.workers, 0),
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "wait_ms_avg": round(self.wait_seconds_total / self.completed * 1000, 2) if self.completed else 0.0,
+            "wait_ms_max": round(self.wait_seconds_max * 1000, 2),
+            "run_ms_avg": round(self.run_seconds_total / self.completed * 1000, 2) if self.completed else 0.0,
+        }
+
+    def shutdown(self) -> None:
+        """Остановить воркеры"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Singleton instance
+password_hashing_pool = PasswordHashingPool(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    queue_limit=settings.PASSWORD_HASH_QUEUE_LIMIT,
+    mode=settings.PASSWORD_HASH_POOL
+)
@@ -0,0 +1,191 @@
+"""
+Профилирование отдельных запросов сэмплированием стека
+
+Запрос с заголовком X-Profile, равным PROFILING_TOKEN, выполняется под
+статистическим сэмплером: фоновый поток каждые PROFILING_INTERVAL_MS
+снимает стек потока event loop через sys._current_frames(). Код
+приложения не инструментируется, поэтому накладные расходы малы и
+касаются только этого запроса.
+
+Профиль сохраняется в PROFILING_DIR в формате folded stacks
+("корень;...;лист количество"), который понимают flamegraph.pl,
+speedscope и inferno. ID профиля возвращается в заголовке
+X-Profile-Id, сам профиль - на GET /debug/profiles/{profile_id}.
+Файл пишется в отдельном потоке, а в каталоге остаются только
+PROFILING_MAX_FILES последних профилей.
+
+Сэмплер видит весь поток event loop: если параллельно выполнялись
+другие запросы, их стеки тоже попадут в профиль.
+"""
+from typing import Optional
+from collections import Counter
+from datetime import datetime
+import asyncio
+import glob
+import hmac
+import logging
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Один профилируемый запрос на процесс: сэмплы параллельных профилей смешались бы
+_profiling_slot = threading.Semaphore(1)
+
+_PROFILE_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+def _frame_label(frame) -> str:
+    """Метка кадра: функция и место ее определения (без текущей строки, чтобы кадры склеивались)"""
+    code = frame.f_code
+    filename = code.co_filename
+    cwd = os.getcwd()
+    if filename.startswith(cwd):
+        filename = os.path.relpath(filename, cwd)
+    else:
+        filename = "/".join(filename.split(os.sep)[-2:])
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+class StackSampler(threading.Thread):
+    """Фоновый поток, который сэмплирует стек заданного потока"""
+
+    def __init__(self, thread_id: int, interval_seconds: float):
+        """
+        Args:
+            thread_id: threading.get_ident() профилируемого потока
+            interval_seconds: Интервал между сэмплами
+        """
+        super().__init__(name="stack-sampler", daemon=True)
+        self.thread_id = thread_id
+        self.interval_seconds = interval_seconds
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.interval_seconds):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def stop(self) -> None:
+        """Остановить сэмплирование (без ожидания потока, join() - отдельно)"""
+        self._stop_event.set()
+
+    def folded(self) -> str:
+        """Профиль в формате folded stacks"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def profiling_requested(token: Optional[str]) -> bool:
+    """
+    Совпадает ли значение заголовка X-Profile с PROFILING_TOKEN
+
+    Args:
+        token: Значение заголовка (None, если его нет)
+    """
+    if not settings.PROFILING_TOKEN or not token:
+        return False
+    return hmac.compare_digest(token, settings.PROFILING_TOKEN)
+
+
+def profile_path(profile_id: str) -> Optional[str]:
+    """
+    Путь к файлу профиля
+
+    Returns:
+        Путь или None, если ID некорректный (защита от обхода каталога)
+    """
+    if not _PROFILE_ID.match(profile_id):
+        return None
+    return os.path.join(settings.PROFILING_DIR, f"{profile_id}.folded")
+
+
+def _save_profile(profile_id: str, sampler: StackSampler, label: str, seconds: float) -> None:
+    """Дождаться сэмплера, записать профиль и удалить старые (вне event loop)"""
+    sampler.join()
+    os.makedirs(settings.PROFILING_DIR, exist_ok=True)
+    with open(profile_path(profile_id), "w", encoding="utf-8") as f:
+        f.write(sampler.folded())
+    logger.info(
+        f"Saved profile {profile_id} for {label}: {sampler.samples} samples in {seconds:.3f}s "
+        f"({datetime.utcnow().isoformat()})"
+    )
+    _prune_profiles(settings.PROFILING_MAX_FILES)
+
+
+def _mtime(path: str) -> float:
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return 0.0
+
+
+def _prune_profiles(keep: int) -> None:
+    """Оставить в PROFILING_DIR только keep последних профилей"""
+    paths = glob.glob(os.path.join(settings.PROFILING_DIR, "*.folded"))
+    if len(paths) <= keep:
+        return
+    paths.sort(key=_mtime)
+    for path in paths[:len(paths) - keep]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass  # Удален параллельно
+
+
+class ProfilingMiddleware:
+    """ASGI middleware: профилирует запросы с заголовком X-Profile"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.PROFILING_TOKEN:
+            await self.app(scope, receive, send)
+            return
+
+        token = dict(scope.get("headers", [])).get(b"x-profile")
+        if not profiling_requested(token.decode("latin-1") if token else None):
+            await self.app(scope, receive, send)
+            return
+
+        if not _profiling_slot.acquire(blocking=False):
+            logger.info(f"Profiling skipped for {scope['path']}: another request is being profiled")
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), (b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        sampler = StackSampler(threading.get_ident(), settings.PROFILING_INTERVAL_MS / 1000)
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            sampler.stop()
+            _profiling_slot.release()
+            try:
+                await asyncio.to_thread(
+                    _save_profile, profile_id, sampler, f"{scope['method']} {scope['path']}", time.perf_counter() - started
+                )
+            except OSError as e:
+                logger.warning(f"Failed to save profile {profile_id}: {e}")
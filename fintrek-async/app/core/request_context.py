@@ -0,0 +1,113 @@
+"""
+Контекст текущей операции (HTTP-запроса или фоновой задачи)
+
+Хранится в contextvars, поэтому доступен из любого кода, вызванного в
+рамках запроса: событий пула соединений, логирования, метрик. Для
+HTTP-запроса хранится ASGI scope: маршрут FastAPI записывает в него
+шаблон пути уже после middleware, и метка берется в момент обращения.
+"""
+from typing import Any, Dict, Optional
+from collections import Counter
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+
+from app.core.config import settings
+
+
+@dataclass
+class RequestStats:
+    """Счетчики работы, выполненной в рамках одного HTTP-запроса"""
+    db_queries: int = 0
+    db_seconds: float = 0.0
+    statements: Counter = field(default_factory=Counter)  # Текст SQL (с плейсхолдерами) -> сколько раз выполнен
+
+
+_scope: ContextVar[Optional[Dict[str, Any]]] = ContextVar("request_scope", default=None)
+_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+_operation: ContextVar[Optional[str]] = ContextVar("operation", default=None)
+
+
+def current_route() -> Optional[str]:
+    """
+    Шаблон пути маршрута текущего запроса
+
+    Returns:
+        "/api/v1/accounts/{account_id}", "unmatched", если маршрут не найден,
+        или None вне HTTP-запроса
+    """
+    scope = _scope.get()
+    if scope is None:
+        return None
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    """Счетчики текущего HTTP-запроса или None вне запроса"""
+    return _stats.get()
+
+
+def current_operation() -> str:
+    """
+    Метка текущей операции
+
+    Returns:
+        "GET /api/v1/accounts/{account_id}" для запроса, "job:<тип>" для
+        фоновой задачи, "background" вне запроса и задачи
+    """
+    scope = _scope.get()
+    if scope is not None:
+        route = scope.get("route")
+        path = getattr(route, "path", None) or scope.get("path", "")
+        return f"{scope.get('method', '')} {path}"
+    return _operation.get() or "background"
+
+
+def bind_operation(label: str) -> Token:
+    """
+    Задать метку операции вне HTTP-запроса (например, для фоновой задачи)
+
+    Returns:
+        Токен для reset_operation
+    """
+    return _operation.set(label)
+
+
+def reset_operation(token: Token) -> None:
+    _operation.reset(token)
+
+
+class RequestContextMiddleware:
+    """
+    ASGI middleware, сохраняющий scope и счетчики запроса в контексте
+
+    Если включен DB_QUERY_HEADERS, в ответ добавляются X-DB-Queries
+    (число SQL-запросов) и X-DB-Time (их суммарное время в мс) на момент
+    начала ответа.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = RequestStats()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and settings.DB_QUERY_HEADERS:
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"x-db-queries", str(stats.db_queries).encode()),
+                    (b"x-db-time", f"{stats.db_seconds * 1000:.1f}".encode()),
+                ]
+            await send(message)
+
+        scope_token = _scope.set(scope)
+        stats_token = _stats.set(stats)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _stats.reset(stats_token)
+            _scope.reset(scope_token)
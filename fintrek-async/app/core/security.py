@@ -4,9 +4,13 @@
 """
 from datetime import datetime, timedelta
 from typing import Optional, Union
+import hashlib
+import time
 from jose import jwt, JWTError
 from passlib.context import CryptContext
 from app.core.config import settings
+from app.core.ttl_cache import TTLCache
+from app.core.password_hashing import password_hashing_pool
 
 # Контекст для хеширования паролей с использованием bcrypt
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -39,6 +43,26 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Проверка пароля в пуле хеширования, не блокируя event loop
+    
+    Raises:
+        PasswordHashingBusy: Очередь пула переполнена
+    """
+    return await password_hashing_pool.run(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """
+    Хеширование пароля в пуле хеширования, не блокируя event loop
+    
+    Raises:
+        PasswordHashingBusy: Очередь пула переполнена
+    """
+    return await password_hashing_pool.run(get_password_hash, password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """
     Создание JWT access токена
@@ -97,6 +121,34 @@ def decode_token(token: str) -> Optional[dict]:
         return None
 
 
+# Декодированные токены по SHA-256 токена; запись живет до exp токена
+_token_cache: TTLCache[dict] = TTLCache(maxsize=settings.TOKEN_CACHE_SIZE, ttl_seconds=0)
+
+
+def decode_token_cached(token: str) -> Optional[dict]:
+    """
+    Декодирование JWT токена с кэшированием результата
+    
+    Проверка подписи выполняется один раз на токен, повторные запросы
+    с тем же токеном получают payload из памяти до истечения срока токена.
+    
+    Args:
+        token: JWT токен
+        
+    Returns:
+        Словарь с данными из токена или None в случае ошибки
+    """
+    key = hashlib.sha256(token.encode()).digest()
+    payload = _token_cache.get(key)
+    if payload is not None:
+        return payload
+    
+    payload = decode_token(token)
+    if payload is not None and "exp" in payload:
+        _token_cache.set(key, payload, ttl_seconds=payload["exp"] - time.time())
+    return payload
+
+
 from cryptography.fernet import Fernet
 import base64
 
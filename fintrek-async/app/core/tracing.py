@@ -0,0 +1,364 @@
+"""
+Трассировка запросов (совместимая с OpenTelemetry)
+
+Спаны создаются для HTTP-запросов к API, SQL-запросов, обращений
+fastapi-cache к Redis, HTTP-вызовов банков и фоновых задач. Контекст
+передается в формате W3C traceparent: из входящего заголовка, в
+исходящие запросы к банкам и через очередь задач (jobs.trace_parent),
+поэтому синхронизация, запущенная из запроса, попадает в его трассу.
+
+Завершенные спаны пишутся в TRACING_FILE в формате OTLP JSON (одна
+строка - один ExportTraceServiceRequest), как у file exporter
+OpenTelemetry Collector. Файл можно загрузить в Jaeger/Tempo через
+коллектор с otlpjsonfile receiver или разобрать напрямую.
+"""
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from contextlib import contextmanager
+from contextvars import ContextVar
+import json
+import logging
+import os
+import random
+import re
+import secrets
+import time
+
+import httpx
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+from app.core.request_context import current_route
+
+logger = logging.getLogger(__name__)
+
+# SpanKind из спецификации OTLP
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+SPAN_KIND_CONSUMER = 5
+
+# Status.code из спецификации OTLP
+STATUS_UNSET = 0
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+# Буфер спанов перед записью в файл
+EXPORT_BATCH_SIZE = 256
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+
+class Span:
+    """Спан трассы"""
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent_span_id: Optional[str],
+        kind: int,
+        sampled: bool,
+        attributes: Optional[Dict[str, Any]] = None,
+        local_root: bool = False
+    ):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_span_id = parent_span_id
+        self.kind = kind
+        self.sampled = sampled
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.local_root = local_root  # Первый спан трассы в этом процессе
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.status_code = STATUS_UNSET
+        self.status_message: Optional[str] = None
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def record_error(self, error: BaseException) -> None:
+        self.status_code = STATUS_ERROR
+        self.status_message = f"{type(error).__name__}: {error}"
+
+    def to_otlp(self) -> Dict[str, Any]:
+        data = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or self.start_ns),
+            "attributes": _otlp_attributes(self.attributes),
+            "status": {"code": self.status_code},
+        }
+        if self.parent_span_id:
+            data["parentSpanId"] = self.parent_span_id
+        if self.status_message:
+            data["status"]["message"] = self.status_message
+        return data
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items() if value is not None]
+
+
+class OtlpJsonFileExporter:
+    """Пишет спаны в файл в формате OTLP JSON, по строке на пачку"""
+
+    def __init__(self, path: str, service_name: str):
+        self.path = path
+        self.service_name = service_name
+        self._buffer: List[Span] = []
+
+    def export(self, span: Span, flush: bool = False) -> None:
+        self._buffer.append(span)
+        if flush or len(self._buffer) >= EXPORT_BATCH_SIZE:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._buffer:
+            return
+        spans, self._buffer = self._buffer, []
+        line = json.dumps({
+            "resourceSpans": [{
+                "resource": {"attributes": _otlp_attributes({"service.name": self.service_name})},
+                "scopeSpans": [{
+                    "scope": {"name": "app.core.tracing"},
+                    "spans": [span.to_otlp() for span in spans],
+                }],
+            }]
+        }, ensure_ascii=False)
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        except OSError as e:
+            logger.warning(f"Failed to export {len(spans)} spans to {self.path}: {e}")
+
+
+exporter = OtlpJsonFileExporter(settings.TRACING_FILE, settings.TRACING_SERVICE_NAME)
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def current_traceparent() -> Optional[str]:
+    """traceparent текущего спана для передачи дальше (в задачу, в банк) или None"""
+    span = _current_span.get()
+    return span.traceparent if span is not None else None
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[Tuple[str, str, bool]]:
+    """
+    Разобрать заголовок traceparent
+
+    Returns:
+        (trace_id, parent_span_id, sampled) или None, если значение некорректно
+    """
+    match = _TRACEPARENT.match((value or "").strip().lower())
+    if not match:
+        return None
+    trace_id, span_id, flags = match.groups()
+    if trace_id == "0" * 32 or span_id == "0" * 16:
+        return None
+    return trace_id, span_id, bool(int(flags, 16) & 1)
+
+
+def start_span(
+    name: str,
+    kind: int = SPAN_KIND_INTERNAL,
+    attributes: Optional[Dict[str, Any]] = None,
+    traceparent: Optional[str] = None
+) -> Optional[Span]:
+    """
+    Начать спан (не делая его текущим)
+
+    Родитель - traceparent, если передан, иначе текущий спан. Без
+    родителя начинается новая трасса с вероятностью TRACING_SAMPLE_RATIO.
+
+    Returns:
+        Span или None, если трассировка выключена
+    """
+    if not settings.TRACING_ENABLED:
+        return None
+    remote = parse_traceparent(traceparent)
+    if remote is not None:
+        trace_id, parent_id, sampled = remote
+        return Span(name, trace_id, parent_id, kind, sampled, attributes, local_root=True)
+    parent = _current_span.get()
+    if parent is not None:
+        return Span(name, parent.trace_id, parent.span_id, kind, parent.sampled, attributes)
+    sampled = random.random() < settings.TRACING_SAMPLE_RATIO
+    return Span(name, secrets.token_hex(16), None, kind, sampled, attributes, local_root=True)
+
+
+def end_span(span: Optional[Span], error: Optional[BaseException] = None) -> None:
+    """Завершить спан и передать его экспортеру (если трасса сэмплирована)"""
+    if span is None:
+        return
+    if error is not None:
+        span.record_error(error)
+    span.end_ns = time.time_ns()
+    if span.sampled:
+        exporter.export(span, flush=span.local_root)
+
+
+@contextmanager
+def _activated(span: Optional[Span]) -> Iterator[Optional[Span]]:
+    """Сделать спан текущим на время блока и завершить его (с ошибкой, если блок упал)"""
+    if span is None:
+        yield None
+        return
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        end_span(span, e)
+        raise
+    else:
+        end_span(span)
+    finally:
+        _current_span.reset(token)
+
+
+def traced(
+    name: str,
+    kind: int = SPAN_KIND_INTERNAL,
+    attributes: Optional[Dict[str, Any]] = None,
+    traceparent: Optional[str] = None
+):
+    """
+    Выполнить блок в спане, который на это время становится текущим
+
+    Работает и в async-коде: текущий спан хранится в contextvars.
+    Значение with - Span или None, если трассировка выключена.
+    """
+    return _activated(start_span(name, kind, attributes, traceparent))
+
+
+def _child_span(name: str, kind: int, attributes: Dict[str, Any]) -> Optional[Span]:
+    """Спан только внутри сэмплированной трассы (SQL, Redis, HTTP без контекста не трассируются)"""
+    parent = _current_span.get()
+    if parent is None or not parent.sampled:
+        return None
+    return start_span(name, kind, attributes)
+
+
+def child_span(name: str, kind: int = SPAN_KIND_CLIENT, attributes: Optional[Dict[str, Any]] = None):
+    """Блок в дочернем спане текущей трассы; вне трассы ничего не делает"""
+    return _activated(_child_span(name, kind, attributes or {}))
+
+
+class TracingMiddleware:
+    """ASGI middleware: серверный спан на каждый HTTP-запрос"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.TRACING_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers", []))
+        incoming = headers.get(b"traceparent")
+        with traced(
+            f"{scope['method']} {scope['path']}",
+            kind=SPAN_KIND_SERVER,
+            attributes={"http.request.method": scope["method"], "url.path": scope["path"]},
+            traceparent=incoming.decode("latin-1") if incoming else None
+        ) as span:
+
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.response.status_code", message["status"])
+                    if message["status"] >= 500:
+                        span.status_code = STATUS_ERROR
+                    message["headers"] = [*message.get("headers", []), (b"x-trace-id", span.trace_id.encode())]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                # Маршрут известен только после роутинга
+                route = current_route()
+                if route and route != "unmatched":
+                    span.name = f"{scope['method']} {route}"
+                    span.set_attribute("http.route", route)
+
+
+class TracingTransport(httpx.AsyncBaseTransport):
+    """Транспорт httpx: клиентский спан и заголовок traceparent на каждый запрос"""
+
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self._transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        with child_span(
+            f"HTTP {request.method}",
+            attributes={
+                "http.request.method": request.method,
+                "server.address": request.url.host,
+                "url.path": request.url.path,
+            }
+        ) as span:
+            if span is None:
+                return await self._transport.handle_async_request(request)
+            request.headers["traceparent"] = span.traceparent
+            response = await self._transport.handle_async_request(request)
+            span.set_attribute("http.response.status_code", response.status_code)
+            if response.status_code >= 500:
+                span.status_code = STATUS_ERROR
+            return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+def trace_queries(engine: AsyncEngine) -> None:
+    """
+    Спаны для SQL-запросов engine (внутри сэмплированных трасс)
+
+    Args:
+        engine: Асинхронный engine
+    """
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _before_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+        span = _child_span("db.query", SPAN_KIND_CLIENT, {
+            "db.system": "postgresql",
+            "db.operation.name": statement.split(None, 1)[0].upper() if statement.strip() else None,
+            "db.query.text": statement[:1000],
+        })
+        conn.info.setdefault("trace_spans", []).append(span)
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _after_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+        end_span(conn.info["trace_spans"].pop())
+
+    @event.listens_for(engine.sync_engine, "handle_error")
+    def _on_error(exception_context) -> None:
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("trace_spans"):
+            end_span(conn.info["trace_spans"].pop(), exception_context.original_exception)
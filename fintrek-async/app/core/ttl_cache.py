@@ -0,0 +1,65 @@
+"""
+In-process LRU кэш с временем жизни записей
+"""
+from typing import Any, Generic, Hashable, Optional, TypeVar
+from collections import OrderedDict
+import time
+
+V = TypeVar("V")
+
+
+class TTLCache(Generic[V]):
+    """
+    LRU кэш с ограничением размера и временем жизни каждой записи
+
+    Не потокобезопасен: рассчитан на один event loop.
+    """
+
+    def __init__(self, maxsize: int, ttl_seconds: float):
+        """
+        Args:
+            maxsize: Максимум записей, старые вытесняются
+            ttl_seconds: Время жизни записи по умолчанию
+        """
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[V]:
+        """Получить значение или None, если записи нет или она истекла"""
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: V, ttl_seconds: Optional[float] = None) -> None:
+        """
+        Сохранить значение
+
+        Args:
+            key: Ключ
+            value: Значение
+            ttl_seconds: Время жизни (по умолчанию ttl_seconds кэша)
+        """
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        """Удалить запись"""
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -0,0 +1,138 @@
+"""
+Метрики пула соединений с БД
+
+Считает выдачи соединений, время ожидания свободного соединения и
+таймауты пула, а также хранит, какая операция (маршрут API или фоновая
+задача) держит каждое выданное соединение. При таймауте пула в лог
+пишется, кто занимает соединения.
+"""
+from typing import Any, Dict, Optional, Tuple
+from collections import Counter
+import logging
+import time
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.request_context import current_operation
+
+logger = logging.getLogger(__name__)
+
+# Сколько самых долгих держателей показывать в статистике и в логе
+TOP_HOLDERS = 20
+
+
+class PoolMetrics:
+    """Накопленные метрики и текущие держатели соединений одного пула"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        # id записи пула -> (операция, момент выдачи по time.monotonic)
+        self._holders: Dict[int, Tuple[str, float]] = {}
+
+    def record_wait(self, seconds: float) -> None:
+        self.wait_seconds_total += seconds
+        self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def record_timeout(self, seconds: float) -> None:
+        self.timeouts += 1
+        self.record_wait(seconds)
+        logger.warning(
+            f"DB pool '{self.name}' timed out after {seconds:.2f}s; "
+            f"holders by operation: {dict(self.holders_by_operation())}"
+        )
+
+    def checkout(self, record_id: int) -> None:
+        self.checkouts += 1
+        self._holders[record_id] = (current_operation(), time.monotonic())
+
+    def checkin(self, record_id: int) -> None:
+        self._holders.pop(record_id, None)
+
+    def holders_by_operation(self) -> Counter:
+        return Counter(operation for operation, _ in self._holders.values())
+
+    def stats(self, pool: Any) -> Dict[str, Any]:
+        """
+        Текущее состояние пула и накопленные метрики
+
+        Args:
+            pool: Пул engine (engine.pool)
+        """
+        now = time.monotonic()
+        holders = sorted(
+            ({"operation": operation, "held_ms": round((now - since) * 1000, 1)}
+             for operation, since in self._holders.values()),
+            key=lambda holder: holder["held_ms"],
+            reverse=True
+        )
+        waits = self.checkouts + self.timeouts
+        return {
+            "pool": self.name,
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": pool.overflow(),
+            "timeout_seconds": pool.timeout(),
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_ms_avg": round(self.wait_seconds_total / waits * 1000, 2) if waits else 0.0,
+            "wait_ms_max": round(self.wait_seconds_max * 1000, 2),
+            "holders_by_operation": dict(self.holders_by_operation()),
+            "longest_holders": holders[:TOP_HOLDERS],
+        }
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool, замеряющий ожидание свободного соединения"""
+
+    metrics: Optional[PoolMetrics] = None
+
+    def _do_get(self):
+        started = time.monotonic()
+        try:
+            record = super()._do_get()
+        except PoolTimeoutError:
+            if self.metrics is not None:
+                self.metrics.record_timeout(time.monotonic() - started)
+            raise
+        if self.metrics is not None:
+            self.metrics.record_wait(time.monotonic() - started)
+        return record
+
+    def recreate(self):
+        # engine.dispose() пересоздает пул: метрики переходят в новый
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+def instrument_engine(engine: AsyncEngine, name: str) -> PoolMetrics:
+    """
+    Подключить метрики к пулу engine
+
+    Args:
+        engine: Engine с poolclass=InstrumentedQueuePool
+        name: Имя пула в статистике и логах
+
+    Returns:
+        PoolMetrics этого пула
+    """
+    metrics = PoolMetrics(name)
+    engine.pool.metrics = metrics
+
+    @event.listens_for(engine.sync_engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy) -> None:
+        metrics.checkout(id(connection_record))
+
+    @event.listens_for(engine.sync_engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record) -> None:
+        metrics.checkin(id(connection_record))
+
+    return metrics
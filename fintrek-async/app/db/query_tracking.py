@@ -0,0 +1,71 @@
+"""
+Учет SQL-запросов текущего HTTP-запроса
+
+События engine считают выполненные statements и время их выполнения в
+RequestStats запроса (см. app.core.request_context). Вне HTTP-запроса
+(фоновые задачи) ничего не считается.
+
+Если один и тот же statement (текст с плейсхолдерами, без значений
+параметров) за запрос выполняется больше DB_REPEATED_QUERY_THRESHOLD
+раз, в лог пишется предупреждение: обычно это запрос в цикле по строкам
+(N+1).
+"""
+import logging
+import time
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+from app.core.request_context import RequestStats, current_operation, current_request_stats
+
+logger = logging.getLogger(__name__)
+
+
+def record_statement(stats: RequestStats, statement: str, seconds: float) -> None:
+    """
+    Учесть выполненный statement в счетчиках запроса
+
+    Args:
+        stats: Счетчики текущего запроса
+        statement: Текст SQL с плейсхолдерами
+        seconds: Время выполнения
+    """
+    stats.db_queries += 1
+    stats.db_seconds += seconds
+    stats.statements[statement] += 1
+    threshold = settings.DB_REPEATED_QUERY_THRESHOLD
+    # Предупреждение один раз на statement за запрос
+    if threshold and stats.statements[statement] == threshold + 1:
+        shape = " ".join(statement.split())
+        logger.warning(
+            f"Repeated SQL statement in {current_operation()}: executed more than {threshold} times "
+            f"(possible N+1): {shape[:300]}"
+        )
+
+
+def instrument_queries(engine: AsyncEngine) -> None:
+    """
+    Подключить учет запросов к engine
+
+    Args:
+        engine: Асинхронный engine
+    """
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _before_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _after_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+        started = conn.info["query_started"].pop()
+        stats = current_request_stats()
+        if stats is not None:
+            record_statement(stats, statement, time.perf_counter() - started)
+
+    @event.listens_for(engine.sync_engine, "handle_error")
+    def _on_error(exception_context) -> None:
+        # after_cursor_execute не вызывается, если statement упал
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_started"):
+            conn.info["query_started"].pop()
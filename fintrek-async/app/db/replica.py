@@ -0,0 +1,113 @@
+"""
+Выбор между репликой и primary для запросов чтения
+
+Запрос идет на реплику, если она настроена, ее отставание не больше
+DB_REPLICA_MAX_LAG_SECONDS и пользователь не писал данные за последние
+DB_REPLICA_MAX_LAG_SECONDS секунд (иначе он может не увидеть свои же
+изменения). Во всех остальных случаях, включая недоступный Redis,
+используется primary.
+"""
+from typing import Any, Dict, Optional
+import asyncio
+import logging
+import math
+import time
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.data_version import get_data_version
+from app.db.session import read_engine
+
+logger = logging.getLogger(__name__)
+
+# Отставание реплики в секундах; 0, если реплика применила все полученное
+# (иначе на простаивающем primary отставание росло бы бесконечно)
+_LAG_QUERY = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+class ReplicaRouter:
+    """Решает, можно ли выполнить чтение пользователя на реплике"""
+
+    def __init__(self):
+        self._lag_seconds = math.inf
+        self._checked_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+        # Метрики маршрутизации
+        self.replica_reads = 0
+        self.primary_recent_write = 0
+        self.primary_lagging = 0
+
+    @property
+    def enabled(self) -> bool:
+        return read_engine is not None
+
+    async def replica_lag(self) -> float:
+        """
+        Отставание реплики в секундах (перепроверяется раз в DB_REPLICA_LAG_CHECK_SECONDS)
+
+        Returns:
+            Отставание или math.inf, если реплика недоступна
+        """
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < settings.DB_REPLICA_LAG_CHECK_SECONDS:
+            return self._lag_seconds
+        async with self._lock:
+            # Пока ждали блокировку, другой запрос мог уже проверить
+            if self._checked_at is not None and time.monotonic() - self._checked_at < settings.DB_REPLICA_LAG_CHECK_SECONDS:
+                return self._lag_seconds
+            try:
+                async with read_engine.connect() as conn:
+                    self._lag_seconds = float(await conn.scalar(_LAG_QUERY))
+            except Exception as e:
+                logger.warning(f"Replica lag check failed: {e}")
+                self._lag_seconds = math.inf
+            self._checked_at = time.monotonic()
+        return self._lag_seconds
+
+    async def use_replica(self, user_id: Any) -> bool:
+        """
+        Можно ли читать данные пользователя с реплики
+
+        Args:
+            user_id: ID пользователя
+
+        Returns:
+            True - реплика, False - primary
+        """
+        if not self.enabled:
+            return False
+
+        if await self.replica_lag() > settings.DB_REPLICA_MAX_LAG_SECONDS:
+            self.primary_lagging += 1
+            return False
+
+        data_version = await get_data_version(user_id)
+        if data_version is None or time.time() - data_version.written_at < settings.DB_REPLICA_MAX_LAG_SECONDS:
+            self.primary_recent_write += 1
+            return False
+
+        self.replica_reads += 1
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """Состояние реплики и счетчики маршрутизации"""
+        return {
+            "enabled": self.enabled,
+            "lag_seconds": None if not self.enabled or math.isinf(self._lag_seconds) else round(self._lag_seconds, 3),
+            "max_lag_seconds": settings.DB_REPLICA_MAX_LAG_SECONDS,
+            "replica_reads": self.replica_reads,
+            "primary_recent_write": self.primary_recent_write,
+            "primary_lagging": self.primary_lagging,
+        }
+
+
+# Singleton instance
+replica_router = ReplicaRouter()
@@ -1,21 +1,118 @@
 """
 Асинхронная сессия базы данных
+
+Сессия берет соединение из пула только на первом запросе к БД
+(autobegin SQLAlchemy), поэтому запросы, обслуженные из кэша, пул не
+занимают. Запросы без изменений не выполняют COMMIT при завершении:
+соединение просто возвращается в пул.
+
+Если задан DB_REPLICA_URL, создается отдельный engine реплики для
+запросов только на чтение (см. get_read_db в app/api/v1/deps.py).
 """
+from typing import Any, Dict
+from uuid import uuid4
+
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session, ORMExecuteState
 from app.core.config import settings
+from app.core.data_version import bump_data_version
+from app.db.pool_metrics import InstrumentedQueuePool, instrument_engine
+from app.core.tracing import trace_queries
+from app.db.query_tracking import instrument_queries
+
+
+def _engine_options() -> Dict[str, Any]:
+    """
+    Параметры create_async_engine из настроек пула
+
+    В режиме PgBouncer (transaction mode) соседние транзакции попадают
+    на разные серверные соединения, поэтому prepared statements нельзя
+    кэшировать, а их имена должны быть уникальными.
+    """
+    if settings.DB_PGBOUNCER:
+        connect_args = {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+    else:
+        connect_args = {
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        }
+    return {
+        "echo": False,
+        "future": True,
+        "pool_pre_ping": True,
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "connect_args": connect_args,
+    }
+
 
 # Создаем асинхронный engine
-engine = create_async_engine(
-    settings.ASYNC_DATABASE_URL,
-    echo=False,
-    future=True,
-    pool_pre_ping=True
-)
+engine = create_async_engine(settings.ASYNC_DATABASE_URL, **_engine_options())
+pool_metrics = instrument_engine(engine, "primary")
+instrument_queries(engine)
+trace_queries(engine)
+
+
+class TrackedSession(Session):
+    """Session, которая помнит, были ли в текущей транзакции изменения"""
+    pass
+
+
+@event.listens_for(TrackedSession, "do_orm_execute")
+def _track_write_statement(orm_execute_state: ORMExecuteState) -> None:
+    # insert/update/delete и text() считаются записью
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info["has_writes"] = True
+
+
+@event.listens_for(TrackedSession, "after_flush")
+def _track_flush(session: Session, flush_context) -> None:
+    session.info["has_writes"] = True
+
+
+@event.listens_for(TrackedSession, "after_commit")
+def _commit_writes(session: Session) -> None:
+    # Зафиксированные изменения увеличивают версию данных пользователя (см. get_db)
+    if session.info.pop("has_writes", None):
+        session.info["committed_writes"] = True
+
+
+@event.listens_for(TrackedSession, "after_rollback")
+def _reset_writes(session: Session) -> None:
+    session.info.pop("has_writes", None)
+
+
+def session_has_writes(session: AsyncSession) -> bool:
+    """
+    Есть ли в сессии изменения, которые нужно зафиксировать
+
+    Args:
+        session: Асинхронная сессия
+
+    Returns:
+        True, если выполнялась запись или есть несброшенные объекты
+    """
+    return bool(
+        session.info.get("has_writes")
+        or session.new
+        or session.dirty
+        or session.deleted
+    )
+
 
 # Создаем фабрику асинхронных сессий
 AsyncSessionLocal = async_sessionmaker(
     engine,
     class_=AsyncSession,
+    sync_session_class=TrackedSession,
     expire_on_commit=False,
     autocommit=False,
     autoflush=False
@@ -25,13 +122,39 @@ AsyncSessionLocal = async_sessionmaker(
 async def get_db():
     """
     Зависимость для получения асинхронной сессии БД
+
+    Соединение берется из пула при первом запросе. COMMIT выполняется,
+    только если в сессии были изменения; после чистого чтения сессия
+    закрывается, и пул сбрасывает транзакцию при возврате соединения.
+    Если изменения были зафиксированы, а пользователь запроса известен
+    (session.info["user_id"], см. get_current_user), увеличивается
+    версия его данных.
     """
     async with AsyncSessionLocal() as session:
         try:
             yield session
-            await session.commit()
+            if session_has_writes(session):
+                await session.commit()
         except Exception:
             await session.rollback()
             raise
         finally:
             await session.close()
+        user_id = session.info.get("user_id")
+        if user_id is not None and session.info.pop("committed_writes", False):
+            await bump_data_version(user_id)
+
+
+# Реплика для тяжелых чтений (аналитика, AI). Без DB_REPLICA_URL все запросы идут на primary
+read_engine = create_async_engine(settings.DB_REPLICA_URL, **_engine_options()) if settings.DB_REPLICA_URL else None
+read_pool_metrics = instrument_engine(read_engine, "replica") if read_engine is not None else None
+if read_engine is not None:
+    instrument_queries(read_engine)
+    trace_queries(read_engine)
+ReadSessionLocal = async_sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autocommit=False,
+    autoflush=False
+) if read_engine is not None else None
@@ -1,21 +1,43 @@
 """
 Главный файл FastAPI приложения
 """
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, Header, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, PlainTextResponse
 from contextlib import asynccontextmanager
+from typing import Optional
+import hmac
+import os
 
 from app.core.config import settings
 from app.api.v1.api import api_router
 from app.core.cache import init_cache, close_cache
+from app.core.compression import CompressionMiddleware
+from app.core.loop_monitor import event_loop_monitor
+from app.core.metrics import MetricsMiddleware, registry
+from app.core.password_hashing import password_hashing_pool, PasswordHashingBusy
+from app.core.profiling import ProfilingMiddleware, profile_path, profiling_requested
+from app.core.request_context import RequestContextMiddleware
+from app.core.responses import ORJSONResponse
+from app.core.tracing import TracingMiddleware, exporter as span_exporter
+from app.db.replica import replica_router
+from app.db.session import engine, pool_metrics, read_engine, read_pool_metrics
+from app.services.job_queue import job_queue
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Управление жизненным циклом приложения"""
     # Стартуем
     await init_cache()
+    job_queue.start()
+    if settings.LOOP_LAG_MONITOR_ENABLED:
+        event_loop_monitor.start()
     yield
     # Завершаем
+    await event_loop_monitor.stop()
+    await job_queue.stop()
+    password_hashing_pool.shutdown()
+    span_exporter.flush()
     await close_cache()
 
 # Создание экземпляра FastAPI приложения
@@ -46,6 +68,8 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     lifespan=lifespan,
+    # Сериализация ответов через orjson (см. app/core/responses.py)
+    default_response_class=ORJSONResponse,
     contact={
         "name": "Команда Финтрек",
         "email": "support@fintrek.com"
@@ -64,10 +88,68 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Сжатие ответов (внутри метрик: время сжатия входит в задержку запроса)
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
+# Метрики запросов (внутри контекста запроса, см. RequestContextMiddleware)
+app.add_middleware(MetricsMiddleware)
+
+# Спан на каждый запрос (TRACING_ENABLED)
+app.add_middleware(TracingMiddleware)
+
+# Контекст запроса (маршрут, счетчики) для метрик
+app.add_middleware(RequestContextMiddleware)
+
+# Профилирование запросов по заголовку X-Profile (снаружи, чтобы учесть и middleware)
+app.add_middleware(ProfilingMiddleware)
+
 # Подключение роутеров
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
 
+def _collect_runtime_metrics():
+    """Состояние пулов соединений и хеширования паролей на момент запроса /metrics"""
+    pools = [("primary", pool_metrics, engine)]
+    if read_engine is not None:
+        pools.append(("replica", read_pool_metrics, read_engine))
+    pool_stats = [(name, metrics.stats(db_engine.pool)) for name, metrics, db_engine in pools]
+    hashing = password_hashing_pool.stats()
+    return [
+        ("db_pool_size", "gauge", "Configured DB pool size",
+         [("db_pool_size", {"pool": name}, stats["size"]) for name, stats in pool_stats]),
+        ("db_pool_checked_out", "gauge", "DB connections currently checked out",
+         [("db_pool_checked_out", {"pool": name}, stats["checked_out"]) for name, stats in pool_stats]),
+        ("db_pool_overflow", "gauge", "DB connections open above the pool size",
+         [("db_pool_overflow", {"pool": name}, stats["overflow"]) for name, stats in pool_stats]),
+        ("db_pool_checkouts_total", "counter", "DB connection checkouts",
+         [("db_pool_checkouts_total", {"pool": name}, metrics.checkouts) for name, metrics, _ in pools]),
+        ("db_pool_timeouts_total", "counter", "DB pool checkout timeouts",
+         [("db_pool_timeouts_total", {"pool": name}, metrics.timeouts) for name, metrics, _ in pools]),
+        ("db_pool_wait_seconds_total", "counter", "Time spent waiting for a DB connection",
+         [("db_pool_wait_seconds_total", {"pool": name}, metrics.wait_seconds_total) for name, metrics, _ in pools]),
+        ("password_hashing_in_flight", "gauge", "Password hashing tasks running",
+         [("password_hashing_in_flight", {}, hashing["in_flight"])]),
+        ("password_hashing_queued", "gauge", "Password hashing tasks waiting for a worker",
+         [("password_hashing_queued", {}, hashing["queued"])]),
+        ("password_hashing_rejected_total", "counter", "Password hashing tasks rejected with 503",
+         [("password_hashing_rejected_total", {}, hashing["rejected"])]),
+    ]
+
+
+registry.add_collector(_collect_runtime_metrics)
+
+
+@app.exception_handler(PasswordHashingBusy)
+async def password_hashing_busy_handler(request: Request, exc: PasswordHashingBusy):
+    """Очередь хеширования паролей переполнена - быстрый отказ вместо ожидания"""
+    return ORJSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Сервис временно перегружен, повторите попытку позже"},
+        headers={"Retry-After": "1"}
+    )
+
+
 @app.get("/")
 async def root():
     """Корневой эндпоинт для проверки работоспособности API"""
@@ -82,3 +164,56 @@ async def root():
 async def health_check():
     """Health check эндпоинт"""
     return {"status": "healthy"}
+
+
+@app.get("/health/password-hashing")
+async def password_hashing_health():
+    """Метрики пула хеширования паролей"""
+    return password_hashing_pool.stats()
+
+
+def require_ops_token(x_ops_token: Optional[str] = Header(None)) -> None:
+    """
+    Доступ к диагностике с внутренними деталями только с X-Ops-Token, равным OPS_TOKEN
+
+    Без OPS_TOKEN такие эндпоинты закрыты.
+    """
+    if not settings.OPS_TOKEN or not x_ops_token or not hmac.compare_digest(x_ops_token, settings.OPS_TOKEN):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Доступ запрещен")
+
+
+@app.get("/health/event-loop", dependencies=[Depends(require_ops_token)])
+async def event_loop_health():
+    """Задержка event loop и стеки последних блокировок"""
+    return event_loop_monitor.stats()
+
+
+@app.get("/health/db-pool", dependencies=[Depends(require_ops_token)])
+async def db_pool_health():
+    """Метрики пулов соединений с БД (primary и реплики) и операции, которые держат соединения"""
+    return {
+        "primary": pool_metrics.stats(engine.pool),
+        "replica": read_pool_metrics.stats(read_engine.pool) if read_engine is not None else None,
+        "replica_routing": replica_router.stats(),
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Метрики процесса в текстовом формате Prometheus"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/debug/profiles/{profile_id}", response_class=PlainTextResponse)
+async def get_profile(profile_id: str, x_profile: Optional[str] = Header(None)):
+    """
+    Профиль запроса в формате folded stacks (для flamegraph.pl / speedscope)
+
+    Доступен с тем же заголовком X-Profile, которым запрошено профилирование.
+    """
+    if not profiling_requested(x_profile):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Доступ запрещен")
+    path = profile_path(profile_id)
+    if path is None or not os.path.exists(path):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Профиль не найден")
+    return FileResponse(path, media_type="text/plain; charset=utf-8")
@@ -1,7 +1,7 @@
 """
 Прогностическая модель для предсказания будущих доходов и расходов
 """
-from typing import Dict, List
+from typing import Dict, Iterable, List, Tuple
 from datetime import datetime, timedelta
 from decimal import Decimal
 from sqlalchemy.orm import Session
@@ -13,6 +13,135 @@ from app.models.transaction import Transaction, TransactionType
 logger = logging.getLogger(__name__)
 
 
+def monthly_totals(transactions: Iterable[Tuple[datetime, float]]) -> List[float]:
+    """
+    Суммы по календарным месяцам в хронологическом порядке
+
+    То же, что group by date_trunc('month', transaction_date) в SQL;
+    месяцы без транзакций пропускаются.
+
+    Args:
+        transactions: Пары (дата, сумма)
+    """
+    totals: Dict[Tuple[int, int], float] = {}
+    for date, amount in transactions:
+        key = (date.year, date.month)
+        totals[key] = totals.get(key, 0.0) + float(amount)
+    return [totals[key] for key in sorted(totals)]
+
+
+def forecast_spending(spending_values: List[float]) -> Dict:
+    """
+    Прогноз расходов на следующий месяц по помесячным суммам
+
+    Args:
+        spending_values: Расходы по месяцам, от старых к новым
+
+    Returns:
+        Прогноз расходов
+    """
+    if not spending_values:
+        return {
+            'forecast': 0,
+            'confidence': 'low',
+            'message': 'Недостаточно данных для прогноза'
+        }
+    
+    # Простое скользящее среднее
+    avg_spending = sum(spending_values) / len(spending_values)
+    
+    # Вычислить тренд (линейная регрессия)
+    if len(spending_values) >= 3:
+        # Простая линейная регрессия
+        n = len(spending_values)
+        x = list(range(n))
+        y = spending_values
+        
+        x_mean = sum(x) / n
+        y_mean = sum(y) / n
+        
+        numerator = sum((x[i] - x_mean) * (y[i] - y_mean) for i in range(n))
+        denominator = sum((x[i] - x_mean) ** 2 for i in range(n))
+        
+        if denominator != 0:
+            slope = numerator / denominator
+            intercept = y_mean - slope * x_mean
+            
+            # Прогноз на следующий месяц
+            next_month_forecast = slope * n + intercept
+        else:
+            next_month_forecast = avg_spending
+    else:
+        next_month_forecast = avg_spending
+    
+    # Определить уровень уверенности
+    if len(spending_values) >= 6:
+        confidence = 'high'
+    elif len(spending_values) >= 3:
+        confidence = 'medium'
+    else:
+        confidence = 'low'
+    
+    # Вычислить диапазон прогноза (±15%)
+    lower_bound = next_month_forecast * 0.85
+    upper_bound = next_month_forecast * 1.15
+    
+    return {
+        'forecast': round(next_month_forecast, 2),
+        'lower_bound': round(lower_bound, 2),
+        'upper_bound': round(upper_bound, 2),
+        'confidence': confidence,
+        'historical_average': round(avg_spending, 2),
+        'trend': 'increasing' if next_month_forecast > avg_spending else 'decreasing',
+        'data_points': len(spending_values)
+    }
+
+
+def forecast_income(income_values: List[float]) -> Dict:
+    """
+    Прогноз дохода на следующий месяц по помесячным суммам
+
+    Args:
+        income_values: Доходы по месяцам, от старых к новым
+
+    Returns:
+        Прогноз дохода
+    """
+    if not income_values:
+        return {
+            'forecast': 0,
+            'confidence': 'low',
+            'message': 'Недостаточно данных для прогноза'
+        }
+    
+    # Среднее значение
+    avg_income = sum(income_values) / len(income_values)
+    
+    # Для дохода обычно используем медиану, так как она менее чувствительна к выбросам
+    sorted_income = sorted(income_values)
+    n = len(sorted_income)
+    
+    if n % 2 == 0:
+        median_income = (sorted_income[n//2 - 1] + sorted_income[n//2]) / 2
+    else:
+        median_income = sorted_income[n//2]
+    
+    # Определить уровень уверенности
+    if len(income_values) >= 6:
+        confidence = 'high'
+    elif len(income_values) >= 3:
+        confidence = 'medium'
+    else:
+        confidence = 'low'
+    
+    return {
+        'forecast': round(median_income, 2),
+        'average': round(avg_income, 2),
+        'confidence': confidence,
+        'data_points': len(income_values)
+    }
+
+
 class ForecastingModel:
     """Модель прогнозирования финансовых показателей"""
     
@@ -47,62 +176,7 @@ class ForecastingModel:
             )
         ).group_by('month').order_by('month').all()
         
-        if not monthly_spending:
-            return {
-                'forecast': 0,
-                'confidence': 'low',
-                'message': 'Недостаточно данных для прогноза'
-            }
-        
-        # Простое скользящее среднее
-        spending_values = [float(total) for _, total in monthly_spending]
-        avg_spending = sum(spending_values) / len(spending_values)
-        
-        # Вычислить тренд (линейная регрессия)
-        if len(spending_values) >= 3:
-            # Простая линейная регрессия
-            n = len(spending_values)
-            x = list(range(n))
-            y = spending_values
-            
-            x_mean = sum(x) / n
-            y_mean = sum(y) / n
-            
-            numerator = sum((x[i] - x_mean) * (y[i] - y_mean) for i in range(n))
-            denominator = sum((x[i] - x_mean) ** 2 for i in range(n))
-            
-            if denominator != 0:
-                slope = numerator / denominator
-                intercept = y_mean - slope * x_mean
-                
-                # Прогноз на следующий месяц
-                next_month_forecast = slope * n + intercept
-            else:
-                next_month_forecast = avg_spending
-        else:
-            next_month_forecast = avg_spending
-        
-        # Определить уровень уверенности
-        if len(spending_values) >= 6:
-            confidence = 'high'
-        elif len(spending_values) >= 3:
-            confidence = 'medium'
-        else:
-            confidence = 'low'
-        
-        # Вычислить диапазон прогноза (±15%)
-        lower_bound = next_month_forecast * 0.85
-        upper_bound = next_month_forecast * 1.15
-        
-        return {
-            'forecast': round(next_month_forecast, 2),
-            'lower_bound': round(lower_bound, 2),
-            'upper_bound': round(upper_bound, 2),
-            'confidence': confidence,
-            'historical_average': round(avg_spending, 2),
-            'trend': 'increasing' if next_month_forecast > avg_spending else 'decreasing',
-            'data_points': len(spending_values)
-        }
+        return forecast_spending([float(total) for _, total in monthly_spending])
     
     def forecast_next_month_income(
         self,
@@ -135,40 +209,7 @@ class ForecastingModel:
             )
         ).group_by('month').order_by('month').all()
         
-        if not monthly_income:
-            return {
-                'forecast': 0,
-                'confidence': 'low',
-                'message': 'Недостаточно данных для прогноза'
-            }
-        
-        # Среднее значение
-        income_values = [float(total) for _, total in monthly_income]
-        avg_income = sum(income_values) / len(income_values)
-        
-        # Для дохода обычно используем медиану, так как она менее чувствительна к выбросам
-        sorted_income = sorted(income_values)
-        n = len(sorted_income)
-        
-        if n % 2 == 0:
-            median_income = (sorted_income[n//2 - 1] + sorted_income[n//2]) / 2
-        else:
-            median_income = sorted_income[n//2]
-        
-        # Определить уровень уверенности
-        if len(income_values) >= 6:
-            confidence = 'high'
-        elif len(income_values) >= 3:
-            confidence = 'medium'
-        else:
-            confidence = 'low'
-        
-        return {
-            'forecast': round(median_income, 2),
-            'average': round(avg_income, 2),
-            'confidence': confidence,
-            'data_points': len(income_values)
-        }
+        return forecast_income([float(total) for _, total in monthly_income])
     
     def forecast_balance(
         self,
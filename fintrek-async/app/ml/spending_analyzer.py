@@ -1,9 +1,10 @@
 """
 Анализатор паттернов расходов пользователя
 """
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 from datetime import datetime, timedelta
 from decimal import Decimal
+import math
 from sqlalchemy.orm import Session
 from sqlalchemy import func, and_
 import logging
@@ -13,6 +14,159 @@ from app.models.category import Category
 
 logger = logging.getLogger(__name__)
 
+# Расход для поиска аномалий: (ID, дата, сумма, ID категории, продавец, описание)
+ExpenseRow = Tuple[Any, datetime, float, Any, Optional[str], Optional[str]]
+
+
+def find_recurring_payments(
+    payments: Iterable[Tuple[Optional[str], float, datetime]],
+    min_occurrences: int = 3
+) -> List[Dict]:
+    """
+    Найти повторяющиеся платежи: одинаковые продавец и сумма
+
+    Args:
+        payments: Расходы (продавец, сумма, дата)
+        min_occurrences: Минимальное количество повторений
+
+    Returns:
+        Список повторяющихся платежей, от крупных к мелким
+    """
+    # Группировать по продавцу и сумме
+    payment_groups: Dict[Tuple[str, float], List[datetime]] = {}
+
+    for merchant, amount, date in payments:
+        if not merchant:
+            continue
+        payment_groups.setdefault((merchant, float(amount)), []).append(date)
+
+    # Найти повторяющиеся платежи
+    recurring = []
+
+    for (merchant, amount), dates in payment_groups.items():
+        if len(dates) >= min_occurrences and len(dates) > 1:
+            # Вычислить средний интервал между платежами
+            sorted_dates = sorted(dates)
+            intervals = [
+                (sorted_dates[i + 1] - sorted_dates[i]).days
+                for i in range(len(sorted_dates) - 1)
+            ]
+            avg_interval = sum(intervals) / len(intervals)
+            last_payment = sorted_dates[-1]
+
+            recurring.append({
+                'merchant': merchant,
+                'amount': amount,
+                'occurrences': len(dates),
+                'avg_interval_days': round(avg_interval, 1),
+                'last_payment': last_payment.isoformat(),
+                'next_expected': (last_payment + timedelta(days=avg_interval)).isoformat()
+            })
+
+    return sorted(recurring, key=lambda x: x['amount'], reverse=True)
+
+
+def category_amount_stats(expenses: Iterable[Tuple[Any, float]]) -> Dict[Any, Dict[str, float]]:
+    """
+    Среднее и стандартное отклонение суммы по категориям
+
+    Считается как avg и stddev (выборочное) в PostgreSQL; для категории
+    с одной транзакцией отклонение 0.
+
+    Args:
+        expenses: Расходы (ID категории, сумма)
+
+    Returns:
+        Словарь {ID категории: {'avg': ..., 'stddev': ...}}
+    """
+    sums: Dict[Any, List[float]] = {}
+    for category_id, amount in expenses:
+        amount = float(amount)
+        acc = sums.get(category_id)
+        if acc is None:
+            sums[category_id] = [1, amount, amount * amount]
+        else:
+            acc[0] += 1
+            acc[1] += amount
+            acc[2] += amount * amount
+
+    stats = {}
+    for category_id, (count, total, total_sq) in sums.items():
+        variance = (total_sq - total * total / count) / (count - 1) if count > 1 else 0.0
+        stats[category_id] = {'avg': total / count, 'stddev': math.sqrt(max(variance, 0.0))}
+    return stats
+
+
+def spending_trend(current_spending: float, prev_spending: float) -> Dict:
+    """
+    Сравнить расходы текущего месяца с предыдущим
+
+    Args:
+        current_spending: Расходы текущего месяца
+        prev_spending: Расходы предыдущего месяца
+
+    Returns:
+        Словарь с трендом ('up' / 'down' / 'stable' при изменении в пределах 5%)
+    """
+    # Вычислить изменение
+    if prev_spending > 0:
+        change_percent = ((current_spending - prev_spending) / prev_spending) * 100
+    else:
+        change_percent = 0
+
+    return {
+        'current_month': float(current_spending),
+        'previous_month': float(prev_spending),
+        'change_percent': round(float(change_percent), 2),
+        'trend': 'up' if change_percent > 5 else 'down' if change_percent < -5 else 'stable'
+    }
+
+
+def find_anomalies(
+    expenses: Iterable[ExpenseRow],
+    stats: Dict[Any, Dict[str, float]],
+    category_names: Dict[Any, str],
+    threshold_multiplier: float = 2.0
+) -> List[Dict]:
+    """
+    Найти расходы, превышающие среднее по категории на threshold_multiplier отклонений
+
+    Args:
+        expenses: Проверяемые расходы
+        stats: Статистика по категориям (см. category_amount_stats)
+        category_names: Названия категорий по ID
+        threshold_multiplier: Множитель для определения аномалии
+
+    Returns:
+        Список аномальных транзакций, от наибольшего отклонения
+    """
+    thresholds = {
+        category_id: values['avg'] + values['stddev'] * threshold_multiplier
+        for category_id, values in stats.items()
+        if category_id
+    }
+    anomalies = []
+
+    for transaction_id, date, amount, category_id, merchant, description in expenses:
+        threshold = thresholds.get(category_id)
+        if threshold is None:
+            continue
+
+        amount = float(amount)
+        if amount > threshold:
+            anomalies.append({
+                'transaction_id': str(transaction_id),
+                'date': date.isoformat(),
+                'amount': amount,
+                'category': category_names.get(category_id, 'Unknown'),
+                'merchant': merchant,
+                'description': description,
+                'expected_max': round(threshold, 2),
+                'deviation': round(amount - threshold, 2)
+            })
+
+    return sorted(anomalies, key=lambda x: x['deviation'], reverse=True)
+
 
 class SpendingAnalyzer:
     """Анализ паттернов расходов и выявление аномалий"""
@@ -113,7 +267,11 @@ class SpendingAnalyzer:
         end_date = datetime.utcnow()
         start_date = end_date - timedelta(days=180)
         
-        transactions = db.query(Transaction).filter(
+        payments = db.query(
+            Transaction.merchant_name,
+            Transaction.amount,
+            Transaction.transaction_date
+        ).filter(
             and_(
                 Transaction.user_id == user_id,
                 Transaction.transaction_type == TransactionType.EXPENSE,
@@ -122,44 +280,7 @@ class SpendingAnalyzer:
             )
         ).all()
         
-        # Группировать по продавцу и сумме
-        payment_groups = {}
-        
-        for txn in transactions:
-            if not txn.merchant_name:
-                continue
-            
-            key = (txn.merchant_name, float(txn.amount))
-            
-            if key not in payment_groups:
-                payment_groups[key] = []
-            
-            payment_groups[key].append(txn.transaction_date)
-        
-        # Найти повторяющиеся платежи
-        recurring = []
-        
-        for (merchant, amount), dates in payment_groups.items():
-            if len(dates) >= min_occurrences:
-                # Вычислить средний интервал между платежами
-                if len(dates) > 1:
-                    sorted_dates = sorted(dates)
-                    intervals = [
-                        (sorted_dates[i+1] - sorted_dates[i]).days
-                        for i in range(len(sorted_dates) - 1)
-                    ]
-                    avg_interval = sum(intervals) / len(intervals)
-                    
-                    recurring.append({
-                        'merchant': merchant,
-                        'amount': amount,
-                        'occurrences': len(dates),
-                        'avg_interval_days': round(avg_interval, 1),
-                        'last_payment': max(dates).isoformat(),
-                        'next_expected': (max(dates) + timedelta(days=avg_interval)).isoformat()
-                    })
-        
-        return sorted(recurring, key=lambda x: x['amount'], reverse=True)
+        return find_recurring_payments(payments, min_occurrences)
     
     def detect_anomalies(
         self,
@@ -205,7 +326,14 @@ class SpendingAnalyzer:
         # Найти аномальные транзакции за последний месяц
         recent_start = end_date - timedelta(days=30)
         
-        recent_transactions = db.query(Transaction).filter(
+        recent_transactions = db.query(
+            Transaction.id,
+            Transaction.transaction_date,
+            Transaction.amount,
+            Transaction.category_id,
+            Transaction.merchant_name,
+            Transaction.description
+        ).filter(
             and_(
                 Transaction.user_id == user_id,
                 Transaction.transaction_type == TransactionType.EXPENSE,
@@ -214,32 +342,13 @@ class SpendingAnalyzer:
             )
         ).all()
         
-        anomalies = []
+        # Названия категорий одним запросом
+        category_ids = [cat_id for cat_id in stats_dict if cat_id]
+        category_names = dict(
+            db.query(Category.id, Category.name).filter(Category.id.in_(category_ids)).all()
+        ) if category_ids else {}
         
-        for txn in recent_transactions:
-            if not txn.category_id or txn.category_id not in stats_dict:
-                continue
-            
-            stats = stats_dict[txn.category_id]
-            threshold = stats['avg'] + (stats['stddev'] * threshold_multiplier)
-            
-            if float(txn.amount) > threshold:
-                category = db.query(Category).filter(
-                    Category.id == txn.category_id
-                ).first()
-                
-                anomalies.append({
-                    'transaction_id': str(txn.id),
-                    'date': txn.transaction_date.isoformat(),
-                    'amount': float(txn.amount),
-                    'category': category.name if category else 'Unknown',
-                    'merchant': txn.merchant_name,
-                    'description': txn.description,
-                    'expected_max': round(threshold, 2),
-                    'deviation': round(float(txn.amount) - threshold, 2)
-                })
-        
-        return sorted(anomalies, key=lambda x: x['deviation'], reverse=True)
+        return find_anomalies(recent_transactions, stats_dict, category_names, threshold_multiplier)
     
     def get_spending_trends(
         self,
@@ -284,18 +393,7 @@ class SpendingAnalyzer:
             )
         ).scalar() or Decimal(0)
         
-        # Вычислить изменение
-        if prev_spending > 0:
-            change_percent = ((current_spending - prev_spending) / prev_spending) * 100
-        else:
-            change_percent = 0
-        
-        return {
-            'current_month': float(current_spending),
-            'previous_month': float(prev_spending),
-            'change_percent': round(float(change_percent), 2),
-            'trend': 'up' if change_percent > 5 else 'down' if change_percent < -5 else 'stable'
-        }
+        return spending_trend(float(current_spending), float(prev_spending))
 
 
 # Singleton instance
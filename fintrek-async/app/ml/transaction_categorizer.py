@@ -2,7 +2,7 @@
 Модель машинного обучения для автоматической категоризации транзакций
 """
 import re
-from typing import Optional, Dict, List
+from typing import Any, Optional, Dict, List, Tuple
 import logging
 from sqlalchemy.orm import Session
 
@@ -74,24 +74,22 @@ class TransactionCategorizer:
             ],
         }
     
-    def categorize(
+    def match_category(
         self,
-        description: str,
+        description: Optional[str],
         merchant_name: Optional[str],
-        amount: float,
-        db: Session
-    ) -> Optional[str]:
+        amount: float
+    ) -> Tuple[str, CategoryType]:
         """
-        Определить категорию транзакции
+        Подобрать системную категорию по ключевым словам (без обращения к БД)
         
         Args:
             description: Описание транзакции
             merchant_name: Название продавца
-            amount: Сумма транзакции
-            db: Database session
+            amount: Сумма транзакции (отрицательная - расход)
             
         Returns:
-            ID категории или None
+            (название категории, тип категории); "Другое", если совпадений нет
         """
         # Объединить описание и название продавца
         text = f"{description or ''} {merchant_name or ''}".lower()
@@ -113,10 +111,33 @@ class TransactionCategorizer:
                 max_matches = matches
                 best_match = category_name
         
+        return best_match or "Другое", category_type
+    
+    def categorize(
+        self,
+        description: str,
+        merchant_name: Optional[str],
+        amount: float,
+        db: Session
+    ) -> Optional[str]:
+        """
+        Определить категорию транзакции
+        
+        Args:
+            description: Описание транзакции
+            merchant_name: Название продавца
+            amount: Сумма транзакции
+            db: Database session
+            
+        Returns:
+            ID категории или None
+        """
+        category_name, category_type = self.match_category(description, merchant_name, amount)
+        
         # Если найдено совпадение, вернуть ID категории
-        if best_match:
+        if category_name != "Другое":
             category = db.query(Category).filter(
-                Category.name == best_match,
+                Category.name == category_name,
                 Category.category_type == category_type,
                 Category.is_system == True
             ).first()
@@ -162,21 +183,25 @@ class TransactionCategorizer:
         
         return False
     
-    def batch_categorize(self, db: Session, limit: int = 100) -> int:
+    def batch_categorize(self, db: Session, limit: int = 100, user_id: Optional[Any] = None) -> int:
         """
         Категоризировать пакет некатегоризированных транзакций
         
         Args:
             db: Database session
             limit: Максимальное количество транзакций
+            user_id: Только транзакции этого пользователя (None - всех)
             
         Returns:
             Количество категоризированных транзакций
         """
         # Получить некатегоризированные транзакции
-        transactions = db.query(Transaction).filter(
+        query = db.query(Transaction).filter(
             Transaction.category_id == None
-        ).limit(limit).all()
+        )
+        if user_id is not None:
+            query = query.filter(Transaction.user_id == user_id)
+        transactions = query.limit(limit).all()
         
         categorized_count = 0
         
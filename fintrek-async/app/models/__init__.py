@@ -6,6 +6,8 @@ from app.models.account import Account, AccountType, AccountStatus
 from app.models.transaction import Transaction, TransactionType, TransactionStatus
 from app.models.category import Category, CategoryType
 from app.models.bank_connection import BankConnection, BankConnectionStatus
+from app.models.job import Job, JobStatus
+from app.models.sync_run import SyncRun, SyncRunStatus
 
 __all__ = [
     "User",
@@ -20,4 +22,8 @@ __all__ = [
     "CategoryType",
     "BankConnection",
     "BankConnectionStatus",
+    "Job",
+    "JobStatus",
+    "SyncRun",
+    "SyncRunStatus",
 ]
@@ -51,6 +51,7 @@ class Account(Base):
     status = Column(Enum(AccountStatus), default=AccountStatus.ACTIVE, nullable=False)
     last_synced_at = Column(DateTime, nullable=True)  # Время последней синхронизации
     sync_error = Column(String, nullable=True)  # Описание ошибки синхронизации
+    sync_cursor = Column(String, nullable=True)  # Курсор инкрементальной синхронизации (от коннектора)
     
     # Метаданные
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
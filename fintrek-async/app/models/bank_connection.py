@@ -27,6 +27,7 @@ class BankConnection(Base):
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     
     # Информация о банке
+    provider = Column(String(32), default="open_banking", server_default="open_banking", nullable=False)  # Коннектор (app.connectors)
     bank_name = Column(String, nullable=False)
     bank_bic = Column(String(9), nullable=True)  # БИК банка
     
@@ -42,6 +43,11 @@ class BankConnection(Base):
     # Синхронизация
     last_synced_at = Column(DateTime, nullable=True)
     
+    # Загрузка истории (backfill): окна идут от новых к старым
+    backfill_cursor = Column(DateTime, nullable=True)  # История загружена начиная с этой даты
+    backfill_until = Column(DateTime, nullable=True)  # До какой даты загружать историю
+    backfill_completed_at = Column(DateTime, nullable=True)
+    
     # Метаданные
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
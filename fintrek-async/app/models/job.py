@@ -0,0 +1,62 @@
+"""
+Модель фоновой задачи для SQLAlchemy
+"""
+from sqlalchemy import Column, String, DateTime, ForeignKey, Enum, Text, Integer, Index, text
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from datetime import datetime
+import uuid
+import enum
+
+from app.db.base import Base
+
+
+class JobStatus(str, enum.Enum):
+    """Статусы фоновой задачи"""
+    QUEUED = "queued"          # Ожидает воркера
+    RUNNING = "running"        # Выполняется
+    SUCCEEDED = "succeeded"    # Завершена успешно
+    FAILED = "failed"          # Завершена с ошибкой
+
+
+class Job(Base):
+    """Модель фоновой задачи (очередь на PostgreSQL с SKIP LOCKED)"""
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Индекс для выборки следующей задачи воркером
+        Index("ix_jobs_status_priority_created_at", "status", "priority", "created_at"),
+        # Не больше одной активной задачи с одним ключом дедупликации
+        Index(
+            "uq_jobs_active_dedup_key",
+            "dedup_key",
+            unique=True,
+            postgresql_where=text("status IN ('QUEUED', 'RUNNING')")
+        ),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+
+    # Тип задачи и входные данные
+    job_type = Column(String(64), nullable=False)
+    payload = Column(JSONB, default=dict, nullable=False)
+    priority = Column(Integer, default=100, nullable=False)  # Чем меньше, тем раньше
+    dedup_key = Column(String(255), nullable=True)  # Ключ для присоединения к уже идущей задаче
+    trace_parent = Column(String(55), nullable=True)  # W3C traceparent запроса, поставившего задачу
+
+    # Состояние выполнения
+    status = Column(Enum(JobStatus), default=JobStatus.QUEUED, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    progress_current = Column(Integer, default=0, nullable=False)
+    progress_total = Column(Integer, nullable=True)
+    result = Column(JSONB, nullable=True)  # Счетчики и итог выполнения
+    error = Column(Text, nullable=True)
+
+    # Временные метки
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)  # Последний признак жизни воркера
+    finished_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<Job(id={self.id}, type={self.job_type}, status={self.status})>"
@@ -0,0 +1,58 @@
+"""
+Модель истории запусков синхронизации для SQLAlchemy
+"""
+from sqlalchemy import Column, String, DateTime, ForeignKey, Enum, Text, Integer, BigInteger, Index
+from sqlalchemy.dialects.postgresql import UUID
+from datetime import datetime
+import uuid
+import enum
+
+from app.db.base import Base
+
+
+class SyncRunStatus(str, enum.Enum):
+    """Статусы запуска синхронизации"""
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    SKIPPED = "skipped"  # Подключение уже синхронизировалось другим процессом
+
+
+class SyncRun(Base):
+    """Запуск синхронизации подключения: тайминги по фазам и объемы"""
+    __tablename__ = "sync_runs"
+    __table_args__ = (
+        Index("ix_sync_runs_connection_id_started_at", "connection_id", "started_at"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    connection_id = Column(UUID(as_uuid=True), ForeignKey("bank_connections.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+
+    # Режим и итог
+    mode = Column(String(16), nullable=False)  # incremental | backfill
+    status = Column(Enum(SyncRunStatus), default=SyncRunStatus.RUNNING, nullable=False)
+    error = Column(Text, nullable=True)
+
+    # Время
+    started_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    finished_at = Column(DateTime, nullable=True)
+    duration_ms = Column(Integer, nullable=True)
+
+    # Длительность фаз, мс
+    token_refresh_ms = Column(Integer, default=0, nullable=False)
+    accounts_fetch_ms = Column(Integer, default=0, nullable=False)
+    transactions_fetch_ms = Column(Integer, default=0, nullable=False)
+    parse_ms = Column(Integer, default=0, nullable=False)
+    db_write_ms = Column(Integer, default=0, nullable=False)
+
+    # Объемы
+    pages_fetched = Column(Integer, default=0, nullable=False)
+    bytes_received = Column(BigInteger, default=0, nullable=False)
+    rows_inserted = Column(Integer, default=0, nullable=False)
+    rows_updated = Column(Integer, default=0, nullable=False)
+    rows_skipped = Column(Integer, default=0, nullable=False)
+    retries = Column(Integer, default=0, nullable=False)
+
+    def __repr__(self):
+        return f"<SyncRun(id={self.id}, connection_id={self.connection_id}, status={self.status})>"
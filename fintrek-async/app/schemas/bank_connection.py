@@ -11,6 +11,7 @@ class BankConnectionBase(BaseModel):
     """Базовая схема подключения к банку"""
     bank_name: str = Field(..., min_length=1, max_length=200, description="Название банка")
     bank_bic: Optional[str] = Field(None, max_length=9, description="БИК банка")
+    provider: str = Field("open_banking", max_length=32, description="Коннектор банка (open_banking, vbank)")
 
 
 class BankConnectionCreate(BankConnectionBase):
@@ -26,6 +27,8 @@ class BankConnectionResponse(BankConnectionBase):
     last_error: Optional[str]
     last_synced_at: Optional[datetime]
     token_expires_at: Optional[datetime]
+    backfill_cursor: Optional[datetime] = None
+    backfill_completed_at: Optional[datetime] = None
     created_at: datetime
     updated_at: datetime
     
@@ -50,3 +53,4 @@ class BankConnectionSyncResponse(BaseModel):
     message: str
     accounts_synced: int
     transactions_synced: int
+    already_syncing: bool = False
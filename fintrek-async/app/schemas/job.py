@@ -0,0 +1,33 @@
+"""
+Pydantic схемы для фоновых задач
+"""
+from pydantic import BaseModel, UUID4
+from datetime import datetime
+from typing import Optional, Any, Dict
+from app.models.job import JobStatus
+
+
+class JobEnqueueResponse(BaseModel):
+    """Схема ответа при постановке задачи в очередь"""
+    job_id: UUID4
+    job_type: str
+    status: JobStatus
+    deduplicated: bool = False  # Присоединились к уже выполняющейся задаче
+
+
+class JobResponse(BaseModel):
+    """Схема ответа со статусом задачи"""
+    id: UUID4
+    job_type: str
+    status: JobStatus
+    attempts: int
+    progress_current: int
+    progress_total: Optional[int]
+    result: Optional[Dict[str, Any]]
+    error: Optional[str]
+    created_at: datetime
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+
+    class Config:
+        from_attributes = True
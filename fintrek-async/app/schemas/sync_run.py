@@ -0,0 +1,39 @@
+"""
+Pydantic схемы для SyncRun
+"""
+from pydantic import BaseModel, UUID4
+from datetime import datetime
+from typing import Optional
+from app.models.sync_run import SyncRunStatus
+
+
+class SyncRunResponse(BaseModel):
+    """Схема ответа с запуском синхронизации"""
+    id: UUID4
+    connection_id: UUID4
+    mode: str
+    status: SyncRunStatus
+    error: Optional[str]
+    started_at: datetime
+    finished_at: Optional[datetime]
+    duration_ms: Optional[int]
+    token_refresh_ms: int
+    accounts_fetch_ms: int
+    transactions_fetch_ms: int
+    parse_ms: int
+    db_write_ms: int
+    pages_fetched: int
+    bytes_received: int
+    rows_inserted: int
+    rows_updated: int
+    rows_skipped: int
+    retries: int
+    
+    class Config:
+        from_attributes = True
+
+
+class SyncRunListResponse(BaseModel):
+    """Схема для истории запусков синхронизации"""
+    runs: list[SyncRunResponse]
+    total: int
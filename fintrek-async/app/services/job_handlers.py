@@ -0,0 +1,154 @@
+"""
+Обработчики фоновых задач
+
+Модуль регистрирует обработчики в job_queue при импорте,
+поэтому должен быть импортирован до запуска воркеров.
+"""
+from typing import Any, Dict
+from uuid import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+import logging
+
+from app.core.config import settings
+from app.core.data_version import bump_data_version
+from app.models.bank_connection import BankConnection
+from app.services.job_queue import job_queue, JobContext
+from app.services.sync_service import sync_service
+from app.services.vbank_import import VBankImportService
+from app.ml.transaction_categorizer import transaction_categorizer
+
+logger = logging.getLogger(__name__)
+
+# Типы задач
+BANK_CONNECTION_SYNC = "bank_connection.sync"
+BANK_CONNECTION_SYNC_ALL = "bank_connection.sync_all"
+BANK_CONNECTION_BACKFILL = "bank_connection.backfill"
+VBANK_SYNC_ACCOUNTS = "vbank.sync_accounts"
+VBANK_SYNC_TRANSACTIONS = "vbank.sync_transactions"
+CATEGORIZE_TRANSACTIONS = "ai.categorize_transactions"
+
+
+@job_queue.handler(BANK_CONNECTION_SYNC)
+async def run_bank_connection_sync(ctx: JobContext, db: AsyncSession) -> Dict[str, Any]:
+    """Синхронизация подключения к банку"""
+    result = await sync_service.sync_bank_connection(
+        db=db,
+        connection_id=ctx.payload["connection_id"],
+        user_id=str(ctx.user_id),
+        on_progress=ctx.progress
+    )
+
+    if result.get("already_syncing"):
+        # Подключение уже синхронизирует другая задача - это не ошибка
+        return result
+
+    if not result["success"]:
+        ctx.counts.update(result)
+        raise RuntimeError(result["message"])
+
+    # Для нового подключения запустить загрузку истории
+    connection = await db.get(BankConnection, UUID(ctx.payload["connection_id"]))
+    if connection and connection.backfill_completed_at is None:
+        await enqueue_backfill(db, connection)
+
+    return result
+
+
+@job_queue.handler(BANK_CONNECTION_SYNC_ALL)
+async def run_bank_connection_sync_all(ctx: JobContext, db: AsyncSession) -> Dict[str, Any]:
+    """Синхронизация всех подключений пользователя (параллельно, с общей записью)"""
+    result = await sync_service.sync_user(
+        db=db,
+        user_id=str(ctx.user_id),
+        on_progress=ctx.progress
+    )
+    
+    # Для новых подключений запустить загрузку истории
+    for item in result["results"]:
+        if item["status"] != "succeeded":
+            continue
+        connection = await db.get(BankConnection, UUID(item["connection_id"]))
+        if connection and connection.backfill_completed_at is None:
+            await enqueue_backfill(db, connection)
+    
+    return result
+
+
+async def enqueue_backfill(db: AsyncSession, connection: BankConnection):
+    """Поставить загрузку истории подключения в очередь с низким приоритетом"""
+    return await job_queue.enqueue_or_attach(
+        db,
+        BANK_CONNECTION_BACKFILL,
+        user_id=connection.user_id,
+        dedup_key=f"{BANK_CONNECTION_BACKFILL}:{connection.id}",
+        payload={"connection_id": str(connection.id)},
+        priority=settings.SYNC_BACKFILL_JOB_PRIORITY
+    )
+
+
+@job_queue.handler(BANK_CONNECTION_BACKFILL)
+async def run_bank_connection_backfill(ctx: JobContext, db: AsyncSession) -> Dict[str, Any]:
+    """
+    Загрузка истории подключения порциями
+
+    За один запуск обрабатывается SYNC_BACKFILL_WINDOWS_PER_JOB окон,
+    затем задача возвращается в очередь и освобождает воркер.
+    """
+    result = await sync_service.backfill_bank_connection(
+        db=db,
+        connection_id=ctx.payload["connection_id"],
+        user_id=str(ctx.user_id),
+        max_windows=settings.SYNC_BACKFILL_WINDOWS_PER_JOB,
+        on_progress=ctx.progress
+    )
+
+    if not result["completed"]:
+        ctx.requeue()
+
+    return result
+
+
+@job_queue.handler(VBANK_SYNC_ACCOUNTS)
+async def run_vbank_sync_accounts(ctx: JobContext, db: AsyncSession) -> Dict[str, Any]:
+    """Импорт счетов из VBank"""
+    svc = VBankImportService()
+    result = await svc.fetch_accounts(db, user_id=ctx.user_id)
+    if result.get("already_syncing"):
+        return result
+    if not result["success"]:
+        raise RuntimeError(result["message"])
+    return result
+
+
+@job_queue.handler(VBANK_SYNC_TRANSACTIONS)
+async def run_vbank_sync_transactions(ctx: JobContext, db: AsyncSession) -> Dict[str, Any]:
+    """Импорт транзакций счета из VBank"""
+    svc = VBankImportService()
+    result = await svc.fetch_transactions(
+        db,
+        user_id=ctx.user_id,
+        account_id=ctx.payload["account_id"],
+        date_from=ctx.payload.get("date_from"),
+        date_to=ctx.payload.get("date_to")
+    )
+    if result.get("already_syncing"):
+        return result
+    if not result["success"]:
+        raise RuntimeError(result["message"])
+    return result
+
+
+@job_queue.handler(CATEGORIZE_TRANSACTIONS)
+async def run_categorize_transactions(ctx: JobContext, db: AsyncSession) -> Dict[str, Any]:
+    """Категоризация транзакций пользователя, поставившего задачу"""
+    # Категоризатор работает с синхронной Session, run_sync выдает её поверх AsyncSession
+    count = await db.run_sync(
+        lambda session: transaction_categorizer.batch_categorize(
+            session, limit=ctx.payload.get("limit", 100), user_id=ctx.user_id
+        )
+    )
+    # Категоризатор фиксирует каждую транзакцию сам: после него изменения уже в БД,
+    # и кэш, ETag и чтение с реплики должны их увидеть
+    if count:
+        await bump_data_version(ctx.user_id)
+    return {"categorized_count": count}
@@ -0,0 +1,378 @@
+"""
+Очередь фоновых задач на PostgreSQL (SELECT ... FOR UPDATE SKIP LOCKED)
+
+Долгие операции (синхронизация с банком, категоризация) не выполняются
+внутри HTTP-запроса: эндпоинт ставит задачу в очередь и сразу возвращает
+её ID, а воркеры, запущенные в lifespan приложения, забирают задачи из
+таблицы jobs и сообщают прогресс.
+"""
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from datetime import datetime, timedelta
+from uuid import UUID
+import asyncio
+import logging
+
+from sqlalchemy import select, update, and_, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.request_context import bind_operation, reset_operation
+from app.core.tracing import SPAN_KIND_CONSUMER, current_traceparent, traced
+from app.db.session import AsyncSessionLocal
+from app.models.job import Job, JobStatus
+
+logger = logging.getLogger(__name__)
+
+
+class JobContext:
+    """Контекст выполняемой задачи, передается обработчику"""
+
+    def __init__(
+        self,
+        job_id: UUID,
+        job_type: str,
+        user_id: UUID,
+        payload: Dict[str, Any],
+        trace_parent: Optional[str] = None
+    ):
+        self.job_id = job_id
+        self.job_type = job_type
+        self.user_id = user_id
+        self.payload = payload
+        self.trace_parent = trace_parent
+        self.counts: Dict[str, Any] = {}
+        self.requeue_requested = False
+
+    def requeue(self) -> None:
+        """
+        Вернуть задачу в очередь после завершения обработчика
+
+        Используется для длинных задач, которые выполняются порциями
+        и освобождают воркер между ними (например, загрузка истории).
+        """
+        self.requeue_requested = True
+
+    async def progress(self, current: int, total: Optional[int] = None, **counts: Any) -> None:
+        """
+        Сохранить прогресс выполнения задачи
+
+        Прогресс пишется отдельной короткой сессией, поэтому он виден
+        клиенту сразу, даже если обработчик еще не зафиксировал свою транзакцию.
+
+        Args:
+            current: Количество обработанных единиц
+            total: Общее количество единиц (если известно)
+            **counts: Промежуточные счетчики для поля result
+        """
+        self.counts.update(counts)
+        values: Dict[str, Any] = {
+            "progress_current": current,
+            "heartbeat_at": datetime.utcnow(),
+            "result": dict(self.counts),
+        }
+        if total is not None:
+            values["progress_total"] = total
+
+        async with AsyncSessionLocal() as db:
+            await db.execute(update(Job).where(Job.id == self.job_id).values(**values))
+            await db.commit()
+
+
+JobHandler = Callable[[JobContext, AsyncSession], Awaitable[Optional[Dict[str, Any]]]]
+
+
+class JobQueue:
+    """Постановка задач в очередь и их выполнение воркерами"""
+
+    def __init__(self):
+        self._handlers: Dict[str, JobHandler] = {}
+        self._workers: List[asyncio.Task] = []
+        self._stopping = asyncio.Event()
+
+    def handler(self, job_type: str) -> Callable[[JobHandler], JobHandler]:
+        """
+        Декоратор для регистрации обработчика типа задачи
+
+        Args:
+            job_type: Тип задачи (например, "bank_connection.sync")
+        """
+        def decorator(func: JobHandler) -> JobHandler:
+            self._handlers[job_type] = func
+            return func
+        return decorator
+
+    async def enqueue(
+        self,
+        db: AsyncSession,
+        job_type: str,
+        user_id: UUID,
+        payload: Optional[Dict[str, Any]] = None,
+        priority: int = 100
+    ) -> Job:
+        """
+        Поставить задачу в очередь
+
+        Args:
+            db: Database session
+            job_type: Тип задачи
+            user_id: ID пользователя-владельца задачи
+            payload: Входные данные для обработчика (JSON)
+            priority: Приоритет (чем меньше, тем раньше будет выполнена)
+
+        Returns:
+            Созданная задача
+        """
+        if job_type not in self._handlers:
+            raise ValueError(f"Unknown job type: {job_type}")
+
+        job = Job(
+            user_id=user_id,
+            job_type=job_type,
+            payload=payload or {},
+            priority=priority,
+            trace_parent=current_traceparent(),
+            status=JobStatus.QUEUED
+        )
+        db.add(job)
+        await db.commit()
+        await db.refresh(job)
+        return job
+
+    async def find_active(self, db: AsyncSession, dedup_key: str) -> Optional[Job]:
+        """Найти задачу в очереди или в работе по ключу дедупликации"""
+        result = await db.execute(
+            select(Job).where(
+                Job.dedup_key == dedup_key,
+                Job.status.in_([JobStatus.QUEUED, JobStatus.RUNNING])
+            )
+        )
+        return result.scalar_one_or_none()
+
+    async def enqueue_or_attach(
+        self,
+        db: AsyncSession,
+        job_type: str,
+        user_id: UUID,
+        dedup_key: str,
+        payload: Optional[Dict[str, Any]] = None,
+        priority: int = 100
+    ) -> Tuple[Job, bool]:
+        """
+        Поставить задачу в очередь или вернуть уже активную с тем же ключом
+
+        Уникальность активных задач гарантирует частичный уникальный индекс,
+        поэтому одновременные вызовы из разных процессов получат одну задачу.
+
+        Returns:
+            Кортеж (задача, создана_ли_новая)
+        """
+        existing = await self.find_active(db, dedup_key)
+        if existing:
+            return existing, False
+
+        if job_type not in self._handlers:
+            raise ValueError(f"Unknown job type: {job_type}")
+
+        job = Job(
+            user_id=user_id,
+            job_type=job_type,
+            payload=payload or {},
+            priority=priority,
+            dedup_key=dedup_key,
+            trace_parent=current_traceparent(),
+            status=JobStatus.QUEUED
+        )
+        db.add(job)
+        try:
+            await db.commit()
+        except IntegrityError:
+            # Параллельный вызов успел поставить такую же задачу
+            await db.rollback()
+            existing = await self.find_active(db, dedup_key)
+            if existing:
+                return existing, False
+            raise
+
+        await db.refresh(job)
+        return job, True
+
+    async def get_job(self, db: AsyncSession, job_id: UUID, user_id: UUID) -> Optional[Job]:
+        """Получить задачу пользователя по ID"""
+        result = await db.execute(
+            select(Job).where(Job.id == job_id, Job.user_id == user_id)
+        )
+        return result.scalar_one_or_none()
+
+    async def _claim_next(self) -> Optional[JobContext]:
+        """
+        Забрать следующую задачу из очереди
+
+        Берется задача в статусе QUEUED либо RUNNING без heartbeat дольше
+        JOB_STALE_AFTER_SECONDS (воркер упал). SKIP LOCKED позволяет
+        нескольким воркерам и процессам разбирать очередь без блокировок.
+        """
+        stale_cutoff = datetime.utcnow() - timedelta(seconds=settings.JOB_STALE_AFTER_SECONDS)
+
+        async with AsyncSessionLocal() as db:
+            while True:
+                stmt = select(Job).where(
+                    or_(
+                        Job.status == JobStatus.QUEUED,
+                        and_(Job.status == JobStatus.RUNNING, Job.heartbeat_at < stale_cutoff)
+                    )
+                ).order_by(
+                    Job.priority, Job.created_at
+                ).limit(1).with_for_update(skip_locked=True)
+
+                job = (await db.execute(stmt)).scalar_one_or_none()
+                if job is None:
+                    return None
+
+                now = datetime.utcnow()
+                if job.status == JobStatus.RUNNING and job.attempts >= settings.JOB_MAX_ATTEMPTS:
+                    logger.warning(f"Job {job.id} exceeded max attempts, marking as failed")
+                    job.status = JobStatus.FAILED
+                    job.error = "Job worker was lost too many times"
+                    job.finished_at = now
+                    await db.commit()
+                    continue
+
+                job.status = JobStatus.RUNNING
+                job.attempts += 1
+                job.started_at = now
+                job.heartbeat_at = now
+                job.error = None
+                await db.commit()
+
+                return JobContext(job.id, job.job_type, job.user_id, dict(job.payload or {}), job.trace_parent)
+
+    async def _finish(
+        self,
+        job_id: UUID,
+        status: JobStatus,
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None
+    ) -> None:
+        """Зафиксировать итог выполнения задачи"""
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(Job).where(Job.id == job_id).values(
+                    status=status,
+                    result=result,
+                    error=error,
+                    finished_at=datetime.utcnow()
+                )
+            )
+            await db.commit()
+
+    async def _requeue(self, job_id: UUID, result: Optional[Dict[str, Any]] = None) -> None:
+        """Вернуть задачу в очередь, сохранив промежуточный результат"""
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(Job).where(Job.id == job_id).values(
+                    status=JobStatus.QUEUED,
+                    attempts=0,
+                    result=result
+                )
+            )
+            await db.commit()
+
+    async def _heartbeat(self, job_id: UUID) -> None:
+        """Периодически обновлять heartbeat, пока задача выполняется"""
+        interval = max(settings.JOB_STALE_AFTER_SECONDS / 3, 1)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                async with AsyncSessionLocal() as db:
+                    await db.execute(
+                        update(Job).where(Job.id == job_id).values(heartbeat_at=datetime.utcnow())
+                    )
+                    await db.commit()
+            except Exception as e:
+                logger.warning(f"Failed to update heartbeat for job {job_id}: {e}")
+
+    async def run_job(self, ctx: JobContext) -> None:
+        """
+        Выполнить задачу зарегистрированным обработчиком
+
+        Args:
+            ctx: Контекст задачи
+        """
+        handler = self._handlers.get(ctx.job_type)
+        if handler is None:
+            await self._finish(ctx.job_id, JobStatus.FAILED, error=f"Unknown job type: {ctx.job_type}")
+            return
+
+        operation = bind_operation(f"job:{ctx.job_type}")
+        heartbeat = asyncio.create_task(self._heartbeat(ctx.job_id))
+        try:
+            # Спан задачи продолжает трассу запроса, который ее поставил
+            with traced(
+                f"job {ctx.job_type}",
+                kind=SPAN_KIND_CONSUMER,
+                attributes={"job.id": str(ctx.job_id), "job.type": ctx.job_type},
+                traceparent=ctx.trace_parent
+            ):
+                async with AsyncSessionLocal() as db:
+                    try:
+                        result = await handler(ctx, db)
+                        await db.commit()
+                    except Exception:
+                        await db.rollback()
+                        raise
+        except Exception as e:
+            logger.exception(f"Job {ctx.job_id} ({ctx.job_type}) failed: {e}")
+            await self._finish(ctx.job_id, JobStatus.FAILED, result=ctx.counts or None, error=str(e))
+        else:
+            if ctx.requeue_requested:
+                await self._requeue(ctx.job_id, result={**ctx.counts, **(result or {})})
+            else:
+                await self._finish(ctx.job_id, JobStatus.SUCCEEDED, result={**ctx.counts, **(result or {})})
+        finally:
+            reset_operation(operation)
+            heartbeat.cancel()
+
+    async def _worker_loop(self, worker_id: int) -> None:
+        """Основной цикл воркера"""
+        logger.info(f"Job worker {worker_id} started")
+        while not self._stopping.is_set():
+            try:
+                ctx = await self._claim_next()
+            except Exception as e:
+                logger.error(f"Job worker {worker_id} failed to claim job: {e}")
+                ctx = None
+
+            if ctx is None:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=settings.JOB_POLL_INTERVAL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            await self.run_job(ctx)
+        logger.info(f"Job worker {worker_id} stopped")
+
+    def start(self, concurrency: Optional[int] = None) -> None:
+        """
+        Запустить воркеры в текущем event loop
+
+        Args:
+            concurrency: Количество воркеров (по умолчанию JOB_WORKER_CONCURRENCY)
+        """
+        self._stopping = asyncio.Event()
+        count = concurrency if concurrency is not None else settings.JOB_WORKER_CONCURRENCY
+        self._workers = [
+            asyncio.create_task(self._worker_loop(i)) for i in range(count)
+        ]
+
+    async def stop(self) -> None:
+        """Остановить воркеры, дождавшись текущих задач"""
+        self._stopping.set()
+        if self._workers:
+            await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+
+# Singleton instance
+job_queue = JobQueue()
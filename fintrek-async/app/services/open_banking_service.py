@@ -1,13 +1,16 @@
 """
 Сервис для работы с Open Banking API
 """
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, List, Any, AsyncIterator
 from datetime import datetime, timedelta
 import httpx
 from app.models.bank_connection import BankConnection, BankConnectionStatus
 from app.models.account import Account, AccountType, AccountStatus
 from app.models.transaction import Transaction, TransactionType, TransactionStatus
 from app.core.config import settings
+from app.clients.retry import send_with_retries
+from app.core.tracing import TracingTransport
+from app.services.sync_stats import SyncStats
 import logging
 
 logger = logging.getLogger(__name__)
@@ -17,11 +20,22 @@ class OpenBankingService:
     """Сервис для интеграции с банковскими Open API"""
     
     def __init__(self):
-        self.base_url = getattr(settings, "OPEN_BANKING_API_URL", "https://api.example-bank.ru")
-        self.client_id = getattr(settings, "OPEN_BANKING_CLIENT_ID", "")
-        self.client_secret = getattr(settings, "OPEN_BANKING_CLIENT_SECRET", "")
+        self.base_url = settings.OPEN_BANKING_API_URL
+        self.client_id = settings.OPEN_BANKING_CLIENT_ID
+        self.client_secret = settings.OPEN_BANKING_CLIENT_SECRET
         self.timeout = 30.0
     
+    async def _send(
+        self,
+        client: httpx.AsyncClient,
+        method: str,
+        url: str,
+        stats: Optional[SyncStats] = None,
+        **kwargs: Any
+    ) -> httpx.Response:
+        """Выполнить запрос к банку с повторами при 429 и ошибках 5xx (см. send_with_retries)"""
+        return await send_with_retries(client, method, url, stats, **kwargs)
+    
     async def initiate_oauth_flow(self, bank_name: str, redirect_uri: str) -> Dict[str, str]:
         """
         Инициировать OAuth 2.0 flow для подключения к банку
@@ -59,7 +73,7 @@ class OpenBankingService:
             Dict с access_token, refresh_token, expires_in
         """
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
+            async with httpx.AsyncClient(timeout=self.timeout, transport=TracingTransport()) as client:
                 response = await client.post(
                     f"{self.base_url}/oauth/token",
                     data={
@@ -76,20 +90,24 @@ class OpenBankingService:
             logger.error(f"Error exchanging code for tokens: {e}")
             raise
     
-    async def refresh_access_token(self, refresh_token: str) -> Dict[str, Any]:
+    async def refresh_access_token(self, refresh_token: str, stats: Optional[SyncStats] = None) -> Dict[str, Any]:
         """
         Обновить access token используя refresh token
         
         Args:
             refresh_token: Refresh token
+            stats: Статистика синхронизации
             
         Returns:
             Dict с новым access_token и expires_in
         """
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
+            async with httpx.AsyncClient(timeout=self.timeout, transport=TracingTransport()) as client:
+                response = await self._send(
+                    client,
+                    "POST",
                     f"{self.base_url}/oauth/token",
+                    stats=stats,
                     data={
                         "grant_type": "refresh_token",
                         "refresh_token": refresh_token,
@@ -97,74 +115,122 @@ class OpenBankingService:
                         "client_secret": self.client_secret
                     }
                 )
-                response.raise_for_status()
                 return response.json()
         except Exception as e:
             logger.error(f"Error refreshing access token: {e}")
             raise
     
-    async def fetch_accounts(self, access_token: str) -> List[Dict[str, Any]]:
+    async def fetch_accounts(self, access_token: str, stats: Optional[SyncStats] = None) -> List[Dict[str, Any]]:
         """
         Получить список счетов из банковского API
         
         Args:
             access_token: Access token для авторизации
+            stats: Статистика синхронизации
             
         Returns:
             Список счетов
         """
+        stats = stats or SyncStats()
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(
-                    f"{self.base_url}/api/v1/accounts",
-                    headers={"Authorization": f"Bearer {access_token}"}
-                )
-                response.raise_for_status()
-                data = response.json()
+            async with httpx.AsyncClient(timeout=self.timeout, transport=TracingTransport()) as client:
+                with stats.phase("accounts_fetch"):
+                    response = await self._send(
+                        client,
+                        "GET",
+                        f"{self.base_url}/api/v1/accounts",
+                        stats=stats,
+                        headers={"Authorization": f"Bearer {access_token}"}
+                    )
+                stats.pages_fetched += 1
+                with stats.phase("parse"):
+                    data = response.json()
                 return data.get("accounts", [])
         except Exception as e:
             logger.error(f"Error fetching accounts: {e}")
             raise
     
-    async def fetch_transactions(
+    async def iter_transaction_pages(
         self,
         access_token: str,
         account_id: str,
         date_from: Optional[datetime] = None,
-        date_to: Optional[datetime] = None
-    ) -> List[Dict[str, Any]]:
+        date_to: Optional[datetime] = None,
+        stats: Optional[SyncStats] = None
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
         """
-        Получить транзакции для счета из банковского API
+        Загружать транзакции счета постранично
+        
+        Страницы идут, пока банк возвращает поле next_page.
         
         Args:
             access_token: Access token для авторизации
             account_id: ID счета в банке
             date_from: Начальная дата
             date_to: Конечная дата
+            stats: Статистика синхронизации
             
         Returns:
-            Список транзакций
+            Асинхронный итератор страниц транзакций
         """
+        stats = stats or SyncStats()
+        params = {}
+        if date_from:
+            params["date_from"] = date_from.isoformat()
+        if date_to:
+            params["date_to"] = date_to.isoformat()
+        
         try:
-            params = {}
-            if date_from:
-                params["date_from"] = date_from.isoformat()
-            if date_to:
-                params["date_to"] = date_to.isoformat()
-            
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(
-                    f"{self.base_url}/api/v1/accounts/{account_id}/transactions",
-                    headers={"Authorization": f"Bearer {access_token}"},
-                    params=params
-                )
-                response.raise_for_status()
-                data = response.json()
-                return data.get("transactions", [])
+            async with httpx.AsyncClient(timeout=self.timeout, transport=TracingTransport()) as client:
+                while True:
+                    with stats.phase("transactions_fetch"):
+                        response = await self._send(
+                            client,
+                            "GET",
+                            f"{self.base_url}/api/v1/accounts/{account_id}/transactions",
+                            stats=stats,
+                            headers={"Authorization": f"Bearer {access_token}"},
+                            params=params
+                        )
+                    stats.pages_fetched += 1
+                    with stats.phase("parse"):
+                        data = response.json()
+                    yield data.get("transactions", [])
+                    
+                    next_page = data.get("next_page")
+                    if not next_page:
+                        return
+                    params["page"] = next_page
         except Exception as e:
             logger.error(f"Error fetching transactions: {e}")
             raise
     
+    async def fetch_transactions(
+        self,
+        access_token: str,
+        account_id: str,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        stats: Optional[SyncStats] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Получить все транзакции для счета из банковского API
+        
+        Args:
+            access_token: Access token для авторизации
+            account_id: ID счета в банке
+            date_from: Начальная дата
+            date_to: Конечная дата
+            stats: Статистика синхронизации
+            
+        Returns:
+            Список транзакций
+        """
+        transactions: List[Dict[str, Any]] = []
+        async for page in self.iter_transaction_pages(access_token, account_id, date_from, date_to, stats):
+            transactions.extend(page)
+        return transactions
+    
     def map_account_type(self, bank_account_type: str) -> AccountType:
         """
         Преобразовать тип счета из банковского API в наш тип
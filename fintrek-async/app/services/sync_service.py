@@ -1,31 +1,94 @@
 """
 Сервис синхронизации данных с банками
 """
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Callable, Awaitable, List, Iterable
+from collections import Counter
+from contextlib import AsyncExitStack
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from decimal import Decimal
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from uuid import UUID
+import asyncio
 import logging
+import time
 
+from app.connectors import (
+    BankConnector,
+    BankAccountData,
+    BankTransactionData,
+    ConnectorToken,
+    TransactionPage,
+    get_connector,
+)
 from app.models.bank_connection import BankConnection, BankConnectionStatus
-from app.models.account import Account, AccountType, AccountStatus
-from app.models.transaction import Transaction, TransactionType, TransactionStatus
-from app.services.open_banking_service import open_banking_service
-from app.core.security import decrypt_token, encrypt_token
+from app.models.account import Account, AccountStatus
+from app.models.transaction import Transaction, TransactionStatus
+from app.models.sync_run import SyncRun, SyncRunStatus
+from app.services.sync_stats import SyncStats, SYNC_PHASES
+from app.core.security import encrypt_token
+from app.core.config import settings
+from app.core.data_version import bump_data_version
+from app.core.locks import LeaseLock, LockLost, LockNotAcquired
 
 logger = logging.getLogger(__name__)
 
+# Колбэк прогресса: (обработано, всего, **счетчики)
+ProgressCallback = Callable[..., Awaitable[None]]
+
+
+@dataclass(eq=False)
+class _ConnectionSync:
+    """Состояние синхронизации одного подключения в sync_user"""
+    connection: BankConnection
+    connector: BankConnector
+    stats: SyncStats
+    run: SyncRun
+    lock: Optional[LeaseLock] = None  # Блокировка подключения на время синхронизации
+    accounts: Dict[str, Account] = field(default_factory=dict)  # external_id -> счет
+    accounts_synced: int = 0
+    transactions_synced: int = 0
+    error: Optional[str] = None
+    done: bool = False
+
+
+@dataclass
+class _WriteItem:
+    """Сообщение от загрузчика подключения стадии записи"""
+    kind: str  # token | accounts | transactions | account_done | account_error | done
+    sync: _ConnectionSync
+    token: Optional[ConnectorToken] = None
+    accounts: Optional[List[BankAccountData]] = None
+    account_id: Optional[str] = None
+    page: Optional[TransactionPage] = None
+    error: Optional[str] = None
+
 
 class SyncService:
     """Сервис для синхронизации данных с банковскими API"""
     
+    def connection_lock(self, connection_id: Any) -> LeaseLock:
+        """
+        Блокировка синхронизации подключения
+        
+        Одна на подключение для всех воркеров и процессов: параллельные
+        синхронизации тратят квоту банка и конфликтуют по external_id.
+        """
+        return LeaseLock(
+            f"sync-lock:connection:{connection_id}",
+            ttl_seconds=settings.SYNC_LOCK_TTL_SECONDS
+        )
+    
     async def sync_bank_connection(
         self,
         db: AsyncSession,
         connection_id: str,
-        user_id: str
+        user_id: str,
+        on_progress: Optional[ProgressCallback] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        account_ids: Optional[Iterable[str]] = None
     ) -> Dict[str, Any]:
         """
         Синхронизировать данные для конкретного подключения к банку
@@ -34,6 +97,10 @@ class SyncService:
             db: Database session
             connection_id: ID подключения к банку
             user_id: ID пользователя
+            on_progress: Колбэк для отчета о прогрессе (например, из фоновой задачи)
+            date_from: Начало периода (по умолчанию от курсора каждого счета)
+            date_to: Конец периода
+            account_ids: Синхронизировать транзакции только этих счетов (ID в банке)
             
         Returns:
             Dict с результатами синхронизации
@@ -52,23 +119,472 @@ class SyncService:
         if connection.status == BankConnectionStatus.DISCONNECTED:
             raise ValueError("Bank connection is disconnected")
         
+        stats = SyncStats()
+        run = await self._start_run(db, connection, "incremental", stats)
+        
+        try:
+            async with self.connection_lock(connection.id) as lock:
+                result = await self._run_sync(
+                    db, connection, stats, on_progress, date_from, date_to, account_ids, lock=lock
+                )
+        except LockNotAcquired:
+            logger.info(f"Bank connection {connection_id} is already being synchronized")
+            result = {
+                "success": False,
+                "already_syncing": True,
+                "message": "Synchronization is already in progress",
+                "accounts_synced": 0,
+                "transactions_synced": 0
+            }
+        except Exception as e:
+            # Ошибка вне _run_sync (Redis при взятии или снятии блокировки, колбэк
+            # прогресса) не должна оставлять запуск в статусе RUNNING
+            logger.error(f"Bank connection {connection_id} sync aborted: {e}")
+            await db.rollback()
+            await self._finish_run(db, run, stats, SyncRunStatus.FAILED, error=str(e))
+            await bump_data_version(user_id)
+            raise
+        
+        if result.get("already_syncing"):
+            status = SyncRunStatus.SKIPPED
+        else:
+            status = SyncRunStatus.SUCCEEDED if result["success"] else SyncRunStatus.FAILED
+        await self._finish_run(
+            db, run, stats, status,
+            error=None if result["success"] else result["message"]
+        )
+        if status != SyncRunStatus.SKIPPED:
+            await bump_data_version(user_id)
+        return result
+    
+    async def sync_user(
+        self,
+        db: AsyncSession,
+        user_id: str,
+        on_progress: Optional[ProgressCallback] = None
+    ) -> Dict[str, Any]:
+        """
+        Синхронизировать все подключения пользователя параллельно
+        
+        Каждое подключение загружается своим коннектором в отдельной задаче
+        (не больше SYNC_USER_CONCURRENCY одновременно). Загрузчики не работают
+        с БД: страницы транзакций через очередь уходят в общую стадию записи,
+        которая вставляет их пачками до SYNC_WRITE_BATCH_SIZE строк из всех
+        подключений сразу. Подключения, которые уже синхронизируются, пропускаются.
+        
+        Args:
+            db: Database session
+            user_id: ID пользователя
+            on_progress: Колбэк для отчета о прогрессе по подключениям
+            
+        Returns:
+            Dict с итогами по каждому подключению и суммарными счетчиками
+        """
+        stmt = select(BankConnection).filter(
+            BankConnection.user_id == UUID(user_id),
+            BankConnection.status != BankConnectionStatus.DISCONNECTED
+        )
+        connections = (await db.execute(stmt)).scalars().all()
+        
+        async with AsyncExitStack() as locks:
+            syncs: List[_ConnectionSync] = []
+            results: List[Dict[str, Any]] = []
+            
+            for connection in connections:
+                stats = SyncStats()
+                run = await self._start_run(db, connection, "incremental", stats)
+                lock = self.connection_lock(connection.id)
+                try:
+                    await locks.enter_async_context(lock)
+                    connector = get_connector(connection.provider)
+                except LockNotAcquired:
+                    await self._finish_run(db, run, stats, SyncRunStatus.SKIPPED)
+                    results.append(self._connection_result(connection, "skipped"))
+                    continue
+                except Exception as e:
+                    # Неизвестный провайдер или недоступный Redis - запуск завершается ошибкой
+                    logger.error(f"Cannot start sync of bank connection {connection.id}: {e}")
+                    await self._finish_run(db, run, stats, SyncRunStatus.FAILED, error=str(e))
+                    results.append(self._connection_result(connection, "failed", error=str(e)))
+                    continue
+                syncs.append(_ConnectionSync(connection, connector, stats, run, lock=lock))
+            
+            if syncs:
+                try:
+                    await self._run_pipeline(db, syncs, on_progress)
+                except Exception as e:
+                    logger.error(f"Bulk write stage failed for user {user_id}: {e}")
+                    await db.rollback()
+                    for sync in syncs:
+                        await self._finish_run(
+                            db, sync.run, sync.stats, SyncRunStatus.FAILED,
+                            error=f"Write stage failed: {e}"
+                        )
+                    raise
+            
+            for sync in syncs:
+                if sync.error:
+                    self._mark_failed(sync.connection, sync.error)
+                else:
+                    self._mark_synced(sync.connection)
+                await self._finish_run(
+                    db, sync.run, sync.stats,
+                    SyncRunStatus.FAILED if sync.error else SyncRunStatus.SUCCEEDED,
+                    error=sync.error
+                )
+                results.append(self._connection_result(
+                    sync.connection,
+                    "failed" if sync.error else "succeeded",
+                    accounts_synced=sync.accounts_synced,
+                    transactions_synced=sync.transactions_synced,
+                    error=sync.error
+                ))
+        
+        if syncs:
+            await bump_data_version(user_id)
+        
+        statuses = Counter(result["status"] for result in results)
+        return {
+            "connections": len(results),
+            "succeeded": statuses["succeeded"],
+            "failed": statuses["failed"],
+            "skipped": statuses["skipped"],
+            "accounts_synced": sum(result["accounts_synced"] for result in results),
+            "transactions_synced": sum(result["transactions_synced"] for result in results),
+            "results": results
+        }
+    
+    def _connection_result(
+        self,
+        connection: BankConnection,
+        status: str,
+        accounts_synced: int = 0,
+        transactions_synced: int = 0,
+        error: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Итог синхронизации подключения для ответа sync_user"""
+        return {
+            "connection_id": str(connection.id),
+            "provider": connection.provider,
+            "bank_name": connection.bank_name,
+            "status": status,
+            "accounts_synced": accounts_synced,
+            "transactions_synced": transactions_synced,
+            "error": error
+        }
+    
+    async def _run_pipeline(
+        self,
+        db: AsyncSession,
+        syncs: List[_ConnectionSync],
+        on_progress: Optional[ProgressCallback] = None
+    ) -> None:
+        """
+        Запустить загрузчики подключений и общую стадию записи
+        
+        Ошибки загрузки записываются в _ConnectionSync.error, ошибка
+        записи в БД пробрасывается и прерывает синхронизацию всех подключений.
+        """
+        # Курсоры счетов читаются заранее: загрузчики не обращаются к сессии
+        stmt = select(Account.bank_connection_id, Account.account_number, Account.sync_cursor).filter(
+            Account.bank_connection_id.in_([sync.connection.id for sync in syncs])
+        )
+        cursors: Dict[Any, Dict[str, Optional[str]]] = {}
+        for connection_id, account_number, sync_cursor in (await db.execute(stmt)).all():
+            cursors.setdefault(connection_id, {})[account_number] = sync_cursor
+        
+        # Ограниченная очередь притормаживает загрузчики, если запись не успевает
+        queue: asyncio.Queue = asyncio.Queue(maxsize=settings.SYNC_USER_CONCURRENCY * 4)
+        semaphore = asyncio.Semaphore(settings.SYNC_USER_CONCURRENCY)
+        producers = [
+            asyncio.create_task(self._fetch_connection(
+                sync, cursors.get(sync.connection.id, {}), queue, semaphore
+            ))
+            for sync in syncs
+        ]
+        
+        try:
+            await self._write_stage(db, syncs, queue, on_progress)
+        finally:
+            for producer in producers:
+                producer.cancel()
+            await asyncio.gather(*producers, return_exceptions=True)
+    
+    async def _fetch_connection(
+        self,
+        sync: _ConnectionSync,
+        cursors: Dict[str, Optional[str]],
+        queue: asyncio.Queue,
+        semaphore: asyncio.Semaphore
+    ) -> None:
+        """
+        Загрузить данные подключения и передать их стадии записи
+        
+        Args:
+            sync: Состояние синхронизации подключения
+            cursors: Курсоры счетов подключения по ID в банке
+            queue: Очередь стадии записи
+            semaphore: Ограничение параллельных загрузок
+        """
+        connector, stats = sync.connector, sync.stats
+        try:
+            async with semaphore:
+                token = await connector.authenticate(sync.connection, stats)
+                if token.refreshed:
+                    await queue.put(_WriteItem("token", sync, token=token))
+                
+                bank_accounts = await connector.fetch_accounts(token, stats)
+                await queue.put(_WriteItem("accounts", sync, accounts=bank_accounts))
+                
+                for bank_account in bank_accounts:
+                    if not bank_account.external_id:
+                        continue
+                    try:
+                        async for page in connector.iter_transactions(
+                            token,
+                            bank_account.external_id,
+                            date_from=connector.date_from_cursor(cursors.get(bank_account.external_id)),
+                            date_to=None,
+                            stats=stats
+                        ):
+                            # Без блокировки подключение может загружать другой процесс
+                            sync.lock.ensure_held()
+                            await queue.put(_WriteItem(
+                                "transactions", sync, account_id=bank_account.external_id, page=page
+                            ))
+                        await queue.put(_WriteItem("account_done", sync, account_id=bank_account.external_id))
+                    except LockLost:
+                        raise
+                    except Exception as e:
+                        logger.error(f"Error syncing transactions for account {bank_account.external_id}: {e}")
+                        await queue.put(_WriteItem(
+                            "account_error", sync, account_id=bank_account.external_id, error=str(e)
+                        ))
+        except Exception as e:
+            logger.error(f"Error syncing bank connection {sync.connection.id}: {e}")
+            await queue.put(_WriteItem("done", sync, error=str(e)))
+        else:
+            await queue.put(_WriteItem("done", sync))
+    
+    async def _write_stage(
+        self,
+        db: AsyncSession,
+        syncs: List[_ConnectionSync],
+        queue: asyncio.Queue,
+        on_progress: Optional[ProgressCallback] = None
+    ) -> None:
+        """
+        Общая стадия записи: разбирать очередь до завершения всех загрузчиков
+        
+        Транзакции копятся и вставляются одной пачкой, когда набралось
+        SYNC_WRITE_BATCH_SIZE строк или очередь опустела (загрузчики ждут банк).
+        """
+        pending_rows: List[Dict[str, Any]] = []
+        # Курсор счета сдвигается только после загрузки всех его страниц:
+        # страницы идут от новых к старым, и сбой посередине оставил бы дыру
+        running_cursors: Dict[Account, Optional[str]] = {}
+        pending_cursors: Dict[Account, str] = {}
+        account_owner: Dict[UUID, _ConnectionSync] = {}
+        finished = 0
+        
+        while finished < len(syncs):
+            item: _WriteItem = await queue.get()
+            sync = item.sync
+            
+            if item.kind != "done" and self._lease_lost(sync):
+                # Данные подключения без блокировки не пишутся
+                continue
+            
+            if item.kind == "token":
+                self._save_token(sync.connection, item.token)
+            
+            elif item.kind == "accounts":
+                sync.accounts = await self._upsert_accounts(db, sync.connection, item.accounts, sync.stats)
+                sync.accounts_synced = len(sync.accounts)
+                for account in sync.accounts.values():
+                    account_owner[account.id] = sync
+            
+            elif item.kind == "transactions":
+                account = sync.accounts[item.account_id]
+                with sync.stats.phase("parse"):
+                    pending_rows.extend(self._transaction_rows(sync.connection.user_id, account.id, item.page.transactions))
+                running_cursors[account] = sync.connector.cursor_after(
+                    running_cursors.get(account, account.sync_cursor), item.page
+                )
+            
+            elif item.kind == "account_done":
+                account = sync.accounts[item.account_id]
+                cursor = running_cursors.pop(account, None)
+                if cursor:
+                    pending_cursors[account] = cursor
+            
+            elif item.kind == "account_error":
+                account = sync.accounts.get(item.account_id)
+                if account:
+                    running_cursors.pop(account, None)
+                    account.sync_error = item.error
+            
+            elif item.kind == "done":
+                sync.error = sync.error or item.error
+                sync.done = True
+                finished += 1
+            
+            if pending_rows and (len(pending_rows) >= settings.SYNC_WRITE_BATCH_SIZE or queue.empty()):
+                pending_rows = [row for row in pending_rows if not self._lease_lost(account_owner[row["account_id"]])]
+                pending_cursors = {
+                    account: cursor for account, cursor in pending_cursors.items()
+                    if not self._lease_lost(account_owner[account.id])
+                }
+                if pending_rows:
+                    await self._flush_batch(db, pending_rows, pending_cursors, account_owner)
+                pending_rows, pending_cursors = [], {}
+            
+            if item.kind == "done" and on_progress:
+                await on_progress(
+                    finished, len(syncs),
+                    transactions_synced=sum(s.transactions_synced for s in syncs)
+                )
+        
+        for account, cursor in pending_cursors.items():
+            if not self._lease_lost(account_owner[account.id]):
+                account.sync_cursor = cursor
+        await db.commit()
+    
+    def _lease_lost(self, sync: _ConnectionSync) -> bool:
+        """Потеряна ли блокировка подключения (тогда синхронизация завершается ошибкой)"""
+        if sync.lock is None or not sync.lock.lost:
+            return False
+        if sync.error is None:
+            logger.warning(f"Sync lock of bank connection {sync.connection.id} was lost, discarding its data")
+            sync.error = f"Lease lock {sync.lock.key} was lost"
+        return True
+    
+    async def _flush_batch(
+        self,
+        db: AsyncSession,
+        rows: List[Dict[str, Any]],
+        cursors: Dict[Account, str],
+        account_owner: Dict[UUID, _ConnectionSync]
+    ) -> None:
+        """
+        Вставить пачку транзакций нескольких подключений и сдвинуть курсоры
+        
+        Время записи делится между подключениями пропорционально числу строк.
+        """
+        started = time.perf_counter()
+        inserted_accounts = await self._bulk_insert(db, rows)
+        for account, cursor in cursors.items():
+            account.sync_cursor = cursor
+        await db.commit()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        
+        rows_by_sync = Counter(account_owner[row["account_id"]] for row in rows)
+        inserted_by_sync = Counter(account_owner[account_id] for account_id in inserted_accounts)
+        for sync, count in rows_by_sync.items():
+            inserted = inserted_by_sync[sync]
+            sync.stats.rows_inserted += inserted
+            sync.stats.rows_skipped += count - inserted
+            sync.stats.phase_ms["db_write"] += elapsed_ms * count / len(rows)
+            sync.transactions_synced += inserted
+    
+    async def _start_run(
+        self,
+        db: AsyncSession,
+        connection: BankConnection,
+        mode: str,
+        stats: SyncStats
+    ) -> SyncRun:
+        """Создать запись о запуске синхронизации"""
+        run = SyncRun(
+            connection_id=connection.id,
+            user_id=connection.user_id,
+            mode=mode,
+            status=SyncRunStatus.RUNNING,
+            started_at=stats.started_at
+        )
+        db.add(run)
+        await db.commit()
+        return run
+    
+    async def _finish_run(
+        self,
+        db: AsyncSession,
+        run: SyncRun,
+        stats: SyncStats,
+        status: SyncRunStatus,
+        error: Optional[str] = None
+    ) -> None:
+        """Сохранить итог запуска синхронизации, тайминги и объемы"""
+        # Время берется из stats: после rollback атрибуты run просрочены
+        finished_at = datetime.utcnow()
+        run.finished_at = finished_at
+        run.duration_ms = int((finished_at - stats.started_at).total_seconds() * 1000)
+        run.status = status
+        run.error = error
+        for phase in SYNC_PHASES:
+            setattr(run, f"{phase}_ms", int(stats.phase_ms.get(phase, 0)))
+        run.pages_fetched = stats.pages_fetched
+        run.bytes_received = stats.bytes_received
+        run.rows_inserted = stats.rows_inserted
+        run.rows_updated = stats.rows_updated
+        run.rows_skipped = stats.rows_skipped
+        run.retries = stats.retries
+        await db.commit()
+    
+    async def _run_sync(
+        self,
+        db: AsyncSession,
+        connection: BankConnection,
+        stats: SyncStats,
+        on_progress: Optional[ProgressCallback] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        account_ids: Optional[Iterable[str]] = None,
+        lock: Optional[LeaseLock] = None
+    ) -> Dict[str, Any]:
+        """
+        Выполнить синхронизацию подключения (под блокировкой)
+        
+        Args:
+            db: Database session
+            connection: BankConnection объект
+            stats: Статистика запуска
+            on_progress: Колбэк для отчета о прогрессе
+            date_from: Начало периода
+            date_to: Конец периода
+            account_ids: Ограничить синхронизацию транзакций этими счетами
+            lock: Блокировка подключения; при ее потере синхронизация прерывается
+            
+        Returns:
+            Dict с результатами синхронизации
+        """
         accounts_synced = 0
         transactions_synced = 0
         
         try:
+            connector = get_connector(connection.provider)
+            
             # Проверить и обновить токен если нужно
-            access_token = await self._ensure_valid_token(db, connection)
+            token = await self._authenticate(db, connection, connector, stats)
             
             # Синхронизировать счета
-            accounts_synced = await self._sync_accounts(db, connection, access_token)
+            accounts_synced = await self._sync_accounts(db, connection, connector, token, stats)
+            if on_progress:
+                await on_progress(0, accounts_synced, accounts_synced=accounts_synced)
             
             # Синхронизировать транзакции для каждого счета
-            transactions_synced = await self._sync_transactions(db, connection, access_token)
+            transactions_synced = await self._sync_transactions(
+                db, connection, connector, token, stats, on_progress,
+                date_from=date_from,
+                date_to=date_to,
+                account_ids=account_ids,
+                lock=lock
+            )
             
             # Обновить время последней синхронизации
-            connection.last_synced_at = datetime.utcnow()
-            connection.status = BankConnectionStatus.ACTIVE
-            connection.last_error = None
+            if lock is not None:
+                lock.ensure_held()
+            self._mark_synced(connection)
             await db.commit()
             
             return {
@@ -78,10 +594,21 @@ class SyncService:
                 "transactions_synced": transactions_synced
             }
             
+        except LockLost as e:
+            # Незафиксированные данные отбрасываются: подключение мог взять другой процесс
+            logger.warning(f"Sync of bank connection {connection.id} aborted: {e}")
+            await db.rollback()
+            
+            return {
+                "success": False,
+                "message": f"Synchronization aborted: {str(e)}",
+                "accounts_synced": 0,
+                "transactions_synced": 0
+            }
+            
         except Exception as e:
-            logger.error(f"Error syncing bank connection {connection_id}: {e}")
-            connection.status = BankConnectionStatus.ERROR
-            connection.last_error = str(e)
+            logger.error(f"Error syncing bank connection {connection.id}: {e}")
+            self._mark_failed(connection, str(e))
             await db.commit()
             
             return {
@@ -91,44 +618,56 @@ class SyncService:
                 "transactions_synced": transactions_synced
             }
     
-    async def _ensure_valid_token(self, db: AsyncSession, connection: BankConnection) -> str:
+    def _mark_synced(self, connection: BankConnection) -> None:
+        """Отметить успешную синхронизацию подключения"""
+        connection.last_synced_at = datetime.utcnow()
+        connection.status = BankConnectionStatus.ACTIVE
+        connection.last_error = None
+    
+    def _mark_failed(self, connection: BankConnection, error: str) -> None:
+        """Отметить ошибку синхронизации подключения"""
+        connection.status = BankConnectionStatus.ERROR
+        connection.last_error = error
+    
+    async def _authenticate(
+        self,
+        db: AsyncSession,
+        connection: BankConnection,
+        connector: BankConnector,
+        stats: SyncStats
+    ) -> ConnectorToken:
         """
-        Убедиться что access token валиден, обновить если нужно
+        Получить токен коннектора и сохранить его, если он был обновлен
         
         Args:
             db: Database session
             connection: BankConnection объект
+            connector: Коннектор банка
+            stats: Статистика запуска
             
         Returns:
-            Валидный access token
+            Действующий токен
         """
-        # Расшифровать токен
-        access_token = decrypt_token(connection.access_token_encrypted)
-        
-        # Проверить срок действия
-        if connection.token_expires_at and connection.token_expires_at < datetime.utcnow():
-            # Токен истек, обновить
-            refresh_token = decrypt_token(connection.refresh_token_encrypted)
-            
-            tokens = await open_banking_service.refresh_access_token(refresh_token)
-            
-            # Обновить токены в БД
-            connection.access_token_encrypted = encrypt_token(tokens["access_token"])
-            if "refresh_token" in tokens:
-                connection.refresh_token_encrypted = encrypt_token(tokens["refresh_token"])
-            
-            connection.token_expires_at = datetime.utcnow() + timedelta(seconds=tokens.get("expires_in", 3600))
+        token = await connector.authenticate(connection, stats)
+        if token.refreshed:
+            self._save_token(connection, token)
             await db.commit()
-            
-            access_token = tokens["access_token"]
-        
-        return access_token
+        return token
+    
+    def _save_token(self, connection: BankConnection, token: ConnectorToken) -> None:
+        """Сохранить обновленные токены в подключении (зашифрованными)"""
+        connection.access_token_encrypted = encrypt_token(token.access_token)
+        if token.refresh_token:
+            connection.refresh_token_encrypted = encrypt_token(token.refresh_token)
+        connection.token_expires_at = datetime.utcnow() + timedelta(seconds=token.expires_in or 3600)
     
     async def _sync_accounts(
         self,
         db: AsyncSession,
         connection: BankConnection,
-        access_token: str
+        connector: BankConnector,
+        token: ConnectorToken,
+        stats: SyncStats
     ) -> int:
         """
         Синхронизировать счета
@@ -136,66 +675,122 @@ class SyncService:
         Args:
             db: Database session
             connection: BankConnection объект
-            access_token: Access token
+            connector: Коннектор банка
+            token: Токен коннектора
+            stats: Статистика запуска
             
         Returns:
             Количество синхронизированных счетов
         """
         # Получить счета из банковского API
-        bank_accounts = await open_banking_service.fetch_accounts(access_token)
+        bank_accounts = await connector.fetch_accounts(token, stats)
         
-        synced_count = 0
+        accounts = await self._upsert_accounts(db, connection, bank_accounts, stats)
+        
+        with stats.phase("db_write"):
+            await db.commit()
+        return len(accounts)
+    
+    async def _upsert_accounts(
+        self,
+        db: AsyncSession,
+        connection: BankConnection,
+        bank_accounts: List[BankAccountData],
+        stats: SyncStats
+    ) -> Dict[str, Account]:
+        """
+        Обновить существующие и создать новые счета подключения
+        
+        Существующие счета загружаются одним запросом и сопоставляются
+        по номеру счета в банке. Изменения не фиксируются.
+        
+        Returns:
+            Счета подключения по ID в банке
+        """
+        stmt = select(Account).filter(
+            Account.bank_connection_id == connection.id
+        )
+        with stats.phase("db_write"):
+            existing = {
+                account.account_number: account
+                for account in (await db.execute(stmt)).scalars().all()
+            }
+        
+        accounts: Dict[str, Account] = {}
+        now = datetime.utcnow()
         
         for bank_account in bank_accounts:
-            # Проверить существует ли счет
-            stmt = select(Account).filter(
-                Account.bank_connection_id == connection.id,
-                Account.account_number == bank_account.get("account_number")
-            )
-            result = await db.execute(stmt)
-            account = result.scalar_one_or_none()
+            account = existing.get(bank_account.external_id)
             
             if account:
                 # Обновить существующий счет
-                account.balance = Decimal(str(bank_account.get("balance", 0)))
-                account.available_balance = Decimal(str(bank_account.get("available_balance", 0))) if bank_account.get("available_balance") else None
-                account.last_synced_at = datetime.utcnow()
+                account.balance = bank_account.balance
+                account.available_balance = bank_account.available_balance
+                account.last_synced_at = now
                 account.status = AccountStatus.ACTIVE
                 account.sync_error = None
+                stats.rows_updated += 1
             else:
                 # Создать новый счет
                 account = Account(
                     user_id=connection.user_id,
                     bank_connection_id=connection.id,
-                    account_name=bank_account.get("name", f"{connection.bank_name} Account"),
-                    account_number=bank_account.get("account_number"),
-                    account_type=open_banking_service.map_account_type(bank_account.get("type", "checking")),
-                    currency=bank_account.get("currency", "RUB"),
-                    balance=Decimal(str(bank_account.get("balance", 0))),
-                    available_balance=Decimal(str(bank_account.get("available_balance", 0))) if bank_account.get("available_balance") else None,
+                    account_name=bank_account.name or f"{connection.bank_name} Account",
+                    account_number=bank_account.external_id,
+                    account_type=bank_account.account_type,
+                    currency=bank_account.currency,
+                    balance=bank_account.balance,
+                    available_balance=bank_account.available_balance,
                     status=AccountStatus.ACTIVE,
-                    last_synced_at=datetime.utcnow()
+                    last_synced_at=now
                 )
                 db.add(account)
+                stats.rows_inserted += 1
             
-            synced_count += 1
+            accounts[bank_account.external_id] = account
         
-        await db.commit()
-        return synced_count
+        # ID новых счетов нужны для вставки транзакций
+        with stats.phase("db_write"):
+            await db.flush()
+        return accounts
     
     async def _sync_transactions(
         self,
         db: AsyncSession,
         connection: BankConnection,
-        access_token: str
+        connector: BankConnector,
+        token: ConnectorToken,
+        stats: SyncStats,
+        on_progress: Optional[ProgressCallback] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        account_ids: Optional[Iterable[str]] = None,
+        strict: bool = False,
+        lock: Optional[LeaseLock] = None
     ) -> int:
         """
         Синхронизировать транзакции для всех счетов подключения
         
+        Без date_from загрузка инкрементальная: каждый счет продолжает
+        со своего курсора (sync_cursor), а без курсора берутся последние
+        SYNC_INCREMENTAL_DAYS дней. Глубокая история загружается через backfill.
+        
+        Ошибка счета записывается в sync_error и не прерывает остальные счета.
+        С strict=True после фиксации загруженного она пробрасывается
+        (RuntimeError): backfill не должен считать окно загруженным.
+        
         Args:
             db: Database session
             connection: BankConnection объект
-            access_token: Access token
+            connector: Коннектор банка
+            token: Токен коннектора
+            stats: Статистика запуска
+            on_progress: Колбэк для отчета о прогрессе по счетам
+            date_from: Начало периода (курсоры счетов при этом не меняются)
+            date_to: Конец периода (не включительно)
+            account_ids: Только эти счета (ID в банке)
+            strict: Пробросить ошибку, если хотя бы один счет не загрузился
+            lock: Блокировка, которая проверяется перед каждой записью (LockLost)
             
         Returns:
             Количество синхронизированных транзакций
@@ -204,68 +799,265 @@ class SyncService:
         stmt = select(Account).filter(
             Account.bank_connection_id == connection.id
         )
+        if account_ids is not None:
+            stmt = stmt.filter(Account.account_number.in_(list(account_ids)))
         result = await db.execute(stmt)
         accounts = result.scalars().all()
         
         synced_count = 0
+        incremental = date_from is None
+        failed_accounts: List[str] = []
         
-        # Синхронизировать транзакции за последние 30 дней
-        date_from = datetime.utcnow() - timedelta(days=30)
-        
-        for account in accounts:
+        for index, account in enumerate(accounts, start=1):
+            if on_progress and index > 1:
+                await on_progress(index - 1, len(accounts), transactions_synced=synced_count)
+            
             if not account.account_number:
                 continue
             
             try:
-                # Получить транзакции из банковского API
-                bank_transactions = await open_banking_service.fetch_transactions(
-                    access_token,
+                cursor = account.sync_cursor
+                async for page in connector.iter_transactions(
+                    token,
                     account.account_number,
-                    date_from=date_from
-                )
+                    date_from=date_from or connector.date_from_cursor(account.sync_cursor),
+                    date_to=date_to,
+                    stats=stats
+                ):
+                    if lock is not None:
+                        lock.ensure_held()
+                    rows = self._transaction_rows(connection.user_id, account.id, page.transactions)
+                    with stats.phase("db_write"):
+                        inserted = len(await self._bulk_insert(db, rows))
+                    stats.rows_inserted += inserted
+                    stats.rows_skipped += len(rows) - inserted
+                    synced_count += inserted
+                    cursor = connector.cursor_after(cursor, page)
                 
-                for bank_txn in bank_transactions:
-                    external_id = bank_txn.get("id")
-                    
-                    # Проверить существует ли транзакция
-                    stmt = select(Transaction).filter(
-                        Transaction.external_id == external_id
-                    )
-                    result = await db.execute(stmt)
-                    existing = result.scalar_one_or_none()
-                    
-                    if existing:
-                        continue  # Транзакция уже существует
-                    
-                    # Создать новую транзакцию
-                    amount = Decimal(str(abs(bank_txn.get("amount", 0))))
-                    transaction_type = open_banking_service.map_transaction_type(
-                        bank_txn.get("type", ""),
-                        float(bank_txn.get("amount", 0))
-                    )
-                    
-                    transaction = Transaction(
-                        user_id=connection.user_id,
-                        account_id=account.id,
-                        transaction_type=transaction_type,
-                        amount=amount,
-                        currency=bank_txn.get("currency", "RUB"),
-                        description=bank_txn.get("description"),
-                        merchant_name=bank_txn.get("merchant_name"),
-                        transaction_date=datetime.fromisoformat(bank_txn.get("date")) if bank_txn.get("date") else datetime.utcnow(),
-                        posted_date=datetime.fromisoformat(bank_txn.get("posted_date")) if bank_txn.get("posted_date") else None,
-                        status=TransactionStatus.COMPLETED,
-                        external_id=external_id
-                    )
-                    db.add(transaction)
-                    synced_count += 1
+                if incremental:
+                    account.sync_cursor = cursor
                 
+            except LockLost:
+                raise
             except Exception as e:
                 logger.error(f"Error syncing transactions for account {account.id}: {e}")
                 account.sync_error = str(e)
+                failed_accounts.append(account.account_number)
         
-        await db.commit()
+        if lock is not None:
+            lock.ensure_held()
+        with stats.phase("db_write"):
+            await db.commit()
+        if strict and failed_accounts:
+            raise RuntimeError(f"Failed to sync transactions for accounts: {', '.join(failed_accounts)}")
+        if on_progress:
+            await on_progress(len(accounts), len(accounts), transactions_synced=synced_count)
         return synced_count
+    
+    def _transaction_rows(
+        self,
+        user_id: UUID,
+        account_id: UUID,
+        transactions: List[BankTransactionData]
+    ) -> List[Dict[str, Any]]:
+        """Строки для пакетной вставки транзакций счета"""
+        return [
+            {
+                "user_id": user_id,
+                "account_id": account_id,
+                "transaction_type": txn.transaction_type,
+                "amount": txn.amount,
+                "currency": txn.currency,
+                "description": txn.description,
+                "merchant_name": txn.merchant_name,
+                "transaction_date": txn.transaction_date,
+                "posted_date": txn.posted_date,
+                "status": TransactionStatus.COMPLETED,
+                "external_id": txn.external_id
+            }
+            for txn in transactions
+        ]
+    
+    async def _bulk_insert(self, db: AsyncSession, rows: List[Dict[str, Any]]) -> List[UUID]:
+        """
+        Сохранить транзакции одной пакетной вставкой
+        
+        Уже загруженные транзакции пропускаются по уникальному external_id
+        (ON CONFLICT DO NOTHING), поэтому повторная загрузка окна после
+        сбоя и параллельная инкрементальная синхронизация безопасны.
+        
+        Args:
+            db: Database session
+            rows: Строки из _transaction_rows (могут быть из разных счетов)
+            
+        Returns:
+            ID счетов вставленных транзакций, по одному на строку
+        """
+        if not rows:
+            return []
+        
+        stmt = pg_insert(Transaction).on_conflict_do_nothing(
+            index_elements=[Transaction.external_id]
+        ).returning(Transaction.account_id)
+        result = await db.execute(stmt, rows)
+        return list(result.scalars().all())
+    
+    async def backfill_bank_connection(
+        self,
+        db: AsyncSession,
+        connection_id: str,
+        user_id: str,
+        max_windows: Optional[int] = None,
+        on_progress: Optional[ProgressCallback] = None
+    ) -> Dict[str, Any]:
+        """
+        Загрузить историю транзакций подключения помесячными окнами
+        
+        Окна обходятся от новых к старым до SYNC_BACKFILL_MONTHS месяцев назад.
+        После каждого окна в подключении сохраняется контрольная точка
+        (backfill_cursor), поэтому после сбоя или перезапуска загрузка
+        продолжается с места остановки. Окно, в котором не загрузился хотя бы
+        один счет, не отмечается: вызов завершается ошибкой, а задачу backfill
+        снова ставит в очередь следующая синхронизация подключения.
+        
+        Args:
+            db: Database session
+            connection_id: ID подключения к банку
+            user_id: ID пользователя
+            max_windows: Сколько окон обработать за вызов (None - до конца)
+            on_progress: Колбэк для отчета о прогрессе по окнам
+            
+        Returns:
+            Dict с результатами; completed=False, если история загружена не полностью
+        """
+        stmt = select(BankConnection).filter(
+            BankConnection.id == UUID(connection_id),
+            BankConnection.user_id == UUID(user_id)
+        )
+        connection = (await db.execute(stmt)).scalar_one_or_none()
+        
+        if not connection:
+            raise ValueError("Bank connection not found")
+        
+        if connection.status == BankConnectionStatus.DISCONNECTED:
+            raise ValueError("Bank connection is disconnected")
+        
+        if connection.backfill_completed_at:
+            return {"completed": True, "windows_processed": 0, "transactions_synced": 0}
+        
+        stats = SyncStats()
+        run = await self._start_run(db, connection, "backfill", stats)
+        try:
+            result = await self._run_backfill(db, connection, stats, max_windows, on_progress)
+        except LockNotAcquired:
+            await self._finish_run(
+                db, run, stats, SyncRunStatus.SKIPPED,
+                error="Backfill or sync of this connection is already in progress"
+            )
+            raise
+        except Exception as e:
+            await db.rollback()
+            await self._finish_run(db, run, stats, SyncRunStatus.FAILED, error=str(e))
+            raise
+        
+        await self._finish_run(db, run, stats, SyncRunStatus.SUCCEEDED)
+        if result["transactions_synced"]:
+            await bump_data_version(user_id)
+        return result
+    
+    async def _run_backfill(
+        self,
+        db: AsyncSession,
+        connection: BankConnection,
+        stats: SyncStats,
+        max_windows: Optional[int] = None,
+        on_progress: Optional[ProgressCallback] = None
+    ) -> Dict[str, Any]:
+        """Обойти окна истории подключения (см. backfill_bank_connection)"""
+        # Отдельная блокировка: backfill не должен мешать инкрементальной синхронизации,
+        # а дубликаты между ними отсекает ON CONFLICT по external_id
+        lock = LeaseLock(
+            f"sync-lock:backfill:{connection.id}",
+            ttl_seconds=settings.SYNC_LOCK_TTL_SECONDS
+        )
+        connector = get_connector(connection.provider)
+        async with lock:
+            # Токены обновляются один раз за запуск и под блокировкой подключения:
+            # инкрементальная синхронизация обновляет те же токены, и при ротации
+            # refresh token параллельное обновление сделало бы один из них недействительным.
+            # Если подключение сейчас синхронизируется, запуск пропускается (LockNotAcquired),
+            # а задачу backfill снова поставит эта синхронизация
+            async with self.connection_lock(connection.id):
+                await db.refresh(connection)
+                token = await self._authenticate(db, connection, connector, stats)
+            
+            now = datetime.utcnow()
+            if connection.backfill_until is None:
+                connection.backfill_until = _shift_months(_month_start(now), -settings.SYNC_BACKFILL_MONTHS)
+            cursor = connection.backfill_cursor or now
+            target = connection.backfill_until
+            total_windows = _months_between(target, now)
+            
+            windows_processed = 0
+            transactions_synced = 0
+            
+            while cursor > target:
+                if max_windows is not None and windows_processed >= max_windows:
+                    break
+                if windows_processed > 0:
+                    # Не упираться в лимиты банка и не вытеснять интерактивный трафик
+                    await asyncio.sleep(settings.SYNC_BACKFILL_WINDOW_DELAY_SECONDS)
+                
+                window_start = max(_month_start(cursor - timedelta(microseconds=1)), target)
+                transactions_synced += await self._sync_transactions(
+                    db, connection, connector, token, stats,
+                    date_from=window_start,
+                    date_to=cursor,
+                    strict=True,
+                    lock=lock
+                )
+                
+                # Контрольная точка только после окна, загруженного по всем счетам;
+                # иначе ошибка прерывает backfill, и окно загрузится заново
+                cursor = window_start
+                connection.backfill_cursor = cursor
+                await db.commit()
+                windows_processed += 1
+                
+                if on_progress:
+                    await on_progress(
+                        _months_between(cursor, now),
+                        total_windows,
+                        transactions_synced=transactions_synced
+                    )
+            
+            completed = cursor <= target
+            if completed:
+                connection.backfill_completed_at = datetime.utcnow()
+                await db.commit()
+        
+        return {
+            "completed": completed,
+            "windows_processed": windows_processed,
+            "transactions_synced": transactions_synced,
+            "backfill_cursor": cursor.isoformat()
+        }
+
+
+def _month_start(value: datetime) -> datetime:
+    """Начало календарного месяца"""
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _shift_months(value: datetime, months: int) -> datetime:
+    """Сдвинуть начало месяца на заданное количество месяцев"""
+    index = value.year * 12 + (value.month - 1) + months
+    return value.replace(year=index // 12, month=index % 12 + 1)
+
+
+def _months_between(start: datetime, end: datetime) -> int:
+    """Количество месячных окон между датами"""
+    return (end.year - start.year) * 12 + (end.month - start.month) + 1
 
 
 # Singleton instance
@@ -0,0 +1,46 @@
+"""
+Сбор статистики одного запуска синхронизации
+"""
+from typing import Dict, Iterator
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+import time
+
+
+# Фазы синхронизации, для каждой в sync_runs есть колонка <фаза>_ms
+SYNC_PHASES = (
+    "token_refresh",
+    "accounts_fetch",
+    "transactions_fetch",
+    "parse",
+    "db_write",
+)
+
+
+@dataclass
+class SyncStats:
+    """Тайминги по фазам и объемы данных одного запуска синхронизации"""
+    started_at: datetime = field(default_factory=datetime.utcnow)
+    phase_ms: Dict[str, float] = field(default_factory=lambda: defaultdict(float))
+    pages_fetched: int = 0
+    bytes_received: int = 0
+    rows_inserted: int = 0
+    rows_updated: int = 0
+    rows_skipped: int = 0
+    retries: int = 0
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        Засечь время выполнения блока и добавить его к фазе
+
+        Args:
+            name: Название фазы из SYNC_PHASES
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phase_ms[name] += (time.perf_counter() - started) * 1000
@@ -0,0 +1,120 @@
+"""
+Двухуровневый кэш авторизованного пользователя
+
+get_current_user выполняется на каждом запросе с токеном. Поля
+пользователя берутся сначала из памяти процесса (TTL LRU), затем из
+Redis и только потом из БД. Кэшируются только поля профиля, хеш пароля
+в кэш не попадает.
+"""
+from typing import Any, Dict, Optional
+from datetime import datetime
+from uuid import UUID
+import json
+import logging
+import time
+
+from app.core.cache import get_redis
+from app.core.config import settings
+from app.core.metrics import record_cache_lookup
+from app.core.ttl_cache import TTLCache
+from app.models.user import User, SubscriptionTier
+
+logger = logging.getLogger(__name__)
+
+# Поля User, которые хранятся в кэше
+CACHED_FIELDS = ("id", "email", "name", "subscription_tier", "created_at", "updated_at")
+
+
+class UserCache:
+    """Кэш полей пользователя: память процесса -> Redis"""
+
+    def __init__(self):
+        self._local: TTLCache[Dict[str, Any]] = TTLCache(
+            maxsize=settings.USER_CACHE_LOCAL_SIZE,
+            ttl_seconds=settings.USER_CACHE_LOCAL_TTL_SECONDS
+        )
+
+    def _key(self, user_id: UUID) -> str:
+        return f"user-cache:{user_id}"
+
+    def _dump(self, user: User) -> Dict[str, Any]:
+        """Поля пользователя в JSON-совместимом виде"""
+        return {
+            "id": str(user.id),
+            "email": user.email,
+            "name": user.name,
+            "subscription_tier": user.subscription_tier.value if user.subscription_tier else None,
+            "created_at": user.created_at.isoformat() if user.created_at else None,
+            "updated_at": user.updated_at.isoformat() if user.updated_at else None,
+        }
+
+    def _load(self, data: Dict[str, Any]) -> User:
+        """
+        Собрать User из кэшированных полей
+
+        Объект не привязан к сессии: для изменения пользователя его
+        нужно заново загрузить из БД.
+        """
+        return User(
+            id=UUID(data["id"]),
+            email=data["email"],
+            name=data["name"],
+            subscription_tier=SubscriptionTier(data["subscription_tier"]) if data["subscription_tier"] else None,
+            created_at=datetime.fromisoformat(data["created_at"]) if data["created_at"] else None,
+            updated_at=datetime.fromisoformat(data["updated_at"]) if data["updated_at"] else None,
+        )
+
+    async def get(self, user_id: UUID) -> Optional[User]:
+        """
+        Получить пользователя из кэша
+
+        Args:
+            user_id: ID пользователя
+
+        Returns:
+            User (не привязанный к сессии) или None, если в кэше нет
+        """
+        data = self._local.get(user_id)
+        record_cache_lookup("user_local", data is not None)
+        if data is not None:
+            return self._load(data)
+
+        started = time.perf_counter()
+        try:
+            raw = await get_redis().get(self._key(user_id))
+        except Exception as e:
+            logger.warning(f"User cache read failed for {user_id}: {e}")
+            return None
+        record_cache_lookup("user", raw is not None, time.perf_counter() - started)
+        if raw is None:
+            return None
+
+        data = json.loads(raw)
+        self._local.set(user_id, data)
+        return self._load(data)
+
+    async def set(self, user: User) -> None:
+        """Сохранить пользователя в оба уровня кэша"""
+        data = self._dump(user)
+        self._local.set(user.id, data)
+        try:
+            await get_redis().set(self._key(user.id), json.dumps(data), ex=settings.USER_CACHE_TTL_SECONDS)
+        except Exception as e:
+            logger.warning(f"User cache write failed for {user.id}: {e}")
+
+    async def invalidate(self, user_id: UUID) -> None:
+        """
+        Удалить пользователя из кэша
+
+        Вызывается после изменения профиля, смены пароля или деактивации.
+        Другие процессы увидят изменения не позже USER_CACHE_LOCAL_TTL_SECONDS.
+        """
+        self._local.pop(user_id)
+        try:
+            await get_redis().delete(self._key(user_id))
+        except Exception as e:
+            logger.warning(f"User cache invalidation failed for {user_id}: {e}")
+
+
+# Singleton instance
+user_cache = UserCache()
@@ -1,64 +1,50 @@
-from typing import Optional
+from datetime import datetime
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.clients.vbank import get_vbank_client
-from app import models
+from app.connectors import VBankConnector
+from app.core.config import settings
+from app.models.bank_connection import BankConnection, BankConnectionStatus
+from app.services.sync_service import sync_service
+
 
 class VBankImportService:
-    def __init__(self):
-        self.client = get_vbank_client()
+    """Импорт из VBank через общий коннектор и SyncService"""
 
-    async def fetch_accounts(self, db: AsyncSession, user_id):
-        payload = await self.client.get_accounts()
-        # ожидаем структуру наподобие {"accounts":[{id, iban, currency, balance, name, ...}, ...]}
-        for a in payload.get("accounts", []):
-            # находим/создаем account (привяжем к user_id)
-            acc = await db.scalar(
-                models.Account.select().where(models.Account.user_id == user_id, models.Account.external_id == a["id"])
+    async def ensure_connection(self, db: AsyncSession, user_id: UUID) -> BankConnection:
+        # подключение VBank создается при первом импорте: токен у VBank общий для приложения
+        connection = await db.scalar(
+            select(BankConnection).where(
+                BankConnection.user_id == user_id,
+                BankConnection.provider == VBankConnector.provider,
             )
-            if not acc:
-                acc = models.Account(
-                    user_id=user_id,
-                    external_id=a["id"],
-                    name=a.get("name") or a.get("product") or "VBank account",
-                    currency=a.get("currency") or "RUB",
-                    balance=a.get("balance", 0),
-                    provider="vbank",
-                    status=models.AccountStatus.active,
-                )
-                db.add(acc)
-            else:
-                acc.balance = a.get("balance", acc.balance)
-                acc.currency = a.get("currency", acc.currency)
-                acc.name = a.get("name") or acc.name
-        await db.flush()
-
-    async def fetch_transactions(self, db: AsyncSession, user_id, account_id: str, date_from: Optional[str] = None, date_to: Optional[str] = None):
-        payload = await self.client.get_transactions(account_id, date_from=date_from, date_to=date_to)
-        # ожидаем {"transactions":[{id, amount, currency, bookingDate, description, category, ...}, ...]}
-        for t in payload.get("transactions", []):
-            tx = await db.scalar(
-                models.Transaction.select().where(
-                    models.Transaction.user_id == user_id,
-                    models.Transaction.external_id == t["id"],
-                )
+        )
+        if connection is None:
+            connection = BankConnection(
+                user_id=user_id,
+                provider=VBankConnector.provider,
+                bank_name=settings.VBANK_BANK_CODE,
+                status=BankConnectionStatus.ACTIVE,
             )
-            if not tx:
-                tx = models.Transaction(
-                    user_id=user_id,
-                    account_external_id=account_id,
-                    external_id=t["id"],
-                    amount=t.get("amount", 0),
-                    currency=t.get("currency", "RUB"),
-                    occurred_at=t.get("bookingDate") or t.get("valueDate"),
-                    description=t.get("description") or "",
-                    category_guess=t.get("category"),
-                    provider="vbank",
-                    status=models.TransactionStatus.posted,
-                    type=models.TransactionType.income if float(t.get("amount", 0)) >= 0 else models.TransactionType.expense,
-                )
-                db.add(tx)
-            else:
-                tx.amount = t.get("amount", tx.amount)
-                tx.description = t.get("description", tx.description)
-        await db.flush()
+            db.add(connection)
+            await db.commit()
+        return connection
+
+    async def fetch_accounts(self, db: AsyncSession, user_id: UUID) -> Dict[str, Any]:
+        # счета и свежие транзакции (инкрементально, по курсорам счетов)
+        connection = await self.ensure_connection(db, user_id)
+        return await sync_service.sync_bank_connection(db, str(connection.id), str(user_id))
+
+    async def fetch_transactions(self, db: AsyncSession, user_id: UUID, account_id: str, date_from: Optional[str] = None, date_to: Optional[str] = None) -> Dict[str, Any]:
+        connection = await self.ensure_connection(db, user_id)
+        return await sync_service.sync_bank_connection(
+            db,
+            str(connection.id),
+            str(user_id),
+            date_from=datetime.fromisoformat(date_from) if date_from else None,
+            date_to=datetime.fromisoformat(date_to) if date_to else None,
+            account_ids=[account_id],
+        )
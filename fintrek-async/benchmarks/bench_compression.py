@@ -0,0 +1,111 @@
+"""
+Бенчмарк сжатия ответов: затраты CPU против сэкономленных байт
+
+Тела ответов крупных эндпоинтов строятся без БД так же, как их отдает
+приложение (ORJSONResponse): страница GET /transactions, 90 дней
+/analytics/daily-spending-trend и /ai/dashboard (без financial_health,
+которому нужна БД). Для каждого тела и уровня gzip / качества brotli
+печатаются размер после сжатия, время сжатия (лучшее из --repeat серий)
+и микросекунды CPU на сэкономленный КиБ.
+
+В работающем приложении те же величины по маршрутам - в /metrics
+(http_response_bytes_total, http_response_compressed_bytes_total,
+http_response_compression_seconds_total).
+
+Пример:
+    python -m benchmarks.bench_compression
+    python -m benchmarks.bench_compression --gzip-levels 1,6 --brotli-qualities 1,4,11
+"""
+from typing import Any, Callable, Dict, List, Tuple
+from datetime import date, datetime, timedelta
+import argparse
+import gzip
+import random
+
+from app.core.compression import brotli
+from app.core.responses import ORJSONResponse
+from app.ml.spending_analyzer import spending_trend
+from benchmarks.bench_ml import prepare_cases, synthetic_history
+from benchmarks.bench_serialization import best_time, transaction_page
+
+
+def daily_trend(days: int, seed: int) -> Dict[str, Any]:
+    """Ответ /analytics/daily-spending-trend за days дней"""
+    rng = random.Random(seed)
+    end = date(2026, 10, 1)
+    daily_data = [
+        {"date": (end - timedelta(days=offset)).isoformat(), "amount": round(rng.uniform(300, 6000), 2)}
+        for offset in reversed(range(days))
+    ]
+    total = sum(item["amount"] for item in daily_data)
+    return {
+        "period_days": days,
+        "average_daily_spending": round(total / days, 2),
+        "total_spending": round(total, 2),
+        "daily_data": daily_data,
+    }
+
+
+def ai_dashboard(seed: int) -> Dict[str, Any]:
+    """Ответ /ai/dashboard по синтетической истории (без financial_health)"""
+    now = datetime(2026, 10, 1)
+    cases = prepare_cases(synthetic_history(5000, seed, now), now)
+    spending, income = cases["forecasting"]()
+    return {
+        "top_recommendations": cases["recommendations"]()[:3],
+        "spending_trends": spending_trend(41250.0, 38900.0),
+        "next_month_forecast": {"spending": spending, "income": income},
+    }
+
+
+def encoders(gzip_levels: List[int], brotli_qualities: List[int]) -> List[Tuple[str, Callable[[bytes], bytes]]]:
+    """Кодировщики (название, функция) для замера"""
+    result = [
+        (f"gzip-{level}", lambda body, level=level: gzip.compress(body, compresslevel=level, mtime=0))
+        for level in gzip_levels
+    ]
+    if brotli is not None:
+        result.extend(
+            (f"br-{quality}", lambda body, quality=quality: brotli.compress(body, quality=quality))
+            for quality in brotli_qualities
+        )
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Response compression benchmark: CPU cost vs bytes saved")
+    parser.add_argument("--gzip-levels", default="1,6,9", help="Уровни gzip через запятую")
+    parser.add_argument("--brotli-qualities", default="1,4,11", help="Качества brotli через запятую")
+    parser.add_argument("--number", type=int, default=200, help="Вызовов в серии")
+    parser.add_argument("--repeat", type=int, default=5, help="Серий")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    bodies = {
+        "transactions.list (100)": ORJSONResponse(transaction_page(100, args.seed)).body,
+        "analytics.daily_spending_trend (90)": ORJSONResponse(daily_trend(90, args.seed)).body,
+        "ai.dashboard": ORJSONResponse(ai_dashboard(args.seed)).body,
+    }
+    codecs = encoders(
+        [int(level) for level in args.gzip_levels.split(",") if level],
+        [int(quality) for quality in args.brotli_qualities.split(",") if quality],
+    )
+    if brotli is None:
+        print("brotli is not installed, measuring gzip only")
+
+    print(f"{'endpoint':<38}{'codec':<9}{'bytes':>9}{'ratio':>8}{'us':>10}{'us/KiB saved':>14}")
+    for name, body in bodies.items():
+        print(f"{name:<38}{'none':<9}{len(body):>9}")
+        for codec, compress in codecs:
+            compressed = compress(body)
+            seconds = best_time(lambda: compress(body), args.number, args.repeat)
+            saved_kib = (len(body) - len(compressed)) / 1024
+            per_kib = seconds * 1e6 / saved_kib if saved_kib > 0 else float("inf")
+            print(
+                f"{'':<38}{codec:<9}{len(compressed):>9}{len(body) / len(compressed):>8.2f}"
+                f"{seconds * 1e6:>10.1f}{per_kib:>14.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,353 @@
+"""
+Бенчмарк задержки эндпоинтов с сохраненными базовыми значениями
+
+Для каждого размера данных (--sizes, транзакций у пользователя) создает
+синтетического пользователя генератором scripts/generate_dataset.py (или
+переиспользует созданного ранее - набор детерминирован) и вызывает
+эндпоинты аналитики, списка транзакций, AI-дашборда и аутентификации
+через ASGI-приложение в том же процессе, без сети и uvicorn.
+
+По каждому эндпоинту считаются p50/p95/p99 задержки и число SQL-запросов
+на вызов (заголовок X-DB-Queries). Результат сравнивается с базовыми
+значениями из --baseline: рост перцентиля больше чем на --tolerance (и
+больше --min-delta-ms), рост числа запросов или новые ошибки считаются
+регрессией, и скрипт завершается с кодом 1. --update-baseline
+перезаписывает базовые значения текущим прогоном.
+
+Ответы аналитики кэшируются (fastapi-cache), поэтому по умолчанию запросы
+идут с Cache-Control: no-store и измеряют сам обработчик; --with-cache
+измеряет путь с попаданием в кэш.
+
+Нужны PostgreSQL и Redis из настроек приложения (DATABASE_URL, REDIS_URL).
+
+Пример:
+    python -m benchmarks.bench_endpoints --sizes 1000,10000,100000 --iterations 50
+    python -m benchmarks.bench_endpoints --sizes 10000 --update-baseline
+"""
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from datetime import date, datetime
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import time
+import uuid
+
+import httpx
+from sqlalchemy import delete, func, select
+
+from app.core.cache import init_cache
+from app.core.config import settings
+from app.core.security import create_access_token, create_refresh_token
+from app.db.session import AsyncSessionLocal, engine
+from app.main import app
+from app.models.transaction import Transaction
+from app.models.user import User
+from benchmarks.stats import percentile
+from scripts.generate_dataset import DatasetConfig, generate_dataset, user_email
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "endpoints.json")
+
+API = settings.API_V1_STR
+
+# Вызов эндпоинта: (метод, путь, аргументы httpx)
+Call = Tuple[str, str, Dict[str, Any]]
+
+# Эндпоинты с данными пользователя: (имя, метод, путь)
+DATA_ENDPOINTS = [
+    ("analytics.spending_by_category", "GET", f"{API}/analytics/spending-by-category"),
+    ("analytics.income_vs_expenses", "GET", f"{API}/analytics/income-vs-expenses?months=12"),
+    ("analytics.account_summary", "GET", f"{API}/analytics/account-summary"),
+    ("analytics.transaction_statistics", "GET", f"{API}/analytics/transaction-statistics?days=90"),
+    ("analytics.daily_spending_trend", "GET", f"{API}/analytics/daily-spending-trend?days=90"),
+    ("transactions.list", "GET", f"{API}/transactions/?page=1&page_size=50"),
+    ("transactions.list_page_20", "GET", f"{API}/transactions/?page=20&page_size=100"),
+    ("ai.dashboard", "GET", f"{API}/ai/dashboard"),
+]
+
+
+def summarize(latencies: List[float], queries: List[int], errors: int, statuses: Dict[str, int]) -> Dict[str, Any]:
+    """Сводка по вызовам одного эндпоинта (задержки в миллисекундах)"""
+    return {
+        "calls": len(latencies),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3),
+        "queries": max(queries) if queries else None,
+        "errors": errors,
+        "statuses": statuses,
+    }
+
+
+async def measure(
+    client: httpx.AsyncClient,
+    request: Union[Call, Callable[[], Call]],
+    iterations: int,
+    warmup: int
+) -> Dict[str, Any]:
+    """
+    Вызвать эндпоинт warmup + iterations раз подряд
+
+    Args:
+        client: Клиент поверх ASGI-приложения
+        request: (метод, путь, аргументы httpx) или функция, возвращающая их для каждого вызова
+        iterations: Измеряемых вызовов
+        warmup: Вызовов для прогрева (кэш пользователя, планы запросов)
+    """
+    latencies: List[float] = []
+    queries: List[int] = []
+    statuses: Dict[str, int] = {}
+    errors = 0
+    for index in range(warmup + iterations):
+        method, url, kwargs = request() if callable(request) else request
+        started = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        elapsed = time.perf_counter() - started
+        if index < warmup:
+            continue
+        latencies.append(elapsed)
+        statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+        if response.status_code >= 400:
+            errors += 1
+        if "x-db-queries" in response.headers:
+            queries.append(int(response.headers["x-db-queries"]))
+    return summarize(latencies, queries, errors, statuses)
+
+
+async def ensure_user(config: DatasetConfig, regenerate: bool) -> Tuple[uuid.UUID, int]:
+    """
+    Пользователь набора данных: созданный ранее или новый
+
+    Returns:
+        (ID пользователя, число его транзакций)
+    """
+    email = user_email(config, 0)
+    async with AsyncSessionLocal() as db:
+        if regenerate:
+            await db.execute(delete(User).where(User.email == email))
+            await db.commit()
+        user_id = (await db.execute(select(User.id).where(User.email == email))).scalar_one_or_none()
+
+    if user_id is None:
+        result = await generate_dataset(config)
+        print(f"  generated {result['transactions']} transactions in {result['seconds']:.1f}s "
+              f"({result['rows_per_second']:,.0f} rows/s)")
+        async with AsyncSessionLocal() as db:
+            user_id = (await db.execute(select(User.id).where(User.email == email))).scalar_one()
+
+    async with AsyncSessionLocal() as db:
+        count = (await db.execute(
+            select(func.count()).select_from(Transaction).where(Transaction.user_id == user_id)
+        )).scalar_one()
+    return user_id, count
+
+
+async def bench_data_endpoints(
+    client: httpx.AsyncClient,
+    user_id: uuid.UUID,
+    iterations: int,
+    warmup: int,
+    with_cache: bool
+) -> Dict[str, Any]:
+    """Эндпоинты аналитики, транзакций и AI для пользователя"""
+    headers = {"Authorization": f"Bearer {create_access_token(data={'sub': str(user_id)})}"}
+    if not with_cache:
+        headers["Cache-Control"] = "no-store"
+    results = {}
+    for name, method, url in DATA_ENDPOINTS:
+        results[name] = await measure(client, (method, url, {"headers": headers}), iterations, warmup)
+    return results
+
+
+async def bench_auth_endpoints(
+    client: httpx.AsyncClient,
+    config: DatasetConfig,
+    user_id: uuid.UUID,
+    iterations: int,
+    warmup: int
+) -> Dict[str, Any]:
+    """
+    Вход, обновление токена и регистрация
+
+    Вход и регистрация упираются в bcrypt, поэтому их задержка почти не
+    зависит от объема данных; созданные при регистрации пользователи
+    удаляются в конце.
+    """
+    email = user_email(config, 0)
+    refresh_token = create_refresh_token(data={"sub": str(user_id)})
+    run_id = uuid.uuid4().hex[:8]
+    counter = iter(range(10 ** 9))
+
+    def register_request() -> Call:
+        return "POST", f"{API}/auth/register", {"json": {
+            "email": f"bench-register-{run_id}-{next(counter)}@example.com",
+            "name": "Endpoint Benchmark",
+            "password": config.password,
+        }}
+
+    try:
+        return {
+            "auth.login": await measure(
+                client, ("POST", f"{API}/auth/login", {"params": {"email": email, "password": config.password}}),
+                iterations, warmup
+            ),
+            "auth.refresh": await measure(
+                client, ("POST", f"{API}/auth/refresh", {"json": {"refresh_token": refresh_token}}),
+                iterations, warmup
+            ),
+            "auth.register": await measure(client, register_request, iterations, warmup),
+        }
+    finally:
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(User).where(User.email.like(f"bench-register-{run_id}-%")))
+            await db.commit()
+
+
+def compare(
+    results: Dict[str, Any],
+    baseline: Dict[str, Any],
+    tolerance: float,
+    min_delta_ms: float
+) -> List[str]:
+    """
+    Сравнить прогон с базовыми значениями
+
+    Args:
+        results: Текущий прогон
+        baseline: Базовые значения (тот же формат)
+        tolerance: Допустимый относительный рост перцентилей (0.2 = 20%)
+        min_delta_ms: Рост меньше этого не считается регрессией (шум на быстрых эндпоинтах)
+
+    Returns:
+        Описания регрессий (пустой список, если их нет)
+    """
+    regressions = []
+    for size, endpoints in results["sizes"].items():
+        base_endpoints = baseline.get("sizes", {}).get(size, {}).get("endpoints", {})
+        for name, current in endpoints["endpoints"].items():
+            base = base_endpoints.get(name)
+            if base is None:
+                continue
+            for metric in ("p50_ms", "p95_ms", "p99_ms"):
+                limit = base[metric] * (1 + tolerance)
+                if current[metric] > limit and current[metric] - base[metric] > min_delta_ms:
+                    regressions.append(
+                        f"size={size} {name}: {metric} {current[metric]:.1f}ms > {base[metric]:.1f}ms +{tolerance:.0%}"
+                    )
+            if current["queries"] is not None and base["queries"] is not None and current["queries"] > base["queries"]:
+                regressions.append(f"size={size} {name}: queries {current['queries']} > {base['queries']}")
+            if current["errors"] > base["errors"]:
+                regressions.append(f"size={size} {name}: errors {current['errors']} > {base['errors']}")
+    return regressions
+
+
+def print_report(results: Dict[str, Any]) -> None:
+    for size, data in results["sizes"].items():
+        print(f"size={size} (transactions={data['transactions']})")
+        for name, stats in data["endpoints"].items():
+            print(
+                f"  {name:<34} p50={stats['p50_ms']:>9.2f}ms p95={stats['p95_ms']:>9.2f}ms "
+                f"p99={stats['p99_ms']:>9.2f}ms queries={stats['queries']} errors={stats['errors']}"
+            )
+
+
+def load_baseline(path: str) -> Optional[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_json(path: str, data: Dict[str, Any]) -> None:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    await init_cache()
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    results: Dict[str, Any] = {
+        "meta": {
+            "created_at": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "iterations": args.iterations,
+            "warmup": args.warmup,
+            "with_cache": args.with_cache,
+            "seed": args.seed,
+        },
+        "sizes": {},
+    }
+    # Исключения приложения превращаются в ответ 500 и учитываются как ошибки
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for size in sizes:
+                # Свой seed на размер: у каждого размера свой пользователь
+                config = DatasetConfig(
+                    users=1, max_transactions=size, min_transactions=size, skew=0.0,
+                    seed=args.seed + size, end_date=args.end_date, workers=args.workers
+                )
+                print(f"size={size}: preparing dataset")
+                user_id, transactions = await ensure_user(config, args.regenerate)
+                endpoints = await bench_data_endpoints(client, user_id, args.iterations, args.warmup, args.with_cache)
+                if not args.skip_auth:
+                    endpoints.update(await bench_auth_endpoints(
+                        client, config, user_id, args.auth_iterations, min(args.warmup, 1)
+                    ))
+                results["sizes"][str(size)] = {"transactions": transactions, "endpoints": endpoints}
+    finally:
+        await engine.dispose()
+    return results
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Endpoint latency benchmark with stored baselines")
+    parser.add_argument("--sizes", default="1000,10000,100000", help="Транзакций у пользователя, через запятую")
+    parser.add_argument("--iterations", type=int, default=30, help="Измеряемых вызовов на эндпоинт")
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--auth-iterations", type=int, default=10, help="Вызовов эндпоинтов аутентификации (bcrypt)")
+    parser.add_argument("--skip-auth", action="store_true")
+    parser.add_argument("--with-cache", action="store_true", help="Не отключать кэш ответов")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--end-date", type=date.fromisoformat, default=None, help="Конец истории набора данных, YYYY-MM-DD")
+    parser.add_argument("--workers", type=int, default=4, help="Процессов генерации данных")
+    parser.add_argument("--regenerate", action="store_true", help="Пересоздать пользователей наборов данных")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--update-baseline", action="store_true", help="Записать прогон как базовые значения")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Допустимый рост перцентилей (0.2 = 20%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=2.0)
+    parser.add_argument("--output", help="Сохранить результаты прогона в JSON")
+    args = parser.parse_args()
+
+    results = await run(args)
+    print_report(results)
+    if args.output:
+        save_json(args.output, results)
+
+    if args.update_baseline:
+        save_json(args.baseline, results)
+        print(f"baseline saved to {args.baseline}")
+        return
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        print(f"no baseline at {args.baseline}; run with --update-baseline to create one")
+        return
+    regressions = compare(results, baseline, args.tolerance, args.min_delta_ms)
+    if regressions:
+        print(f"{len(regressions)} regression(s) against {args.baseline}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        raise SystemExit(1)
+    print(f"no regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
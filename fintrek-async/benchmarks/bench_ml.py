@@ -0,0 +1,192 @@
+"""
+Микробенчмарки алгоритмов app/ml без базы данных
+
+Алгоритмы получают синтетическую историю в памяти (1k-1M транзакций,
+те же продавцы, подписки и сезонность, что у scripts/generate_dataset.py)
+и вызываются как чистые функции, без SQL. Для каждого размера и
+алгоритма печатаются время (лучший из --repeat прогонов), время на
+транзакцию и пиковая память (tracemalloc, отдельный прогон: под
+tracemalloc код медленнее). Подготовка входных данных не учитывается.
+
+Время на транзакцию при росте размера должно оставаться примерно
+постоянным; рост столбца "scale" (относительно наименьшего размера)
+означает сверхлинейную сложность.
+
+Пример:
+    python -m benchmarks.bench_ml
+    python -m benchmarks.bench_ml --sizes 1000,100000 --cases recurring,anomalies --repeat 5
+"""
+from typing import Any, Callable, Dict, List, Tuple
+from datetime import datetime, timedelta
+import argparse
+import json
+import random
+import time
+import tracemalloc
+
+from app.ml.forecasting_model import forecast_income, forecast_spending, monthly_totals
+from app.ml.recommendation_engine import build_recommendations
+from app.ml.spending_analyzer import (
+    category_amount_stats, find_anomalies, find_recurring_payments, spending_trend
+)
+from app.ml.transaction_categorizer import transaction_categorizer
+from scripts.generate_dataset import SEASONALITY, SPENDING_PROFILES, SUBSCRIPTIONS
+
+# Транзакция истории: (ID, дата, сумма, категория, продавец, описание, расход ли)
+Row = Tuple[str, datetime, float, str, str, str, bool]
+
+
+def synthetic_history(size: int, seed: int, now: datetime) -> List[Row]:
+    """
+    История пользователя из size транзакций за 24 месяца до now
+
+    Доля зарплат и подписок фиксирована, остальное - повседневные траты с
+    сезонностью и редкими аномально крупными покупками.
+    """
+    rng = random.Random(f"{seed}:ml:{size}")
+    start = now - timedelta(days=730)
+    seconds = int((now - start).total_seconds())
+    weights = [profile[1] for profile in SPENDING_PROFILES]
+    rows: List[Row] = []
+
+    for index in range(size):
+        roll = rng.random()
+        moment = start + timedelta(seconds=rng.randrange(seconds))
+        if roll < 0.02:
+            rows.append((f"t{index}", moment, round(rng.uniform(40000, 150000), 2), "Зарплата", "ООО Работодатель", "Заработная плата", False))
+        elif roll < 0.06:
+            merchant, category, rubles, _ = SUBSCRIPTIONS[rng.randrange(len(SUBSCRIPTIONS))]
+            rows.append((f"t{index}", moment, float(rubles), category, merchant, f"Оплата {merchant}", True))
+        else:
+            category, _, low, high, merchants = rng.choices(SPENDING_PROFILES, weights=weights)[0]
+            amount = low * (high / low) ** rng.random() * SEASONALITY[moment.month]
+            description = "Покупка"
+            if rng.random() < 0.002:
+                amount *= rng.uniform(8, 30)
+                description = "Крупная покупка"
+            rows.append((f"t{index}", moment, round(amount, 2), category, rng.choice(merchants), description, True))
+
+    rows.sort(key=lambda row: row[1])
+    return rows
+
+
+def prepare_cases(rows: List[Row], now: datetime) -> Dict[str, Callable[[], Any]]:
+    """Входные данные алгоритмов (вне замера) и функции для замера"""
+    expenses = [row for row in rows if row[6]]
+    incomes = [row for row in rows if not row[6]]
+    payments = [(merchant, amount, date) for _, date, amount, _, merchant, _, _ in expenses]
+    category_amounts = [(category, amount) for _, _, amount, category, _, _, _ in expenses]
+    expense_rows = [(id_, date, amount, category, merchant, description) for id_, date, amount, category, merchant, description, _ in expenses]
+    category_names = {category: category for _, _, _, category, _, _, _ in expenses}
+    expense_dates = [(date, amount) for _, date, amount, _, _, _, _ in expenses]
+    income_dates = [(date, amount) for _, date, amount, _, _, _, _ in incomes]
+    texts = [(description, merchant, -amount if is_expense else amount) for _, _, amount, _, merchant, description, is_expense in rows]
+    month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    prev_month_start = (month_start - timedelta(days=1)).replace(day=1)
+    recent_start = now - timedelta(days=30)
+
+    def recurring():
+        return find_recurring_payments(payments)
+
+    def anomalies():
+        return find_anomalies(expense_rows, category_amount_stats(category_amounts), category_names)
+
+    def forecasting():
+        return forecast_spending(monthly_totals(expense_dates)), forecast_income(monthly_totals(income_dates))
+
+    def categorization():
+        match = transaction_categorizer.match_category
+        return [match(description, merchant, amount) for description, merchant, amount in texts]
+
+    def recommendations():
+        by_category: Dict[str, float] = {}
+        current = previous = income = 0.0
+        for date, amount, category in ((row[1], row[2], row[3]) for row in expenses):
+            if date >= recent_start:
+                by_category[category] = by_category.get(category, 0.0) + amount
+            if date >= month_start:
+                current += amount
+            elif date >= prev_month_start:
+                previous += amount
+        for date, amount in income_dates:
+            if date >= recent_start:
+                income += amount
+        return build_recommendations(
+            find_recurring_payments(payments),
+            find_anomalies(expense_rows, category_amount_stats(category_amounts), category_names),
+            spending_trend(current, previous),
+            by_category,
+            income,
+            [("Зарплатная карта", 500.0)]
+        )
+
+    return {
+        "recurring": recurring,
+        "anomalies": anomalies,
+        "forecasting": forecasting,
+        "categorization": categorization,
+        "recommendations": recommendations,
+    }
+
+
+def measure(case: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    """Лучшее время из repeat прогонов и пиковая память отдельного прогона"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        case()
+        timings.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    try:
+        case()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"seconds": min(timings), "peak_bytes": peak}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="In-memory benchmarks for app/ml algorithms")
+    parser.add_argument("--sizes", default="1000,10000,100000,1000000", help="Размеры истории, через запятую")
+    parser.add_argument("--cases", default="recurring,anomalies,forecasting,categorization,recommendations")
+    parser.add_argument("--repeat", type=int, default=3, help="Прогонов для замера времени")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Сохранить результаты в JSON")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    case_names = [name for name in args.cases.split(",") if name]
+    # Фиксированная дата - одинаковые данные при каждом запуске
+    now = datetime(2026, 10, 1)
+    results: Dict[str, Dict[str, Dict[str, float]]] = {name: {} for name in case_names}
+
+    for size in sizes:
+        started = time.perf_counter()
+        rows = synthetic_history(size, args.seed, now)
+        cases = prepare_cases(rows, now)
+        print(f"size={size}: history generated in {time.perf_counter() - started:.1f}s")
+        for name in case_names:
+            results[name][str(size)] = measure(cases[name], args.repeat)
+        del rows, cases
+
+    print(f"{'case':<16}{'size':>10}{'time, ms':>12}{'us/txn':>10}{'scale':>8}{'peak, MB':>11}")
+    for name in case_names:
+        base_per_txn = None
+        for size in sizes:
+            stats = results[name][str(size)]
+            per_txn = stats["seconds"] / size
+            base_per_txn = base_per_txn or per_txn
+            print(
+                f"{name:<16}{size:>10}{stats['seconds'] * 1000:>12.2f}{per_txn * 1e6:>10.3f}"
+                f"{per_txn / base_per_txn:>8.2f}{stats['peak_bytes'] / 2 ** 20:>11.2f}"
+            )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"seed": args.seed, "repeat": args.repeat, "results": results}, f, indent=2, sort_keys=True)
+            f.write("\n")
+
+
+if __name__ == "__main__":
+    main()
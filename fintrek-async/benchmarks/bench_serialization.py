@@ -0,0 +1,136 @@
+"""
+Бенчмарк сериализации ответа: стандартный JSONResponse против ORJSONResponse
+
+Страница GET /transactions из --page-size транзакций сериализуется так же,
+как это делает FastAPI:
+
+- model: эндпоинт с response_model - pydantic model_dump(mode="json"), затем
+  класс ответа;
+- dict: эндпоинт без response_model (аналитика, AI-дашборд) - jsonable_encoder,
+  затем класс ответа;
+- dict, native: тот же словарь с UUID/datetime/Decimal сразу в ORJSONResponse,
+  без jsonable_encoder (ответ, возвращенный из обработчика напрямую);
+- list: весь путь GET /transactions после запроса к БД. Прежний - валидация
+  ORM-объектов в TransactionListResponse (from_attributes) и model_dump;
+  текущий - строки Core-запроса в словари (transaction_rows) и
+  ORJSONResponse. Гидратация ORM-объектов здесь не учитывается, в
+  эндпоинте она добавляет еще больше к прежнему пути.
+
+Печатается лучшее время на ответ из --repeat серий по --number вызовов.
+Без базы данных и сети.
+
+Пример:
+    python -m benchmarks.bench_serialization
+    python -m benchmarks.bench_serialization --page-size 100 --number 2000
+"""
+from typing import Any, Callable, Dict, List
+from datetime import datetime, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+import argparse
+import json
+import random
+import time
+import uuid
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.api.v1.endpoints.transactions import LIST_FIELDS, transaction_rows
+from app.core.responses import ORJSONResponse
+from app.models.transaction import TransactionStatus, TransactionType
+from app.schemas.transaction import TransactionListResponse
+from scripts.generate_dataset import SPENDING_PROFILES
+
+
+def transaction_page(page_size: int, seed: int) -> Dict[str, Any]:
+    """Страница транзакций с типами, которые отдает ORM (UUID, datetime, Decimal)"""
+    rng = random.Random(seed)
+    user_id, account_id = uuid.UUID(int=rng.getrandbits(128), version=4), uuid.UUID(int=rng.getrandbits(128), version=4)
+    now = datetime(2026, 10, 1, 12, 0, 0)
+    transactions: List[Dict[str, Any]] = []
+    for index in range(page_size):
+        category, _, low, high, merchants = rng.choice(SPENDING_PROFILES)
+        moment = now - timedelta(minutes=index * 97, microseconds=rng.randrange(1_000_000))
+        merchant = rng.choice(merchants)
+        transactions.append({
+            "id": uuid.UUID(int=rng.getrandbits(128), version=4),
+            "user_id": user_id,
+            "account_id": account_id,
+            "category_id": uuid.UUID(int=rng.getrandbits(128), version=4),
+            "related_account_id": None,
+            "transaction_type": TransactionType.EXPENSE,
+            "amount": Decimal(f"{rng.uniform(low, high):.2f}"),
+            "currency": "RUB",
+            "description": f"Оплата {merchant}: {category}",
+            "merchant_name": merchant,
+            "notes": None,
+            "transaction_date": moment,
+            "posted_date": moment + timedelta(days=1),
+            "status": TransactionStatus.COMPLETED,
+            "external_id": f"ext-{index}",
+            "created_at": moment,
+            "updated_at": moment,
+        })
+    return {"transactions": transactions, "total": 10_000, "page": 1, "page_size": page_size}
+
+
+def best_time(call: Callable[[], Any], number: int, repeat: int) -> float:
+    """Лучшее среднее время вызова из repeat серий"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            call()
+        best = min(best, (time.perf_counter() - started) / number)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Response serialization benchmark: JSONResponse vs ORJSONResponse")
+    parser.add_argument("--page-size", type=int, default=100, help="Транзакций на странице")
+    parser.add_argument("--number", type=int, default=1000, help="Вызовов в серии")
+    parser.add_argument("--repeat", type=int, default=5, help="Серий")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    raw = transaction_page(args.page_size, args.seed)
+    model = TransactionListResponse.model_validate(raw)
+    # Объекты с атрибутами вместо ORM-сущностей и кортежи вместо строк Core-запроса
+    objects = [SimpleNamespace(**item) for item in raw["transactions"]]
+    rows = [tuple(item[name] for name in LIST_FIELDS) for item in raw["transactions"]]
+
+    def list_orm():
+        page = TransactionListResponse(transactions=objects, total=raw["total"], page=1, page_size=args.page_size)
+        return JSONResponse(page.model_dump(mode="json"))
+
+    def list_rows():
+        return ORJSONResponse({"transactions": transaction_rows(rows), "total": raw["total"], "page": 1, "page_size": args.page_size})
+
+    # Все пути должны отдавать одинаковые данные
+    for content in (model.model_dump(mode="json"), jsonable_encoder(raw)):
+        assert json.loads(JSONResponse(content).body) == json.loads(ORJSONResponse(content).body)
+    assert json.loads(ORJSONResponse(raw).body) == json.loads(JSONResponse(jsonable_encoder(raw)).body)
+    assert json.loads(list_orm().body) == json.loads(list_rows().body)
+
+    cases = [
+        ("model", "JSONResponse", lambda: JSONResponse(model.model_dump(mode="json"))),
+        ("model", "ORJSONResponse", lambda: ORJSONResponse(model.model_dump(mode="json"))),
+        ("dict", "JSONResponse", lambda: JSONResponse(jsonable_encoder(raw))),
+        ("dict", "ORJSONResponse", lambda: ORJSONResponse(jsonable_encoder(raw))),
+        ("dict, native", "ORJSONResponse", lambda: ORJSONResponse(raw)),
+        ("list", "ORM + model", list_orm),
+        ("list", "rows", list_rows),
+    ]
+    size = len(ORJSONResponse(raw).body)
+    print(f"page_size={args.page_size}, body={size / 1024:.1f} KiB, best of {args.repeat} x {args.number}")
+    print(f"{'path':<16}{'response class':<18}{'us/response':>12}{'speedup':>9}")
+    baseline: Dict[str, float] = {}
+    for path, response_class, call in cases:
+        seconds = best_time(call, args.number, args.repeat)
+        base = baseline.setdefault(path.split(",")[0], seconds)
+        print(f"{path:<16}{response_class:<18}{seconds * 1e6:>12.1f}{base / seconds:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""
+Бенчмарк пропускной способности синхронизации с банком
+
+Поднимает мок-банк (benchmarks/mock_bank.py) в том же процессе, создает
+временного пользователя с подключением и прогоняет
+sync_service.sync_bank_connection против мока. Результат - транзакций
+в секунду end-to-end (HTTP + разбор + запись в БД) и разбивка по фазам
+из sync_runs. Режим user прогоняет sync_service.sync_user по нескольким
+подключениям сразу (параллельная загрузка и общая запись).
+
+Нужны PostgreSQL и Redis из настроек приложения (DATABASE_URL, REDIS_URL).
+
+Пример:
+    python -m benchmarks.bench_sync --accounts 5 --transactions 2000 \\
+        --page-size 200 --latency-ms 30 --rate-limit-rate 0.02
+    python -m benchmarks.bench_sync --target user --connections 4 --latency-ms 30
+"""
+from typing import Any, Dict, List
+from datetime import datetime, timedelta
+import argparse
+import asyncio
+import json
+import socket
+import time
+import uuid
+
+import uvicorn
+from sqlalchemy import select, delete
+
+from app.clients.vbank import VBankClient
+from app.connectors import CONNECTORS, VBankConnector
+from app.core.config import settings
+from app.core.security import encrypt_token, get_password_hash
+from app.db.session import AsyncSessionLocal, engine
+from app.models.bank_connection import BankConnection, BankConnectionStatus
+from app.models.sync_run import SyncRun
+from app.models.user import User
+from app.services.open_banking_service import open_banking_service
+from app.services.sync_service import sync_service
+from app.services.sync_stats import SYNC_PHASES
+from benchmarks.mock_bank import MockBankConfig, create_mock_bank
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def start_mock_bank(config: MockBankConfig) -> tuple:
+    """
+    Запустить мок-банк на свободном порту в текущем event loop
+
+    Returns:
+        Кортеж (uvicorn.Server, задача сервера, базовый URL, приложение)
+    """
+    port = _free_port()
+    mock_app = create_mock_bank(config)
+    server = uvicorn.Server(
+        uvicorn.Config(mock_app, host="127.0.0.1", port=port, log_level="warning", access_log=False)
+    )
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    return server, task, f"http://127.0.0.1:{port}", mock_app
+
+
+async def create_user(provider_tokens: List[tuple]) -> tuple:
+    """
+    Создать временного пользователя с подключениями
+
+    Args:
+        provider_tokens: Пары (провайдер, access token) для подключений
+
+    Returns:
+        Кортеж (ID пользователя, список ID подключений)
+    """
+    async with AsyncSessionLocal() as db:
+        user = User(
+            email=f"bench-sync-{uuid.uuid4().hex[:12]}@example.com",
+            password_hash=get_password_hash("bench-password"),
+            name="Sync Benchmark"
+        )
+        db.add(user)
+        await db.flush()
+        connections = [
+            BankConnection(
+                user_id=user.id,
+                provider=provider,
+                bank_name=f"Mock Bank {index + 1}",
+                access_token_encrypted=encrypt_token(token),
+                refresh_token_encrypted=encrypt_token("mock-refresh"),
+                token_expires_at=datetime.utcnow() + timedelta(hours=1),
+                status=BankConnectionStatus.ACTIVE,
+                # История не нужна, иначе задача синхронизации поставит backfill
+                backfill_completed_at=datetime.utcnow()
+            )
+            for index, (provider, token) in enumerate(provider_tokens)
+        ]
+        db.add_all(connections)
+        await db.commit()
+        return str(user.id), [str(connection.id) for connection in connections]
+
+
+async def delete_user(user_id: str) -> None:
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(User).where(User.id == uuid.UUID(user_id)))
+        await db.commit()
+
+
+async def collect_sync_runs(user_id: str) -> List[Dict[str, Any]]:
+    """Тайминги по фазам и объемы из sync_runs, в порядке запуска"""
+    async with AsyncSessionLocal() as db:
+        stmt = select(SyncRun).where(SyncRun.user_id == uuid.UUID(user_id)).order_by(SyncRun.started_at)
+        return [
+            {
+                "phases_ms": {phase: getattr(sync_run, f"{phase}_ms") for phase in SYNC_PHASES},
+                "pages_fetched": sync_run.pages_fetched,
+                "rows_inserted": sync_run.rows_inserted,
+                "rows_skipped": sync_run.rows_skipped,
+                "retries": sync_run.retries,
+            }
+            for sync_run in (await db.execute(stmt)).scalars().all()
+        ]
+
+
+async def bench_connection(provider: str, repeat: int) -> Dict[str, Any]:
+    """Прогнать синхронизацию одного подключения repeat раз"""
+    user_id, (connection_id,) = await create_user([(provider, "mock-access-0")])
+    runs = []
+    try:
+        for _ in range(repeat):
+            async with AsyncSessionLocal() as db:
+                started = time.perf_counter()
+                result = await sync_service.sync_bank_connection(db, connection_id, user_id)
+                elapsed = time.perf_counter() - started
+            if not result["success"]:
+                raise RuntimeError(result["message"])
+            runs.append({"seconds": elapsed, **result})
+
+        for run, sync_run in zip(runs, await collect_sync_runs(user_id)):
+            run.update(sync_run)
+    finally:
+        await delete_user(user_id)
+
+    return {"runs": runs}
+
+
+async def bench_user(connections: int, repeat: int) -> Dict[str, Any]:
+    """
+    Прогнать sync_user для пользователя с несколькими подключениями
+
+    Подключения Open Banking получают разные токены (и разные счета в моке),
+    плюс одно подключение VBank.
+    """
+    provider_tokens = [("open_banking", f"mock-access-{index}") for index in range(connections)]
+    provider_tokens.append(("vbank", "unused"))
+    user_id, _ = await create_user(provider_tokens)
+    runs = []
+    try:
+        for _ in range(repeat):
+            async with AsyncSessionLocal() as db:
+                started = time.perf_counter()
+                result = await sync_service.sync_user(db, user_id)
+                elapsed = time.perf_counter() - started
+            if result["failed"]:
+                raise RuntimeError(json.dumps(result["results"], ensure_ascii=False))
+            runs.append({"seconds": elapsed, **result})
+    finally:
+        await delete_user(user_id)
+
+    return {"runs": runs}
+
+
+def print_report(target: str, config: MockBankConfig, report: Dict[str, Any], mock_stats: Dict[str, int]) -> None:
+    print(f"target={target} accounts/connection={config.accounts} transactions/account={config.transactions_per_account} "
+          f"page_size={config.page_size} latency={config.latency_ms}+{config.latency_jitter_ms}ms "
+          f"errors={config.error_rate} 429={config.rate_limit_rate}")
+    for index, run in enumerate(report["runs"], start=1):
+        rate = run["transactions_synced"] / run["seconds"] if run["seconds"] else 0.0
+        line = f"run {index}: {run['transactions_synced']} txn in {run['seconds']:.3f}s -> {rate:,.0f} txn/s"
+        if "results" in run:
+            line += f" | connections={run['connections']} succeeded={run['succeeded']} skipped={run['skipped']}"
+        if "phases_ms" in run:
+            phases = " ".join(f"{phase}={ms}ms" for phase, ms in run["phases_ms"].items())
+            line += (f" | inserted={run['rows_inserted']} skipped={run['rows_skipped']}"
+                     f" pages={run['pages_fetched']} retries={run['retries']} | {phases}")
+        print(line)
+    print(f"mock bank: {json.dumps(mock_stats)}")
+
+
+async def main() -> None:
+    defaults = MockBankConfig()
+    parser = argparse.ArgumentParser(description="Sync throughput benchmark against the mock bank")
+    parser.add_argument("--target", choices=["open_banking", "vbank", "user"], default="open_banking")
+    parser.add_argument("--connections", type=int, default=3, help="Подключений Open Banking в режиме user")
+    parser.add_argument("--repeat", type=int, default=2, help="Повторных прогонов (второй и далее - без вставок)")
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--accounts", type=int, default=defaults.accounts)
+    parser.add_argument("--transactions", type=int, default=defaults.transactions_per_account)
+    parser.add_argument("--page-size", type=int, default=defaults.page_size)
+    parser.add_argument("--latency-ms", type=float, default=defaults.latency_ms)
+    parser.add_argument("--jitter-ms", type=float, default=defaults.latency_jitter_ms)
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate)
+    parser.add_argument("--rate-limit-rate", type=float, default=defaults.rate_limit_rate)
+    parser.add_argument("--retry-after", type=float, default=defaults.retry_after_seconds)
+    args = parser.parse_args()
+
+    config = MockBankConfig(
+        seed=args.seed,
+        accounts=args.accounts,
+        transactions_per_account=args.transactions,
+        # Все транзакции попадают в окно инкрементальной синхронизации
+        history_days=max(settings.SYNC_INCREMENTAL_DAYS - 1, 1),
+        page_size=args.page_size,
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after_seconds=args.retry_after,
+    )
+
+    server, task, base_url, mock_app = await start_mock_bank(config)
+    vbank_client = VBankClient(base_url, settings.VBANK_CLIENT_ID, settings.VBANK_CLIENT_SECRET, settings.VBANK_BANK_CODE)
+    try:
+        open_banking_service.base_url = base_url
+        CONNECTORS[VBankConnector.provider] = VBankConnector(vbank_client)
+        if args.target == "user":
+            report = await bench_user(args.connections, args.repeat)
+        else:
+            report = await bench_connection(args.target, args.repeat)
+    finally:
+        await vbank_client.aclose()
+        server.should_exit = True
+        await task
+        await engine.dispose()
+
+    print_report(args.target, config, report, mock_app.state.stats)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
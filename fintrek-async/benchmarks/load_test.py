@@ -0,0 +1,416 @@
+"""
+Нагрузочный тест смешанным пользовательским трафиком
+
+Асинхронный генератор нагрузки: входит под N синтетическими пользователями
+(scripts/generate_dataset.py) и гоняет по HTTP запущенное приложение
+сценариями с весами (--mix):
+
+- dashboard    - AI-дашборд и сводка по счетам
+- transactions - листание списка транзакций на несколько страниц
+- analytics    - случайный отчет /analytics/*
+- categorize   - постановка задачи категоризации и опрос ее статуса
+- sync         - синхронизация с банком и опрос статуса задачи
+
+С --rate > 0 сценарии запускаются открытой моделью (пуассоновский поток,
+--rate сценариев в секунду, не больше --concurrency одновременно; ожидание
+свободного слота входит в задержку сценария). С --rate 0 - закрытой
+моделью: --concurrency виртуальных пользователей выполняют сценарии подряд.
+
+Отчет: по каждому эндпоинту - число вызовов, пропускная способность,
+p50/p95/p99/max задержки и ошибки (статус >= 400 или сетевая ошибка), по
+каждому сценарию - то же для сценария целиком.
+
+Для сценария sync пользователям создается подключение open_banking (прямо в
+БД из настроек DATABASE_URL), а приложение и воркер должны смотреть на мок
+банка: OPEN_BANKING_API_URL=http://127.0.0.1:9100 и
+uvicorn benchmarks.mock_bank:app --port 9100.
+
+Пример:
+    python scripts/generate_dataset.py --users 200 --max-transactions 20000
+    python -m benchmarks.load_test --users 200 --rate 50 --concurrency 100 --duration 120
+    python -m benchmarks.load_test --users 50 --rate 0 --concurrency 50 \\
+        --mix dashboard=1,transactions=1,analytics=1
+"""
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from datetime import datetime, timedelta
+import argparse
+import asyncio
+import copy
+import json
+import random
+import time
+
+import httpx
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.security import encrypt_token
+from app.db.session import AsyncSessionLocal, engine
+from app.models.bank_connection import BankConnection, BankConnectionStatus
+from app.models.user import User
+from benchmarks.stats import percentile
+from scripts.generate_dataset import DatasetConfig, user_email
+
+API = settings.API_V1_STR
+
+DEFAULT_MIX = "dashboard=30,transactions=25,analytics=25,categorize=10,sync=5"
+
+ANALYTICS_REPORTS = [
+    ("analytics.spending_by_category", f"{API}/analytics/spending-by-category"),
+    ("analytics.income_vs_expenses", f"{API}/analytics/income-vs-expenses?months=12"),
+    ("analytics.account_summary", f"{API}/analytics/account-summary"),
+    ("analytics.transaction_statistics", f"{API}/analytics/transaction-statistics?days=90"),
+    ("analytics.daily_spending_trend", f"{API}/analytics/daily-spending-trend?days=90"),
+]
+
+# Конечные статусы фоновой задачи (app.models.job.JobStatus)
+JOB_DONE = {"succeeded", "failed"}
+
+
+class Recorder:
+    """Задержки и ошибки по именам (эндпоинтов или сценариев)"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.statuses: Dict[str, Dict[str, int]] = {}
+
+    def add(self, name: str, elapsed: float, status: str, error: bool) -> None:
+        self.latencies.setdefault(name, []).append(elapsed)
+        self.errors[name] = self.errors.get(name, 0) + int(error)
+        statuses = self.statuses.setdefault(name, {})
+        statuses[status] = statuses.get(status, 0) + 1
+
+    def report(self, seconds: float) -> Dict[str, Dict[str, Any]]:
+        """Сводка по именам (задержки в миллисекундах)"""
+        return {
+            name: {
+                "calls": len(latencies),
+                "per_second": round(len(latencies) / seconds, 2) if seconds else 0.0,
+                "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+                "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+                "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+                "max_ms": round(max(latencies) * 1000, 1),
+                "errors": self.errors[name],
+                "statuses": self.statuses[name],
+            }
+            for name, latencies in sorted(self.latencies.items())
+        }
+
+
+class VirtualUser:
+    """Залогиненный пользователь: HTTP-вызовы с записью в Recorder"""
+
+    def __init__(self, client: httpx.AsyncClient, recorder: Recorder, email: str, rng: random.Random):
+        self.client = client
+        self.recorder = recorder
+        self.email = email
+        self.rng = rng
+        self.headers: Dict[str, str] = {}
+        self.connection_id: Optional[str] = None
+        self.failed = False  # Была ли ошибка в текущем сценарии
+
+    async def call(self, name: str, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        """Выполнить запрос; сетевые ошибки и таймауты учитываются как ошибки"""
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, headers=self.headers, **kwargs)
+        except httpx.HTTPError as e:
+            self.recorder.add(name, time.perf_counter() - started, type(e).__name__, True)
+            self.failed = True
+            return None
+        error = response.status_code >= 400
+        self.recorder.add(name, time.perf_counter() - started, str(response.status_code), error)
+        self.failed = self.failed or error
+        return response
+
+    async def login(self, password: str) -> bool:
+        response = await self.call("auth.login", "POST", f"{API}/auth/login", params={"email": self.email, "password": password})
+        if response is None or response.status_code != 200:
+            return False
+        self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        return True
+
+    async def wait_job(self, response: Optional[httpx.Response], polls: int, interval: float) -> None:
+        """
+        Опрашивать GET /jobs/{id}, пока задача не завершится (не больше polls раз)
+
+        Упавшая задача считается ошибкой сценария; незавершенная за polls
+        опросов - нет (очередь может быть занята другими пользователями).
+        """
+        if response is None or response.status_code != 202:
+            return
+        job_id = response.json()["job_id"]
+        for _ in range(polls):
+            await asyncio.sleep(interval)
+            job = await self.call("jobs.get", "GET", f"{API}/jobs/{job_id}")
+            if job is None or job.status_code != 200:
+                return
+            if job.json()["status"] in JOB_DONE:
+                self.failed = self.failed or job.json()["status"] == "failed"
+                return
+
+
+async def scenario_dashboard(user: VirtualUser, args: argparse.Namespace) -> None:
+    await user.call("ai.dashboard", "GET", f"{API}/ai/dashboard")
+    await user.call("analytics.account_summary", "GET", f"{API}/analytics/account-summary")
+
+
+async def scenario_transactions(user: VirtualUser, args: argparse.Namespace) -> None:
+    for page in range(1, user.rng.randint(1, args.max_pages) + 1):
+        await user.call(
+            "transactions.list", "GET", f"{API}/transactions/",
+            params={"page": page, "page_size": args.page_size}
+        )
+
+
+async def scenario_analytics(user: VirtualUser, args: argparse.Namespace) -> None:
+    name, url = user.rng.choice(ANALYTICS_REPORTS)
+    await user.call(name, "GET", url)
+
+
+async def scenario_categorize(user: VirtualUser, args: argparse.Namespace) -> None:
+    response = await user.call("ai.categorize_transactions", "POST", f"{API}/ai/categorize-transactions", params={"limit": 100})
+    await user.wait_job(response, args.job_polls, args.job_poll_interval)
+
+
+async def scenario_sync(user: VirtualUser, args: argparse.Namespace) -> None:
+    if user.connection_id is None:
+        return
+    response = await user.call(
+        "bank_connections.sync", "POST", f"{API}/bank-connections/sync",
+        json={"connection_id": user.connection_id}
+    )
+    await user.wait_job(response, args.job_polls, args.job_poll_interval)
+
+
+SCENARIOS: Dict[str, Callable[[VirtualUser, argparse.Namespace], Awaitable[None]]] = {
+    "dashboard": scenario_dashboard,
+    "transactions": scenario_transactions,
+    "analytics": scenario_analytics,
+    "categorize": scenario_categorize,
+    "sync": scenario_sync,
+}
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    """Разобрать веса сценариев вида dashboard=30,transactions=25"""
+    mix = {}
+    for item in value.split(","):
+        if not item:
+            continue
+        name, _, weight = item.partition("=")
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f"unknown scenario '{name}', expected one of {', '.join(SCENARIOS)}")
+        mix[name] = float(weight or 1)
+    if not any(weight > 0 for weight in mix.values()):
+        raise argparse.ArgumentTypeError("scenario mix is empty")
+    return mix
+
+
+async def ensure_connections(emails: List[str]) -> Dict[str, str]:
+    """
+    Подключение open_banking для каждого пользователя (создается один раз)
+
+    Токен у каждого пользователя свой, поэтому мок банка отдает им разные счета.
+
+    Returns:
+        Словарь {email: ID подключения}
+    """
+    async with AsyncSessionLocal() as db:
+        users = dict((await db.execute(select(User.email, User.id).where(User.email.in_(emails)))).all())
+        existing = dict((await db.execute(
+            select(BankConnection.user_id, BankConnection.id).where(
+                BankConnection.user_id.in_(list(users.values())),
+                BankConnection.provider == "open_banking"
+            )
+        )).all())
+        for index, email in enumerate(emails):
+            user_id = users.get(email)
+            if user_id is None or user_id in existing:
+                continue
+            connection = BankConnection(
+                user_id=user_id,
+                provider="open_banking",
+                bank_name="Mock Bank",
+                access_token_encrypted=encrypt_token(f"load-access-{index}"),
+                refresh_token_encrypted=encrypt_token("mock-refresh"),
+                token_expires_at=datetime.utcnow() + timedelta(days=30),
+                status=BankConnectionStatus.ACTIVE,
+                # Без начальной загрузки истории: только инкрементальная синхронизация
+                backfill_completed_at=datetime.utcnow()
+            )
+            db.add(connection)
+            await db.flush()
+            existing[user_id] = connection.id
+        await db.commit()
+    return {email: str(existing[user_id]) for email, user_id in users.items() if user_id in existing}
+
+
+async def login_users(users: List[VirtualUser], password: str, concurrency: int) -> List[VirtualUser]:
+    """Войти под всеми пользователями (не больше concurrency входов одновременно)"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def login(user: VirtualUser) -> bool:
+        async with semaphore:
+            return await user.login(password)
+
+    results = await asyncio.gather(*(login(user) for user in users))
+    return [user for user, ok in zip(users, results) if ok]
+
+
+async def run_scenario(name: str, user: VirtualUser, args: argparse.Namespace, recorder: Recorder, started: float) -> None:
+    """
+    Выполнить сценарий; started - момент прихода (для открытой модели раньше начала выполнения)
+
+    Сценарий ошибочен, если ошибкой закончился любой его запрос или фоновая задача.
+    """
+    # Один пользователь может выполнять несколько сценариев одновременно
+    session = copy.copy(user)
+    session.failed = False
+    try:
+        await SCENARIOS[name](session, args)
+    except Exception:  # noqa: BLE001 - неожиданный ответ приложения не должен останавливать тест
+        session.failed = True
+    recorder.add(name, time.perf_counter() - started, "error" if session.failed else "ok", session.failed)
+
+
+async def open_loop(users: List[VirtualUser], mix: Dict[str, float], args: argparse.Namespace, recorder: Recorder, rng: random.Random) -> None:
+    """Пуассоновский поток сценариев с интенсивностью args.rate в секунду"""
+    semaphore = asyncio.Semaphore(args.concurrency)
+    names, weights = list(mix), list(mix.values())
+    tasks = set()
+
+    async def arrival(name: str, user: VirtualUser, arrived: float) -> None:
+        async with semaphore:
+            await run_scenario(name, user, args, recorder, arrived)
+
+    deadline = time.perf_counter() + args.duration
+    next_arrival = time.perf_counter()
+    while next_arrival < deadline:
+        delay = next_arrival - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        task = asyncio.create_task(arrival(rng.choices(names, weights)[0], rng.choice(users), next_arrival))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+        next_arrival += rng.expovariate(args.rate)
+
+    if tasks:
+        await asyncio.gather(*tasks)
+
+
+async def closed_loop(users: List[VirtualUser], mix: Dict[str, float], args: argparse.Namespace, recorder: Recorder, rng: random.Random) -> None:
+    """args.concurrency виртуальных пользователей выполняют сценарии подряд"""
+    names, weights = list(mix), list(mix.values())
+    deadline = time.perf_counter() + args.duration
+
+    async def worker(user: VirtualUser) -> None:
+        while time.perf_counter() < deadline:
+            await run_scenario(rng.choices(names, weights)[0], user, args, recorder, time.perf_counter())
+            if args.think_ms:
+                await asyncio.sleep(rng.expovariate(1000 / args.think_ms))
+
+    await asyncio.gather(*(worker(users[index % len(users)]) for index in range(args.concurrency)))
+
+
+def print_table(title: str, rows: Dict[str, Dict[str, Any]]) -> None:
+    print(f"{title:<36}{'calls':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>10}{'errors':>8}")
+    for name, stats in rows.items():
+        print(
+            f"{name:<36}{stats['calls']:>8}{stats['per_second']:>9.1f}{stats['p50_ms']:>9.1f}"
+            f"{stats['p95_ms']:>9.1f}{stats['p99_ms']:>9.1f}{stats['max_ms']:>10.1f}{stats['errors']:>8}"
+        )
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    mix = args.mix
+    rng = random.Random(args.seed)
+    dataset = DatasetConfig(seed=args.dataset_seed)
+    emails = [user_email(dataset, index) for index in range(args.users)]
+
+    connections: Dict[str, str] = {}
+    if mix.get("sync"):
+        try:
+            connections = await ensure_connections(emails)
+        finally:
+            await engine.dispose()
+
+    setup = Recorder()
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+        users = [
+            VirtualUser(client, setup, email, random.Random(f"{args.seed}:{email}"))
+            for email in emails
+        ]
+        started = time.perf_counter()
+        users = await login_users(users, args.password, args.concurrency)
+        login_seconds = time.perf_counter() - started
+        print(f"logged in {len(users)}/{len(emails)} users in {login_seconds:.1f}s")
+        if not users:
+            raise SystemExit("no users logged in: generate them with scripts/generate_dataset.py "
+                             "(same --dataset-seed and --password)")
+
+        requests, scenarios = Recorder(), Recorder()
+        for user in users:
+            user.recorder = requests
+            user.connection_id = connections.get(user.email)
+
+        started = time.perf_counter()
+        if args.rate > 0:
+            await open_loop(users, mix, args, scenarios, rng)
+        else:
+            await closed_loop(users, mix, args, scenarios, rng)
+        seconds = time.perf_counter() - started
+
+    return {
+        "base_url": args.base_url,
+        "users": len(users),
+        "mix": mix,
+        "rate": args.rate,
+        "concurrency": args.concurrency,
+        "seconds": round(seconds, 2),
+        "login": setup.report(login_seconds),
+        "endpoints": requests.report(seconds),
+        "scenarios": scenarios.report(seconds),
+        "total_requests": sum(len(latencies) for latencies in requests.latencies.values()),
+        "total_errors": sum(requests.errors.values()),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Mixed-traffic load generator for a running API")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000", help="Адрес запущенного приложения")
+    parser.add_argument("--users", type=int, default=50, help="Синтетических пользователей (по номеру в наборе данных)")
+    parser.add_argument("--dataset-seed", type=int, default=DatasetConfig.seed, help="--seed, с которым создан набор данных")
+    parser.add_argument("--password", default=DatasetConfig.password)
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX, help="Веса сценариев")
+    parser.add_argument("--rate", type=float, default=20.0, help="Сценариев в секунду; 0 - закрытая модель")
+    parser.add_argument("--concurrency", type=int, default=50, help="Максимум одновременных сценариев")
+    parser.add_argument("--duration", type=float, default=60.0, help="Длительность, секунд")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="Средняя пауза между сценариями в закрытой модели")
+    parser.add_argument("--max-pages", type=int, default=5, help="Максимум страниц в сценарии transactions")
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--job-polls", type=int, default=10, help="Опросов статуса задачи в сценариях categorize и sync")
+    parser.add_argument("--job-poll-interval", type=float, default=0.5)
+    parser.add_argument("--timeout", type=float, default=30.0, help="Таймаут запроса, секунд")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Сохранить отчет в JSON")
+    args = parser.parse_args()
+
+    report = await run(args)
+    mode = f"open loop, {args.rate:g}/s" if args.rate > 0 else "closed loop"
+    print(f"{report['users']} users, {mode}, concurrency={args.concurrency}, {report['seconds']:.1f}s: "
+          f"{report['total_requests']} requests, {report['total_errors']} errors")
+    print_table("endpoint", {**report["login"], **report["endpoints"]})
+    print()
+    print_table("scenario", report["scenarios"])
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+            f.write("\n")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,280 @@
+"""
+Локальный мок банка для нагрузочных тестов синхронизации
+
+ASGI-приложение реализует эндпоинты, которые вызывают OpenBankingService
+и VBankClient:
+
+- POST /oauth/token                                  (Open Banking)
+- GET  /api/v1/accounts, /api/v1/accounts/{id}/transactions
+- POST /auth/bank-token                              (VBank)
+- GET  /accounts, /accounts/{id}/transactions
+
+Счета и транзакции генерируются детерминированно из seed, поэтому
+повторные запуски бенчмарка работают с одинаковыми данными. Задержка,
+размер страницы, доля ошибок 5xx и ответов 429 настраиваются.
+
+Запуск отдельным процессом:
+    MOCK_BANK_LATENCY_MS=50 MOCK_BANK_PAGE_SIZE=200 \\
+        uvicorn benchmarks.mock_bank:app --port 9100
+"""
+from typing import Any, Dict, List, Optional
+from dataclasses import dataclass, fields
+from datetime import datetime, timedelta
+from functools import lru_cache
+import asyncio
+import os
+import random
+import zlib
+
+from fastapi import FastAPI, Query, Request
+from fastapi.responses import JSONResponse
+
+# Типы транзакций с весами и диапазонами сумм (отрицательные - списания)
+_TRANSACTION_PROFILES = (
+    ("purchase", 70, -5000.0, -50.0),
+    ("transfer", 10, -20000.0, -500.0),
+    ("payment", 8, -15000.0, -300.0),
+    ("income", 12, 5000.0, 150000.0),
+)
+_MERCHANTS = (
+    "Пятерочка", "Перекресток", "Яндекс Такси", "Ozon", "Wildberries",
+    "Кофемания", "Лента", "МТС", "Аптека Ригла", "Московский метрополитен",
+)
+_ACCOUNT_TYPES = ("checking", "savings", "card")
+
+
+@dataclass
+class MockBankConfig:
+    """Параметры мок-банка, каждый можно задать переменной MOCK_BANK_<ИМЯ>"""
+    seed: int = 42
+    accounts: int = 3  # Счетов на подключение
+    transactions_per_account: int = 1000
+    history_days: int = 30  # За сколько дней распределены транзакции
+    page_size: int = 100  # 0 - отдавать все транзакции одной страницей
+    latency_ms: float = 0.0  # Задержка каждого ответа
+    latency_jitter_ms: float = 0.0  # Случайная добавка к задержке, [0, jitter]
+    error_rate: float = 0.0  # Доля ответов 500
+    rate_limit_rate: float = 0.0  # Доля ответов 429
+    retry_after_seconds: float = 0.0  # Значение Retry-After для 429
+    token_ttl_seconds: int = 3600
+
+    @classmethod
+    def from_env(cls, prefix: str = "MOCK_BANK_") -> "MockBankConfig":
+        """Собрать конфигурацию из переменных окружения"""
+        values: Dict[str, Any] = {}
+        for f in fields(cls):
+            raw = os.environ.get(f"{prefix}{f.name.upper()}")
+            if raw is not None:
+                values[f.name] = type(f.default)(raw)
+        return cls(**values)
+
+
+class MockBankData:
+    """Детерминированный генератор счетов и транзакций"""
+
+    def __init__(self, config: MockBankConfig):
+        self.config = config
+        # Конец истории фиксируется при старте, чтобы страницы не сдвигались во время прогона
+        self.now = datetime.utcnow().replace(microsecond=0)
+        self.transactions = lru_cache(maxsize=1024)(self._generate_transactions)
+
+    def account_ids(self, owner: str = "") -> List[str]:
+        """
+        Номера счетов владельца токена
+
+        Разные токены получают разные счета, поэтому несколько подключений
+        к одному моку не пересекаются по ID счетов и транзакций.
+        """
+        owner_code = zlib.crc32(f"{self.config.seed}:{owner}".encode())
+        return [f"408178{owner_code:010d}{i:04d}" for i in range(self.config.accounts)]
+
+    def accounts(self, owner: str = "") -> List[Dict[str, Any]]:
+        """Счета в формате Open Banking API"""
+        result = []
+        for index, account_id in enumerate(self.account_ids(owner)):
+            rng = random.Random(f"{self.config.seed}:account:{account_id}")
+            balance = round(rng.uniform(1000, 500000), 2)
+            result.append({
+                "account_number": account_id,
+                "name": f"Счет {index + 1}",
+                "type": _ACCOUNT_TYPES[index % len(_ACCOUNT_TYPES)],
+                "currency": "RUB",
+                "balance": balance,
+                "available_balance": balance,
+            })
+        return result
+
+    def _generate_transactions(self, account_id: str) -> List[Dict[str, Any]]:
+        """Все транзакции счета, от новых к старым"""
+        config = self.config
+        rng = random.Random(f"{config.seed}:transactions:{account_id}")
+        weights = [profile[1] for profile in _TRANSACTION_PROFILES]
+        step = timedelta(days=config.history_days) / max(config.transactions_per_account, 1)
+
+        transactions = []
+        for i in range(config.transactions_per_account):
+            kind, _, low, high = rng.choices(_TRANSACTION_PROFILES, weights=weights)[0]
+            date = self.now - step * i - timedelta(seconds=rng.randint(0, 59))
+            transactions.append({
+                "id": f"{account_id}-{i:08d}",
+                "type": kind,
+                "amount": round(rng.uniform(low, high), 2),
+                "currency": "RUB",
+                "description": f"{kind.capitalize()} #{i}",
+                "merchant_name": rng.choice(_MERCHANTS) if kind == "purchase" else None,
+                "date": date.isoformat(),
+                "posted_date": (date + timedelta(days=1)).isoformat(),
+            })
+        return transactions
+
+    def page(
+        self,
+        account_id: str,
+        date_from: Optional[str],
+        date_to: Optional[str],
+        page: int
+    ) -> Dict[str, Any]:
+        """
+        Страница транзакций счета за период
+
+        Returns:
+            Dict с transactions и next_page (None на последней странице)
+        """
+        # Даты в одном формате ISO, поэтому сравниваются как строки
+        start = datetime.fromisoformat(date_from).isoformat() if date_from else None
+        end = datetime.fromisoformat(date_to).isoformat() if date_to else None
+        items = [
+            txn for txn in self.transactions(account_id)
+            if (start is None or txn["date"] >= start)
+            and (end is None or txn["date"] < end)
+        ]
+
+        size = self.config.page_size
+        if size <= 0:
+            return {"transactions": items, "next_page": None}
+
+        offset = (page - 1) * size
+        next_page = page + 1 if offset + size < len(items) else None
+        return {"transactions": items[offset:offset + size], "next_page": next_page}
+
+
+def create_mock_bank(config: Optional[MockBankConfig] = None) -> FastAPI:
+    """
+    Создать ASGI-приложение мок-банка
+
+    Args:
+        config: Параметры (по умолчанию из переменных окружения)
+
+    Returns:
+        FastAPI приложение; счетчики запросов доступны в app.state.stats
+    """
+    config = config or MockBankConfig.from_env()
+    data = MockBankData(config)
+    # Сбои и задержки тоже детерминированы, чтобы прогоны были сравнимы
+    fault_rng = random.Random(f"{config.seed}:faults")
+
+    app = FastAPI(title="Mock Bank", docs_url=None, redoc_url=None)
+    app.state.config = config
+    app.state.data = data
+    app.state.stats = {"requests": 0, "errors": 0, "rate_limited": 0}
+
+    @app.middleware("http")
+    async def simulate_network(request: Request, call_next):
+        app.state.stats["requests"] += 1
+
+        delay = config.latency_ms + fault_rng.uniform(0, config.latency_jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+
+        roll = fault_rng.random()
+        if roll < config.rate_limit_rate:
+            app.state.stats["rate_limited"] += 1
+            return JSONResponse(
+                status_code=429,
+                content={"detail": "Too many requests"},
+                headers={"Retry-After": str(config.retry_after_seconds)}
+            )
+        if roll < config.rate_limit_rate + config.error_rate:
+            app.state.stats["errors"] += 1
+            return JSONResponse(status_code=500, content={"detail": "Internal bank error"})
+
+        return await call_next(request)
+
+    def token_response() -> Dict[str, Any]:
+        return {
+            "access_token": f"mock-access-{fault_rng.getrandbits(64):016x}",
+            "refresh_token": "mock-refresh",
+            "token_type": "bearer",
+            "expires_in": config.token_ttl_seconds,
+        }
+
+    # Open Banking API
+
+    @app.post("/oauth/token")
+    async def oauth_token():
+        return token_response()
+
+    def token_owner(request: Request) -> str:
+        return request.headers.get("Authorization", "").removeprefix("Bearer ")
+
+    @app.get("/api/v1/accounts")
+    async def open_banking_accounts(request: Request):
+        return {"accounts": data.accounts(token_owner(request))}
+
+    @app.get("/api/v1/accounts/{account_id}/transactions")
+    async def open_banking_transactions(
+        account_id: str,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        page: int = Query(1, ge=1)
+    ):
+        return data.page(account_id, date_from, date_to, page)
+
+    # VBank API
+
+    @app.post("/auth/bank-token")
+    async def vbank_token():
+        return token_response()
+
+    @app.get("/accounts")
+    async def vbank_accounts(request: Request):
+        return {
+            "accounts": [
+                {
+                    "id": account["account_number"],
+                    "name": account["name"],
+                    "currency": account["currency"],
+                    "balance": account["balance"],
+                }
+                for account in data.accounts(token_owner(request))
+            ]
+        }
+
+    @app.get("/accounts/{account_id}/transactions")
+    async def vbank_transactions(
+        account_id: str,
+        date_from: Optional[str] = Query(None, alias="dateFrom"),
+        date_to: Optional[str] = Query(None, alias="dateTo"),
+        page: int = Query(1, ge=1)
+    ):
+        result = data.page(account_id, date_from, date_to, page)
+        return {
+            "transactions": [
+                {
+                    "id": txn["id"],
+                    "amount": txn["amount"],
+                    "currency": txn["currency"],
+                    "bookingDate": txn["date"],
+                    "valueDate": txn["posted_date"],
+                    "description": txn["description"],
+                    "merchantName": txn["merchant_name"],
+                }
+                for txn in result["transactions"]
+            ],
+            "next_page": result["next_page"],
+        }
+
+    return app
+
+
+app = create_mock_bank()
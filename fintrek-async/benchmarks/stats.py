@@ -0,0 +1,11 @@
+"""
+Общие статистические функции бенчмарков
+"""
+from typing import List
+import math
+
+
+def percentile(values: List[float], p: float) -> float:
+    """Перцентиль методом ближайшего ранга"""
+    ordered = sorted(values)
+    return ordered[max(math.ceil(p / 100 * len(ordered)) - 1, 0)]
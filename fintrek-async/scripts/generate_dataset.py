@@ -0,0 +1,574 @@
+"""
+Генератор синтетического набора данных для нагрузочных тестов и бенчмарков
+
+Создает пользователей, счета и транзакции, похожие на реальные:
+- зарплата (аванс и основная часть) и редкие доходы от фриланса, премия в декабре;
+- подписки и регулярные платежи (ЖКХ, связь, сервисы) с фиксированной суммой и днем;
+- повседневные расходы по системным категориям с сезонностью (декабрь, лето)
+  и ростом трат в выходные;
+- аномалии - редкие покупки в 8-30 раз дороже обычных;
+- перекос объема: у пользователя с рангом r примерно
+  max_transactions / r^skew транзакций (закон Ципфа), поэтому несколько
+  "тяжелых" пользователей соседствуют с большим числом "легких".
+
+Транзакции генерируются сразу в текстовом формате COPY в нескольких
+процессах (--workers) и загружаются через COPY FROM STDIN в столько же
+соединений параллельно; пользователи и счета - через copy_records_to_table.
+
+Все значения (ID, суммы, даты относительно --end-date) выводятся из --seed:
+одинаковые параметры дают одинаковый набор. Пользователи создаются с
+email synthetic-<seed>-<номер>@synthetic.fintrek.local и паролем --password,
+--clean удаляет их вместе со всеми данными (ON DELETE CASCADE).
+
+Пример:
+    python scripts/generate_dataset.py --users 1000 --max-transactions 500000 --skew 1.1
+    python scripts/generate_dataset.py --users 10 --max-transactions 10000 --seed 7 --clean
+"""
+import sys
+import os
+
+# Добавить путь к приложению
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from typing import Dict, List, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+import argparse
+import asyncio
+import io
+import random
+import time
+import uuid
+
+import asyncpg
+
+from app.core.config import settings
+from app.core.security import get_password_hash
+from app.models.account import AccountStatus, AccountType
+from app.models.category import CategoryType
+from app.models.user import SubscriptionTier
+
+EMAIL_DOMAIN = "synthetic.fintrek.local"
+
+# Системные категории (как в scripts/init_categories.py): (название, тип, иконка, цвет)
+SYSTEM_CATEGORIES = [
+    ("Продукты", CategoryType.EXPENSE, "🛒", "#FF6B6B"),
+    ("Транспорт", CategoryType.EXPENSE, "🚗", "#4ECDC4"),
+    ("Жилье", CategoryType.EXPENSE, "🏠", "#45B7D1"),
+    ("Здоровье", CategoryType.EXPENSE, "💊", "#96CEB4"),
+    ("Развлечения", CategoryType.EXPENSE, "🎮", "#FFEAA7"),
+    ("Одежда", CategoryType.EXPENSE, "👕", "#DFE6E9"),
+    ("Образование", CategoryType.EXPENSE, "📚", "#74B9FF"),
+    ("Кафе и рестораны", CategoryType.EXPENSE, "🍽️", "#FD79A8"),
+    ("Связь", CategoryType.EXPENSE, "📱", "#A29BFE"),
+    ("Другое", CategoryType.EXPENSE, "📦", "#B2BEC3"),
+    ("Зарплата", CategoryType.INCOME, "💰", "#00B894"),
+    ("Фриланс", CategoryType.INCOME, "💻", "#00CEC9"),
+    ("Инвестиции", CategoryType.INCOME, "📈", "#0984E3"),
+    ("Подарки", CategoryType.INCOME, "🎁", "#6C5CE7"),
+    ("Другое", CategoryType.INCOME, "💵", "#B2BEC3"),
+]
+
+# Повседневные расходы: (категория, вес, мин. сумма, макс. сумма, продавцы)
+SPENDING_PROFILES = [
+    ("Продукты", 34, 150, 4500, ["Пятерочка", "Перекресток", "Магнит", "ВкусВилл", "Лента", "Ашан"]),
+    ("Транспорт", 16, 60, 1500, ["Метро", "Яндекс Go", "Ситимобил", "Лукойл", "Газпромнефть"]),
+    ("Кафе и рестораны", 15, 250, 3500, ["Шоколадница", "Теремок", "Вкусно и точка", "Кофемания", "Додо Пицца"]),
+    ("Развлечения", 7, 300, 4000, ["Кинотеатр Каро", "Steam", "Яндекс Афиша", "Боулинг"]),
+    ("Здоровье", 6, 300, 5000, ["Аптека Ригла", "36.6", "Инвитро", "Медси"]),
+    ("Одежда", 5, 1000, 15000, ["Zara", "Uniqlo", "Спортмастер", "Wildberries", "Lamoda"]),
+    ("Образование", 2, 500, 10000, ["Skillbox", "Литрес", "Читай-город", "Нетология"]),
+    ("Другое", 15, 100, 5000, ["Ozon", "Wildberries", "Яндекс Маркет", "Леруа Мерлен", "Fix Price"]),
+]
+
+# Регулярные платежи: (продавец, категория, сумма, день месяца)
+SUBSCRIPTIONS = [
+    ("Яндекс Плюс", "Развлечения", 399, 3),
+    ("Кинопоиск", "Развлечения", 299, 7),
+    ("Spotify", "Развлечения", 249, 12),
+    ("МТС", "Связь", 650, 15),
+    ("Билайн", "Связь", 550, 15),
+    ("Ростелеком", "Связь", 890, 20),
+    ("World Class", "Здоровье", 4900, 1),
+    ("ЖКХ", "Жилье", 6500, 10),
+    ("Аренда квартиры", "Жилье", 45000, 1),
+]
+
+# Сезонность трат по месяцам (декабрь - подарки, лето - отпуска)
+SEASONALITY = {1: 0.85, 2: 0.9, 3: 0.95, 4: 1.0, 5: 1.05, 6: 1.15, 7: 1.2, 8: 1.15, 9: 1.0, 10: 0.95, 11: 1.05, 12: 1.45}
+# Траты по дням недели (пн=0): в выходные больше
+WEEKDAY_FACTOR = (0.9, 0.9, 0.95, 1.0, 1.2, 1.35, 1.15)
+
+USER_COLUMNS = ("id", "email", "password_hash", "name", "subscription_tier", "created_at", "updated_at")
+ACCOUNT_COLUMNS = (
+    "id", "user_id", "account_name", "account_number", "account_type", "currency",
+    "balance", "available_balance", "status", "created_at", "updated_at",
+)
+TRANSACTION_COLUMNS = (
+    "id", "user_id", "account_id", "category_id", "transaction_type", "amount", "currency",
+    "description", "merchant_name", "transaction_date", "posted_date", "status", "created_at", "updated_at",
+)
+
+_FIRST_NAMES = ["Александр", "Мария", "Дмитрий", "Анна", "Сергей", "Елена", "Иван", "Ольга", "Павел", "Наталья"]
+_LAST_NAMES = ["Иванов", "Смирнов", "Кузнецов", "Попов", "Васильев", "Петров", "Соколов", "Михайлов", "Новиков"]
+
+
+@dataclass
+class DatasetConfig:
+    """Параметры набора данных"""
+    users: int = 100
+    max_transactions: int = 50000  # Транзакций у самого активного пользователя
+    min_transactions: int = 100  # Нижняя граница для "легких" пользователей
+    skew: float = 1.0  # Показатель Ципфа, 0 - у всех max_transactions
+    months: int = 24  # Глубина истории
+    end_date: Optional[date] = None  # Последний день истории (по умолчанию сегодня)
+    anomaly_rate: float = 0.002  # Доля аномально крупных покупок
+    seed: int = 42
+    password: str = "synthetic-password"
+    batch_size: int = 50000  # Строк в одном COPY
+    workers: int = 4  # Процессов генерации и соединений для загрузки
+
+
+def _uuid(rng: random.Random) -> uuid.UUID:
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+# Биты версии и варианта UUID4 (как в uuid.UUID(..., version=4)) для горячего цикла,
+# где создавать объект UUID на каждую транзакцию слишком дорого
+_UUID4_CLEAR = ~((0xF000 << 64) | (0xC000 << 48))
+_UUID4_SET = (4 << 76) | (0x8000 << 48)
+
+
+def _money(cents: int) -> Decimal:
+    return Decimal(cents).scaleb(-2)
+
+
+def user_email(config: DatasetConfig, index: int) -> str:
+    """Email синтетического пользователя (для входа в бенчмарках)"""
+    return f"synthetic-{config.seed}-{index:06d}@{EMAIL_DOMAIN}"
+
+
+def transactions_for_user(config: DatasetConfig, index: int) -> int:
+    """Целевое число транзакций пользователя с номером index (ранг index + 1)"""
+    target = int(config.max_transactions / (index + 1) ** config.skew)
+    return max(min(target, config.max_transactions), min(config.min_transactions, config.max_transactions))
+
+
+def history_bounds(config: DatasetConfig) -> Tuple[date, date]:
+    """Первый и последний день истории"""
+    end = config.end_date or date.today()
+    return end - timedelta(days=config.months * 30), end
+
+
+class SyntheticUser:
+    """Пользователь, его счета и профиль трат; все значения выводятся из seed и номера"""
+
+    def __init__(self, config: DatasetConfig, index: int):
+        rng = random.Random(f"{config.seed}:user:{index}")
+        start, _ = history_bounds(config)
+        self.index = index
+        self.id = _uuid(rng)
+        self.email = user_email(config, index)
+        self.name = f"{rng.choice(_FIRST_NAMES)} {rng.choice(_LAST_NAMES)}"
+        self.created_at = datetime(start.year, start.month, start.day)
+        self.transactions = transactions_for_user(config, index)
+
+        # Зарплата - логнормальная, медиана около 80 тыс.
+        self.salary_cents = int(min(max(rng.lognormvariate(11.3, 0.5), 25000), 900000)) * 100
+        self.gets_bonus = rng.random() < 0.4
+        self.freelance_day = rng.randint(1, 28) if rng.random() < 0.2 else None
+        # Индивидуальные предпочтения: множители весов категорий
+        self.category_weights = [weight * rng.uniform(0.5, 1.5) for _, weight, *_ in SPENDING_PROFILES]
+
+        account_types = [AccountType.CHECKING] + rng.sample([AccountType.CREDIT_CARD, AccountType.SAVINGS], rng.randint(0, 2))
+        self.accounts: List[Tuple[uuid.UUID, AccountType, str]] = [
+            (_uuid(rng), account_type, f"40817810{rng.randrange(10 ** 12):012d}")
+            for account_type in account_types
+        ]
+        self.spending_accounts = [account_id.hex for account_id, account_type, _ in self.accounts if account_type != AccountType.SAVINGS]
+        # Подписки: (продавец, категория, сумма, день месяца, счет списания)
+        self.subscriptions = [
+            (*subscription, rng.choice(self.spending_accounts))
+            for subscription in rng.sample(SUBSCRIPTIONS, rng.randint(1, 5))
+        ]
+
+    def user_record(self, password_hash: str) -> tuple:
+        return (
+            self.id, self.email, password_hash, self.name,
+            SubscriptionTier.FREE.name, self.created_at, self.created_at,
+        )
+
+    def account_records(self) -> List[tuple]:
+        names = {
+            AccountType.CHECKING: "Зарплатная карта",
+            AccountType.CREDIT_CARD: "Кредитная карта",
+            AccountType.SAVINGS: "Накопительный счет",
+        }
+        return [
+            (
+                account_id, self.id, names[account_type], f"**** {number[-4:]}", account_type.name, "RUB",
+                Decimal("0.00"), Decimal("0.00"), AccountStatus.ACTIVE.name, self.created_at, self.created_at,
+            )
+            for account_id, account_type, number in self.accounts
+        ]
+
+
+class TransactionGenerator:
+    """
+    Генерирует транзакции в текстовом формате COPY
+
+    Единица работы - пользователь и диапазон месяцев истории. У каждого
+    месяца свой генератор случайных чисел и заранее известное число
+    повседневных трат, поэтому куски можно считать в разных процессах
+    в любом порядке, а результат от этого не меняется.
+    """
+
+    def __init__(self, config: DatasetConfig, categories: Dict[Tuple[str, str], uuid.UUID]):
+        self.config = config
+        self.categories = {key: category_id.hex for key, category_id in categories.items()}
+        self.start, self.end = history_bounds(config)
+
+        # Месяцы истории: (год, месяц, дни, веса дней с учетом сезонности и дня недели)
+        self.months: List[Tuple[int, int, List[date], List[float]]] = []
+        day = self.start
+        while day <= self.end:
+            if not self.months or (self.months[-1][0], self.months[-1][1]) != (day.year, day.month):
+                self.months.append((day.year, day.month, [], []))
+            self.months[-1][2].append(day)
+            self.months[-1][3].append(SEASONALITY[day.month] * WEEKDAY_FACTOR[day.weekday()])
+            day += timedelta(days=1)
+        self._month_weights = [sum(weights) for *_, weights in self.months]
+        self._users: Dict[int, SyntheticUser] = {}
+
+    def user(self, index: int) -> SyntheticUser:
+        if index not in self._users:
+            self._users[index] = SyntheticUser(self.config, index)
+        return self._users[index]
+
+    def daily_quotas(self, user: SyntheticUser) -> List[int]:
+        """Число повседневных трат пользователя по месяцам (пропорционально сезонности)"""
+        regular = (2 + len(user.subscriptions)) * len(self.months)
+        total = max(user.transactions - regular, 0)
+        weight_sum = sum(self._month_weights)
+        quotas, cumulative, assigned = [], 0.0, 0
+        for weight in self._month_weights:
+            cumulative += weight
+            target = round(total * cumulative / weight_sum)
+            quotas.append(target - assigned)
+            assigned = target
+        return quotas
+
+    def plan(self, users: int) -> List[Tuple[int, int, int]]:
+        """
+        Разбить работу на куски примерно по batch_size строк
+
+        Returns:
+            Список (номер пользователя, первый месяц, месяц после последнего)
+        """
+        tasks = []
+        for index in range(users):
+            user = self.user(index)
+            quotas = self.daily_quotas(user)
+            regular = 2 + len(user.subscriptions)
+            first, rows = 0, 0
+            for month, quota in enumerate(quotas):
+                rows += quota + regular
+                if rows >= self.config.batch_size:
+                    tasks.append((index, first, month + 1))
+                    first, rows = month + 1, 0
+            if first < len(quotas):
+                tasks.append((index, first, len(quotas)))
+        return tasks
+
+    def generate(self, index: int, month_from: int, month_to: int) -> Tuple[bytes, int, Dict[str, int]]:
+        """
+        Транзакции пользователя за месяцы [month_from, month_to)
+
+        Returns:
+            (строки для COPY ... FROM STDIN, число строк, изменение балансов счетов в копейках)
+        """
+        user = self.user(index)
+        quotas = self.daily_quotas(user)
+        categories = self.categories
+        main_account = user.accounts[0][0].hex
+        spending_accounts = user.spending_accounts
+        profiles = SPENDING_PROFILES
+        anomaly_rate = self.config.anomaly_rate
+        balances: Dict[str, int] = {}
+        lines: List[str] = []
+        # Общая часть строки: user_id и хвост (currency, статус)
+        user_id = user.id.hex
+
+        for month_no in range(month_from, month_to):
+            year, month, days, weights = self.months[month_no]
+            rng = random.Random(f"{self.config.seed}:transactions:{index}:{month_no}")
+            getrandbits, rand, randrange = rng.getrandbits, rng.random, rng.randrange
+            day_strings = {day: day.isoformat() for day in days}
+            next_day = {day: (day + timedelta(days=1)).isoformat() for day in days}
+
+            def add(account_id: str, kind: str, category: str, cents: int, description: str, merchant: str, day: date, hour: int) -> None:
+                moment = f"{day_strings[day]} {hour:02d}:{randrange(60):02d}:{randrange(60):02d}"
+                posted = f"{next_day[day]} {moment[11:]}"
+                category_id = categories.get((category, kind), "\\N")
+                lines.append(
+                    f"{getrandbits(128) & _UUID4_CLEAR | _UUID4_SET:032x}\t{user_id}\t{account_id}\t{category_id}\t{kind}\t"
+                    f"{cents // 100}.{cents % 100:02d}\tRUB\t{description}\t{merchant}\t"
+                    f"{moment}\t{posted}\tCOMPLETED\t{moment}\t{moment}\n"
+                )
+                balances[account_id] = balances.get(account_id, 0) + (cents if kind == "INCOME" else -cents)
+
+            def on_day(day_of_month: int) -> Optional[date]:
+                # Короткие месяцы: дни после 28-го переносятся на 28-е
+                day = date(year, month, min(day_of_month, 28))
+                return day if day in day_strings else None
+
+            # Зарплата: основная часть 5-го, аванс 20-го; раз в год индексация на 7%
+            for day_of_month, share, description in ((5, 0.6, "Заработная плата"), (20, 0.4, "Аванс")):
+                day = on_day(day_of_month)
+                if day is not None:
+                    raise_factor = 1 + 0.07 * ((day - self.start).days // 365)
+                    add(main_account, "INCOME", "Зарплата", int(user.salary_cents * share * raise_factor),
+                        description, "ООО Работодатель", day, 9 + randrange(3))
+            if user.gets_bonus and month == 12 and on_day(25) is not None:
+                add(main_account, "INCOME", "Зарплата", int(user.salary_cents * rng.uniform(0.5, 2.0)),
+                    "Годовая премия", "ООО Работодатель", on_day(25), 9 + randrange(3))
+            if user.freelance_day and on_day(user.freelance_day) is not None and rand() < 0.5:
+                add(main_account, "INCOME", "Фриланс", int(user.salary_cents * rng.uniform(0.05, 0.4)),
+                    "Оплата по договору", "\\N", on_day(user.freelance_day), 8 + randrange(15))
+
+            # Подписки и регулярные платежи: та же сумма в тот же день месяца
+            for merchant, category, rubles, day_of_month, account_id in user.subscriptions:
+                day = on_day(day_of_month)
+                if day is not None:
+                    add(account_id, "EXPENSE", category, rubles * 100, f"Оплата {merchant}", merchant, day, 8 + randrange(15))
+
+            # Повседневные траты: день с учетом сезонности и дня недели, категория по профилю пользователя
+            quota = quotas[month_no]
+            for day, (category, _, low, high, merchants) in zip(
+                rng.choices(days, weights=weights, k=quota),
+                rng.choices(profiles, weights=user.category_weights, k=quota)
+            ):
+                # Логравномерное распределение: мелких покупок больше, чем крупных
+                amount = low * (high / low) ** rand()
+                description = "Покупка"
+                if rand() < anomaly_rate:
+                    amount *= rng.uniform(8, 30)
+                    description = "Крупная покупка"
+                add(spending_accounts[randrange(len(spending_accounts))], "EXPENSE", category, int(amount * 100),
+                    description, merchants[randrange(len(merchants))], day, 8 + randrange(15))
+
+        return "".join(lines).encode(), len(lines), balances
+
+
+# Генератор процесса-исполнителя (создается один раз в initializer пула)
+_worker_generator: Optional[TransactionGenerator] = None
+
+
+def _init_worker(config: DatasetConfig, categories: Dict[Tuple[str, str], uuid.UUID]) -> None:
+    global _worker_generator
+    _worker_generator = TransactionGenerator(config, categories)
+
+
+def _generate_chunk(index: int, month_from: int, month_to: int) -> Tuple[bytes, int, Dict[str, int]]:
+    return _worker_generator.generate(index, month_from, month_to)
+
+
+def _database_dsn() -> str:
+    """DSN для asyncpg (без драйвера SQLAlchemy в схеме)"""
+    return settings.ASYNC_DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://", 1)
+
+
+async def ensure_system_categories(conn: asyncpg.Connection) -> Dict[Tuple[str, str], uuid.UUID]:
+    """
+    Создать недостающие системные категории
+
+    Returns:
+        Словарь {(название, тип): ID категории}
+    """
+    rows = await conn.fetch("SELECT id, name, category_type::text AS category_type FROM categories WHERE is_system")
+    categories = {(row["name"], row["category_type"]): row["id"] for row in rows}
+    now = datetime.utcnow()
+    missing = [
+        (uuid.uuid4(), None, name, category_type.name, icon, color, True, now, now)
+        for name, category_type, icon, color in SYSTEM_CATEGORIES
+        if (name, category_type.name) not in categories
+    ]
+    if missing:
+        await conn.copy_records_to_table(
+            "categories", records=missing,
+            columns=("id", "user_id", "name", "category_type", "icon", "color", "is_system", "created_at", "updated_at")
+        )
+        categories.update({(record[2], record[3]): record[0] for record in missing})
+        print(f"Создано системных категорий: {len(missing)}")
+    return categories
+
+
+async def clean(conn: asyncpg.Connection) -> int:
+    """Удалить синтетических пользователей (счета и транзакции удаляются каскадно)"""
+    result = await conn.execute("DELETE FROM users WHERE email LIKE $1", f"%@{EMAIL_DOMAIN}")
+    return int(result.split()[-1])
+
+
+async def _produce(
+    queue: asyncio.Queue, executor: ProcessPoolExecutor, tasks: List[Tuple[int, int, int]], in_flight: int, consumers: int
+) -> None:
+    """Генерировать куски в процессах, держа в работе не больше in_flight; в конце - маркер остановки каждому потребителю"""
+    loop = asyncio.get_running_loop()
+    pending = set()
+    for task in tasks:
+        pending.add(loop.run_in_executor(executor, _generate_chunk, *task))
+        if len(pending) >= in_flight:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                await queue.put(future.result())
+    for future in asyncio.as_completed(pending):
+        await queue.put(await future)
+    for _ in range(consumers):
+        await queue.put(None)
+
+
+async def _consume(pool: asyncpg.Pool, queue: asyncio.Queue, batch_size: int, balances: Dict[str, int]) -> int:
+    """COPY кусков из очереди; мелкие куски (легкие пользователи) склеиваются до batch_size строк"""
+    loaded = 0
+    async with pool.acquire() as conn:
+        while True:
+            chunk = await queue.get()
+            if chunk is None:
+                return loaded
+            parts, rows = [chunk], chunk[1]
+            while rows < batch_size and not queue.empty():
+                chunk = queue.get_nowait()
+                if chunk is None:
+                    # Вернуть маркер остановки для этого же потребителя
+                    queue.put_nowait(None)
+                    break
+                parts.append(chunk)
+                rows += chunk[1]
+            await conn.copy_to_table(
+                "transactions", source=io.BytesIO(b"".join(data for data, _, _ in parts)),
+                columns=TRANSACTION_COLUMNS, format="text"
+            )
+            for _, _, changes in parts:
+                for account_id, cents in changes.items():
+                    balances[account_id] = balances.get(account_id, 0) + cents
+            loaded += rows
+
+
+async def generate_dataset(config: DatasetConfig, clean_existing: bool = False) -> Dict[str, float]:
+    """
+    Сгенерировать и загрузить набор данных
+
+    Args:
+        config: Параметры набора
+        clean_existing: Удалить ранее созданных синтетических пользователей
+
+    Returns:
+        Статистика: число строк по таблицам, время и скорость загрузки транзакций
+    """
+    if config.end_date is None:
+        # Все процессы должны видеть один и тот же конец истории
+        config = replace(config, end_date=date.today())
+    workers = max(config.workers, 1)
+
+    pool = await asyncpg.create_pool(_database_dsn(), min_size=1, max_size=workers)
+    try:
+        async with pool.acquire() as conn:
+            if clean_existing:
+                removed = await clean(conn)
+                print(f"Удалено синтетических пользователей: {removed}")
+            categories = await ensure_system_categories(conn)
+
+            generator = TransactionGenerator(config, categories)
+            users = [generator.user(index) for index in range(config.users)]
+            password_hash = get_password_hash(config.password)
+            await conn.copy_records_to_table(
+                "users", records=[user.user_record(password_hash) for user in users], columns=USER_COLUMNS
+            )
+            await conn.copy_records_to_table(
+                "accounts", records=[record for user in users for record in user.account_records()],
+                columns=ACCOUNT_COLUMNS
+            )
+
+        # Генерация (CPU) - в процессах, COPY - параллельно в нескольких соединениях
+        queue: asyncio.Queue = asyncio.Queue(maxsize=workers * 2)
+        balances: Dict[str, int] = {}
+        started = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(config, categories)) as executor:
+            producer = asyncio.create_task(
+                _produce(queue, executor, generator.plan(config.users), in_flight=workers * 2, consumers=workers)
+            )
+            consumers = [
+                asyncio.create_task(_consume(pool, queue, config.batch_size, balances)) for _ in range(workers)
+            ]
+            # Ждем всех вместе: если COPY упал, производитель не должен навсегда повиснуть на полной очереди
+            try:
+                _, *loaded = await asyncio.gather(producer, *consumers)
+                transactions = sum(loaded)
+            except BaseException:
+                for task in (producer, *consumers):
+                    task.cancel()
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise
+        elapsed = time.perf_counter() - started
+
+        async with pool.acquire() as conn:
+            await conn.executemany(
+                "UPDATE accounts SET balance = $2, available_balance = $2 WHERE id = $1",
+                [(uuid.UUID(account_id), _money(cents)) for account_id, cents in balances.items()]
+            )
+            # Свежая статистика планировщика для только что загруженных данных
+            await conn.execute("ANALYZE users, accounts, transactions")
+    finally:
+        await pool.close()
+
+    return {
+        "users": len(users),
+        "accounts": sum(len(user.accounts) for user in users),
+        "transactions": transactions,
+        "seconds": elapsed,
+        "rows_per_second": transactions / elapsed if elapsed else 0.0,
+    }
+
+
+async def main() -> None:
+    defaults = DatasetConfig()
+    parser = argparse.ArgumentParser(description="Generate and bulk-load a synthetic dataset")
+    parser.add_argument("--users", type=int, default=defaults.users)
+    parser.add_argument("--max-transactions", type=int, default=defaults.max_transactions, help="Транзакций у самого активного пользователя")
+    parser.add_argument("--min-transactions", type=int, default=defaults.min_transactions)
+    parser.add_argument("--skew", type=float, default=defaults.skew, help="Показатель Ципфа (0 - у всех одинаково)")
+    parser.add_argument("--months", type=int, default=defaults.months)
+    parser.add_argument("--end-date", type=date.fromisoformat, default=None, help="Последний день истории, YYYY-MM-DD")
+    parser.add_argument("--anomaly-rate", type=float, default=defaults.anomaly_rate)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--password", default=defaults.password)
+    parser.add_argument("--batch-size", type=int, default=defaults.batch_size)
+    parser.add_argument("--workers", type=int, default=defaults.workers)
+    parser.add_argument("--clean", action="store_true", help="Сначала удалить ранее созданных синтетических пользователей")
+    args = parser.parse_args()
+
+    config = DatasetConfig(
+        users=args.users,
+        max_transactions=args.max_transactions,
+        min_transactions=args.min_transactions,
+        skew=args.skew,
+        months=args.months,
+        end_date=args.end_date,
+        anomaly_rate=args.anomaly_rate,
+        seed=args.seed,
+        password=args.password,
+        batch_size=args.batch_size,
+        workers=args.workers,
+    )
+    result = await generate_dataset(config, clean_existing=args.clean)
+    print(
+        f"Загружено: пользователей {result['users']}, счетов {result['accounts']}, "
+        f"транзакций {result['transactions']} за {result['seconds']:.1f} с "
+        f"({result['rows_per_second']:,.0f} строк/с)"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -3,7 +3,19 @@
 """
 import pytest
 from fastapi.testclient import TestClient
-from datetime import datetime
+from datetime import datetime, timedelta
+from decimal import Decimal
+from uuid import uuid4
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.account import Account, AccountType
+from app.models.category import Category, CategoryType
+from app.models.transaction import Transaction, TransactionType
+from app.models.user import User
+from app.services.job_handlers import CATEGORIZE_TRANSACTIONS, run_categorize_transactions
+from app.services.job_queue import JobContext
 
 
 def test_get_spending_by_category_unauthorized(client: TestClient):
@@ -120,3 +132,65 @@ def test_analytics_with_invalid_parameters(client: TestClient, auth_headers):
         headers=auth_headers
     )
     assert response.status_code == 422
+
+
+async def test_account_summary_not_modified(client: AsyncClient, auth_headers, query_budget):
+    """
+    Тест условного запроса: повтор с If-None-Match - 304 без SQL
+    """
+    response = await client.get("/api/v1/analytics/account-summary", headers=auth_headers)
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    assert not etag.startswith("W/")
+    
+    with query_budget(0):
+        response = await client.get(
+            "/api/v1/analytics/account-summary",
+            headers={**auth_headers, "If-None-Match": etag}
+        )
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert response.content == b""
+    
+    # Другие параметры - другой ETag
+    response = await client.get(
+        "/api/v1/analytics/spending-by-category?start_date=2026-01-01T00:00:00",
+        headers={**auth_headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 200
+
+
+async def test_spending_by_category_etag_changes_after_background_job(
+    client: AsyncClient, auth_headers, db_session: AsyncSession
+):
+    """
+    Тест: запись фоновой задачи (категоризация) меняет ETag, старый больше не дает 304
+    """
+    user = (await db_session.execute(select(User).where(User.email == "test@example.com"))).scalar_one()
+    account = Account(user_id=user.id, account_name="Основной", account_type=AccountType.CHECKING)
+    db_session.add_all([
+        Category(name="Другое", category_type=category_type, is_system=True)
+        for category_type in CategoryType
+    ] + [account])
+    await db_session.flush()
+    db_session.add(Transaction(
+        user_id=user.id,
+        account_id=account.id,
+        transaction_type=TransactionType.EXPENSE,
+        amount=Decimal("500.00"),
+        description="Без категории",
+        transaction_date=datetime.utcnow() - timedelta(days=1)
+    ))
+    await db_session.commit()
+    
+    url = "/api/v1/analytics/spending-by-category"
+    response = await client.get(url, headers=auth_headers)
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    
+    ctx = JobContext(uuid4(), CATEGORIZE_TRANSACTIONS, user.id, {"limit": 10})
+    assert await run_categorize_transactions(ctx, db_session) == {"categorized_count": 1}
+    
+    response = await client.get(url, headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
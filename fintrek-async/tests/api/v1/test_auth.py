@@ -3,6 +3,7 @@
 """
 import pytest
 from fastapi.testclient import TestClient
+from httpx import AsyncClient
 
 
 def test_register_user(client: TestClient):
@@ -166,3 +167,63 @@ def test_access_protected_endpoint_without_token(client: TestClient):
     """
     response = client.get("/api/v1/auth/me")
     assert response.status_code == 401
+
+
+async def test_update_profile_invalidates_user_cache(client: AsyncClient, auth_headers):
+    """
+    Тест инвалидации кэша пользователя после изменения профиля
+    """
+    # Первый запрос кладет пользователя в кэш
+    response = await client.get("/api/v1/users/me", headers=auth_headers)
+    assert response.status_code == 200
+    
+    response = await client.patch(
+        "/api/v1/users/me",
+        json={"full_name": "Renamed User"},
+        headers=auth_headers
+    )
+    assert response.status_code == 200
+    
+    response = await client.get("/api/v1/users/me", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["name"] == "Renamed User"
+
+
+async def test_cached_user_needs_no_queries(client: AsyncClient, auth_headers, query_budget):
+    """
+    Тест: пользователь из кэша не требует обращений к БД
+    """
+    # Первый запрос кладет пользователя в кэш
+    await client.get("/api/v1/users/me", headers=auth_headers)
+    
+    with query_budget(0):
+        response = await client.get("/api/v1/users/me", headers=auth_headers)
+    
+    assert response.status_code == 200
+    assert response.headers["X-DB-Queries"] == "0"
+
+
+async def test_password_hashing_pool_metrics(client: AsyncClient, auth_headers):
+    """
+    Тест метрик пула хеширования паролей: каждый вход проверяет пароль в пуле
+    """
+    before = (await client.get("/health/password-hashing")).json()
+    
+    response = await client.post(
+        "/api/v1/auth/login",
+        params={"email": "test@example.com", "password": "testpassword"}
+    )
+    assert response.status_code == 200
+    response = await client.post(
+        "/api/v1/auth/login",
+        params={"email": "test@example.com", "password": "wrongpassword"}
+    )
+    assert response.status_code == 401
+    
+    response = await client.get("/health/password-hashing")
+    assert response.status_code == 200
+    after = response.json()
+    assert after["submitted"] - before["submitted"] == 2
+    assert after["completed"] - before["completed"] == 2
+    assert after["failed"] == before["failed"]
+    assert after["rejected"] == before["rejected"]
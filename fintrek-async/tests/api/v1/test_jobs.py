@@ -0,0 +1,93 @@
+"""
+Тесты для фоновых задач
+"""
+import pytest
+from httpx import AsyncClient
+from uuid import uuid4
+
+
+async def test_get_job_unauthorized(client: AsyncClient):
+    """
+    Тест доступа к статусу задачи без авторизации
+    """
+    response = await client.get(f"/api/v1/jobs/{uuid4()}")
+    assert response.status_code == 401
+
+
+async def test_get_unknown_job(client: AsyncClient, auth_headers):
+    """
+    Тест получения несуществующей задачи
+    """
+    response = await client.get(f"/api/v1/jobs/{uuid4()}", headers=auth_headers)
+    assert response.status_code == 404
+
+
+async def test_categorize_transactions_enqueues_job(client: AsyncClient, auth_headers):
+    """
+    Тест постановки категоризации в очередь и опроса статуса
+    """
+    response = await client.post(
+        "/api/v1/ai/categorize-transactions?limit=10",
+        headers=auth_headers
+    )
+
+    assert response.status_code == 202
+    data = response.json()
+    assert data["job_type"] == "ai.categorize_transactions"
+    assert data["status"] == "queued"
+
+    response = await client.get(f"/api/v1/jobs/{data['job_id']}", headers=auth_headers)
+    assert response.status_code == 200
+    job = response.json()
+    assert job["id"] == data["job_id"]
+    assert job["status"] in ("queued", "running", "succeeded", "failed")
+    assert "progress_current" in job
+
+    # Повторный запрос, пока задача активна, возвращает ту же задачу
+    response = await client.post(
+        "/api/v1/ai/categorize-transactions?limit=10",
+        headers=auth_headers
+    )
+    assert response.status_code == 202
+    if response.json()["status"] in ("queued", "running"):
+        assert response.json()["job_id"] == data["job_id"]
+        assert response.json()["deduplicated"] is True
+
+
+async def test_sync_unknown_connection(client: AsyncClient, auth_headers):
+    """
+    Тест синхронизации несуществующего подключения
+    """
+    response = await client.post(
+        "/api/v1/bank-connections/sync",
+        json={"connection_id": str(uuid4())},
+        headers=auth_headers
+    )
+    assert response.status_code == 404
+
+
+async def test_sync_all_connections_enqueues_job(client: AsyncClient, auth_headers):
+    """
+    Тест постановки синхронизации всех подключений и дедупликации
+    """
+    response = await client.post("/api/v1/bank-connections/sync-all", headers=auth_headers)
+    assert response.status_code == 202
+    data = response.json()
+    assert data["job_type"] == "bank_connection.sync_all"
+
+    response = await client.post("/api/v1/bank-connections/sync-all", headers=auth_headers)
+    assert response.status_code == 202
+    if response.json()["status"] in ("queued", "running"):
+        assert response.json()["job_id"] == data["job_id"]
+
+
+async def test_create_connection_unknown_provider(client: AsyncClient, auth_headers):
+    """
+    Тест создания подключения с неизвестным коннектором
+    """
+    response = await client.post(
+        "/api/v1/bank-connections/",
+        json={"bank_name": "Test Bank", "provider": "unknown"},
+        headers=auth_headers
+    )
+    assert response.status_code == 400
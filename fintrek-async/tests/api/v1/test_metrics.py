@@ -0,0 +1,38 @@
+"""
+Тесты для эндпоинта метрик
+"""
+from httpx import AsyncClient
+
+
+async def test_metrics_records_route_template(client: AsyncClient, auth_headers):
+    """
+    Запросы учитываются по шаблону маршрута, а не по фактическому пути
+    """
+    await client.get("/api/v1/accounts/00000000-0000-0000-0000-000000000000", headers=auth_headers)
+    
+    response = await client.get("/metrics")
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'http_requests_total{method="GET",route="/api/v1/accounts/{account_id}",status="404"}' in body
+    assert "http_request_duration_seconds_bucket" in body
+    assert 'db_pool_checked_out{pool="primary"}' in body
+
+
+async def test_large_response_is_compressed(client: AsyncClient):
+    """
+    Крупный JSON сжимается gzip и учитывается в метриках, маленький - нет
+    """
+    response = await client.get("/api/v1/openapi.json", headers={"Accept-Encoding": "gzip"})
+    
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert "paths" in response.json()
+    
+    response = await client.get("/health", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    
+    body = (await client.get("/metrics")).text
+    assert 'http_response_compressed_bytes_total{route="/api/v1/openapi.json",encoding="gzip"}' in body
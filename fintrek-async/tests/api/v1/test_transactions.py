@@ -0,0 +1,107 @@
+"""
+Тесты для эндпоинтов транзакций
+"""
+import pytest
+from httpx import AsyncClient
+
+from app.schemas.transaction import TransactionResponse
+
+
+async def test_get_transactions_unauthorized(client: AsyncClient):
+    """
+    Тест доступа к списку транзакций без авторизации
+    """
+    response = await client.get("/api/v1/transactions/")
+    assert response.status_code == 401
+
+
+async def create_transaction(client: AsyncClient, auth_headers) -> dict:
+    """Создать счет и транзакцию по нему, вернуть ответ создания транзакции"""
+    account = (await client.post(
+        "/api/v1/accounts/",
+        json={"account_name": "Основной", "account_type": "checking", "balance": "1000.00"},
+        headers=auth_headers
+    )).json()
+    return (await client.post(
+        "/api/v1/transactions/",
+        json={
+            "account_id": account["id"],
+            "transaction_type": "expense",
+            "amount": "123.40",
+            "description": "Покупка",
+            "merchant_name": "Пятерочка",
+            "transaction_date": "2026-10-01T12:30:00"
+        },
+        headers=auth_headers
+    )).json()
+
+
+async def test_get_transactions_matches_response_schema(client: AsyncClient, auth_headers):
+    """
+    Тест: список транзакций (без ORM-объектов) отдает те же поля, что TransactionResponse
+    """
+    created = await create_transaction(client, auth_headers)
+
+    response = await client.get("/api/v1/transactions/?page=1&page_size=10", headers=auth_headers)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 1
+    assert data["page"] == 1
+    assert data["page_size"] == 10
+    assert data["transactions"] == [created]
+    item = TransactionResponse.model_validate(data["transactions"][0])
+    assert str(item.amount) == "123.40"
+
+
+async def test_get_transactions_sparse_fields(client: AsyncClient, auth_headers):
+    """
+    Тест выбора полей: только запрошенные поля и всегда id
+    """
+    created = await create_transaction(client, auth_headers)
+
+    response = await client.get(
+        "/api/v1/transactions/?fields=amount,transaction_date",
+        headers=auth_headers
+    )
+
+    assert response.status_code == 200
+    assert response.json()["transactions"] == [{
+        "id": created["id"],
+        "amount": "123.40",
+        "transaction_date": created["transaction_date"]
+    }]
+
+
+async def test_get_transactions_include_relations(client: AsyncClient, auth_headers, query_budget):
+    """
+    Тест встраивания счета и категории одним запросом (плюс подсчет total)
+    """
+    created = await create_transaction(client, auth_headers)
+    # Пользователь уже в кэше после создания транзакции
+    with query_budget(2):
+        response = await client.get(
+            "/api/v1/transactions/?fields=id,amount&include=category,account",
+            headers=auth_headers
+        )
+
+    assert response.status_code == 200
+    item = response.json()["transactions"][0]
+    assert item["id"] == created["id"]
+    assert item["category"] is None
+    assert item["account"] == {
+        "id": created["account_id"],
+        "account_name": "Основной",
+        "account_type": "checking"
+    }
+
+
+async def test_get_transactions_unknown_field(client: AsyncClient, auth_headers):
+    """
+    Тест неизвестного поля и связанного объекта
+    """
+    response = await client.get("/api/v1/transactions/?fields=amount,password", headers=auth_headers)
+    assert response.status_code == 400
+
+    response = await client.get("/api/v1/transactions/?include=user", headers=auth_headers)
+    assert response.status_code == 400
@@ -3,12 +3,15 @@
 """
 import pytest
 import asyncio
-from typing import AsyncGenerator
+from contextlib import contextmanager
+from typing import AsyncGenerator, Callable, List
 from httpx import AsyncClient
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 
 from app.main import app
 from app.db.session import get_db
+from app.db.query_tracking import instrument_queries
 from app.core.config import settings
 
 # Тестовая база данных
@@ -22,6 +25,9 @@ TestSessionLocal = async_sessionmaker(
     expire_on_commit=False
 )
 
+# Счетчики SQL запроса (X-DB-Queries) и в тестах
+instrument_queries(test_engine)
+
 
 @pytest.fixture(scope="session")
 def event_loop():
@@ -74,3 +80,35 @@ async def auth_headers(client: AsyncClient, db_session: AsyncSession) -> dict:
     access_token = create_access_token(data={"sub": str(test_user.id)})
     
     return {"Authorization": f"Bearer {access_token}"}
+
+
+@pytest.fixture
+def query_budget() -> Callable:
+    """
+    Фикстура для проверки бюджета SQL-запросов
+    
+    Использование:
+        with query_budget(2):
+            await client.get("/api/v1/accounts/", headers=auth_headers)
+    
+    Тест падает, если внутри блока выполнено больше запросов, чем разрешено;
+    в сообщении перечисляются выполненные statements.
+    """
+    @contextmanager
+    def budget(max_queries: int):
+        statements: List[str] = []
+        
+        def count(conn, cursor, statement, parameters, context, executemany):
+            statements.append(" ".join(statement.split()))
+        
+        event.listen(test_engine.sync_engine, "after_cursor_execute", count)
+        try:
+            yield statements
+        finally:
+            event.remove(test_engine.sync_engine, "after_cursor_execute", count)
+        
+        if len(statements) > max_queries:
+            listing = "\n".join(f"  {statement[:200]}" for statement in statements)
+            pytest.fail(f"Query budget exceeded: {len(statements)} > {max_queries}\n{listing}")
+    
+    return budget